@@ -0,0 +1,64 @@
+"""
+Benchmark of the per-update overhead of bot handlers' database access.
+
+Compares the previous pattern, building the Flask app with ``create_app()``
+on every update and then entering its app context, with the shared
+``bot_runtime``, which builds the app once and only enters an app context
+with a scoped session per update. Each simulated update runs one trivial
+query, so the timings are the overhead a handler pays before its own work.
+
+The app writes its SQLite database under ``instance/``.
+
+    python -m benchmarks.bot_runtime [--updates 200]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app import create_app
+from bot.runtime import BotRuntime
+from extensions import db
+
+
+async def per_update_app(updates: int) -> float:
+    start = time.perf_counter()
+    for _ in range(updates):
+        app = await create_app()
+        with app.app_context():
+            db.session.execute(text('SELECT 1'))
+    return time.perf_counter() - start
+
+
+async def shared_runtime(updates: int) -> float:
+    runtime = BotRuntime(create_app)
+    await runtime.start()
+    start = time.perf_counter()
+    for _ in range(updates):
+        await runtime.start()
+        with runtime.session() as session:
+            session.execute(text('SELECT 1'))
+    return time.perf_counter() - start
+
+
+async def run(updates: int) -> None:
+    # Startup cost excluded from both: imports, first table creation
+    await create_app()
+    before = await per_update_app(updates)
+    after = await shared_runtime(updates)
+    print(f"{'pattern':<22} {'updates':>8} {'ms/update':>10}")
+    print(f"{'create_app per update':<22} {updates:>8} {before / updates * 1000:>10.3f}")
+    print(f"{'shared bot runtime':<22} {updates:>8} {after / updates * 1000:>10.3f}")
+    print(f"speedup: {before / after:.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--updates', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.updates))
+
+
+if __name__ == '__main__':
+    main()
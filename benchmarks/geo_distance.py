@@ -0,0 +1,73 @@
+"""
+Benchmark of the vectorized radius query against a geodesic loop.
+
+For each catalogue size, finds the jobs within 25 km of a point with
+``services.geo_distance.within_radius`` (bounding box prefilter plus one
+haversine call) and with a Python loop over ``geopy.distance.geodesic``,
+the previous implementation.
+
+    python -m benchmarks.geo_distance [--sizes 10000 100000 1000000] [--loop-max 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+from geopy.distance import geodesic
+
+from services.geo_distance import within_radius
+
+CENTER = (32.08, 34.78)
+RADIUS_KM = 25
+
+
+def synthetic_points(n: int, seed: int = 0):
+    """Jobs spread over a 10 x 10 degree box around the query point"""
+    rng = np.random.default_rng(seed)
+    return (CENTER[0] + rng.uniform(-5, 5, n), CENTER[1] + rng.uniform(-5, 5, n))
+
+
+def geodesic_loop(latitudes, longitudes):
+    within = []
+    for i, point in enumerate(zip(latitudes.tolist(), longitudes.tolist())):
+        distance = geodesic(CENTER, point).kilometers
+        if distance <= RADIUS_KM:
+            within.append((distance, i))
+    within.sort()
+    return within
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes, loop_max: int, repeat: int = 5) -> None:
+    print(f"{'jobs':>10} {'found':>8} {'vectorized ms':>14} {'geodesic ms':>12} {'speedup':>8}")
+    for n in sizes:
+        latitudes, longitudes = synthetic_points(n)
+        indices, _ = within_radius(latitudes, longitudes, *CENTER, RADIUS_KM)
+        vectorized = best_of(lambda: within_radius(latitudes, longitudes, *CENTER, RADIUS_KM), repeat)
+        if n <= loop_max:
+            loop = best_of(lambda: geodesic_loop(latitudes, longitudes), 1)
+            print(f"{n:>10} {len(indices):>8} {vectorized * 1000:>14.2f} {loop * 1000:>12.1f} "
+                  f"{loop / vectorized:>7.0f}x")
+        else:
+            print(f"{n:>10} {len(indices):>8} {vectorized * 1000:>14.2f} {'-':>12} {'-':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--loop-max', type=int, default=100_000,
+                        help="Largest size to run the slow geodesic loop on")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.loop_max, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
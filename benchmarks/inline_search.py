@@ -0,0 +1,87 @@
+"""
+Benchmark of inline query answers over the in-memory job index.
+
+Indexes synthetic active jobs (titles, locations and skills drawn with a
+Zipf skew, like real postings) and times answering inline queries the way
+users type them: every prefix of 1-3 word queries, with the inline results
+built for each page. Reports median, 99th percentile and worst answer times
+without the result cache (every query ranked afresh) and with it.
+
+    python -m benchmarks.inline_search [--jobs 100000] [--queries 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bot.inline import INLINE_PAGE_SIZE, inline_results
+from services.search.inline_index import InlineJob, InlineJobIndex
+
+TITLES = ['developer', 'engineer', 'manager', 'analyst', 'designer', 'backend', 'frontend',
+          'senior', 'junior', 'data', 'product', 'sales', 'support', 'devops', 'qa', 'lead',
+          'marketing', 'accountant', 'scientist', 'architect', 'administrator', 'consultant']
+LOCATIONS = ['tel aviv', 'jerusalem', 'haifa', 'berlin', 'london', 'herzliya', 'petah tikva',
+             'ramat gan', 'beer sheva', 'netanya', 'rehovot', 'raanana', 'new york', 'paris']
+SKILLS = ['python', 'java', 'javascript', 'typescript', 'react', 'sql', 'postgresql', 'docker',
+          'kubernetes', 'aws', 'go', 'rust', 'excel', 'figma', 'salesforce', 'c++', 'c#', 'node.js',
+          'django', 'flask', 'spark', 'tableau', 'linux', 'terraform', 'kotlin', 'swift']
+
+
+def synthetic_jobs(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    def pick(words, size):
+        ids = np.minimum(rng.zipf(1.5, size=size), len(words)) - 1
+        return [words[i] for i in dict.fromkeys(ids.tolist())]
+
+    for job_id in range(1, count + 1):
+        yield InlineJob(job_id, ' '.join(pick(TITLES, 3)), pick(LOCATIONS, 1)[0],
+                        tuple(pick(SKILLS, 4)), bool(rng.random() < 0.1))
+
+
+def typed_queries(count: int, seed: int = 1):
+    """Every prefix of random 1-3 word queries, as sent while typing"""
+    rng = np.random.default_rng(seed)
+    words = TITLES + LOCATIONS + SKILLS
+    queries = []
+    while len(queries) < count:
+        query = ' '.join(words[i] for i in rng.integers(0, len(words), rng.integers(1, 4)))
+        queries.extend(query[:end] for end in range(1, len(query) + 1))
+    return queries[:count]
+
+
+def time_answers(index: InlineJobIndex, queries, clear_cache: bool):
+    timings = []
+    for query in queries:
+        if clear_cache:
+            index._results.clear()
+        start = time.perf_counter()
+        inline_results(index.search(query, INLINE_PAGE_SIZE))
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def run(jobs: int, queries: int) -> None:
+    index = InlineJobIndex()
+    start = time.perf_counter()
+    index.bulk_load(synthetic_jobs(jobs))
+    print(f"indexed {len(index):,} jobs in {time.perf_counter() - start:.1f}s")
+
+    typed = typed_queries(queries)
+    print(f"{'run':<10} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, clear_cache in (('uncached', True), ('cached', False)):
+        timings = time_answers(index, typed, clear_cache)
+        print(f"{name:<10} {len(typed):>8} {np.percentile(timings, 50):>8.2f} "
+              f"{np.percentile(timings, 99):>8.2f} {timings.max():>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.jobs, args.queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the job alert fan-out for one job activation.
+
+Fills a SQLite database with synthetic job seekers around Israel, a
+``seekers_near`` share of them within alert range of the job and sharing a
+skill with it, then times ``JobAlertFanout.process`` for the job with a
+no-op notifier: the bounding box query, per-batch matching and the
+``job_alert`` inserts. A second run of the same job measures the
+deduplicated path, where every match was already alerted.
+
+The database lives in a temporary directory.
+
+    python -m benchmarks.job_alerts [--seekers 100000] [--batch-size 5000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from flask import Flask
+
+from extensions import db
+from models import Employer, Job, JobAlert, JobSeeker
+from services.matching.job_alerts import JobAlertFanout
+
+CENTER = (32.08, 34.78)
+SKILLS = ['python', 'sql', 'java', 'react', 'docker', 'aws', 'go', 'excel', 'sales', 'figma']
+
+
+def populate(seekers: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    latitudes = CENTER[0] + rng.uniform(-1.5, 1.5, seekers)
+    longitudes = CENTER[1] + rng.uniform(-0.7, 0.7, seekers)
+    db.session.execute(Employer.__table__.insert(),
+                       [{'id': 1, 'email': 'jobs@example.com', 'company_name': 'Example'}])
+    db.session.execute(Job.__table__.insert(), [{
+        'id': 1, 'employer_id': 1, 'title': 'Backend developer', 'description': 'APIs',
+        'location': 'Tel Aviv', 'latitude': CENTER[0], 'longitude': CENTER[1],
+        'status': Job.STATUS_ACTIVE, 'required_skills': ['Python', 'SQL'],
+    }])
+    rows = [
+        {'id': i + 1, 'telegram_user_id': str(100000 + i),
+         'latitude': float(latitudes[i]), 'longitude': float(longitudes[i]),
+         'skills': {'technical_skills': list(rng.choice(SKILLS, 3, replace=False))},
+         'job_preferences': {'max_distance': int(rng.choice([10, 25, 50, 100]))}}
+        for i in range(seekers)
+    ]
+    for start in range(0, seekers, 10000):
+        db.session.execute(JobSeeker.__table__.insert(), rows[start:start + 10000])
+    db.session.commit()
+
+
+def run(seekers: int, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(directory, 'alerts.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.metadata.create_all(db.engine, tables=[
+                Employer.__table__, Job.__table__, JobSeeker.__table__, JobAlert.__table__
+            ])
+            populate(seekers)
+            fanout = JobAlertFanout(batch_size=batch_size, notify=lambda notifications: None)
+
+            start = time.perf_counter()
+            alerted = fanout.process(1)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            fanout.process(1)
+            again = time.perf_counter() - start
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{'run':<14} {'seekers':>8} {'alerted':>8} {'seconds':>8} {'seekers/s':>10}")
+    print(f"{'activation':<14} {seekers:>8} {alerted:>8} {first:>8.3f} {seekers / first:>10.0f}")
+    print(f"{'reactivation':<14} {seekers:>8} {0:>8} {again:>8.3f} {seekers / again:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seekers', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.seekers, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
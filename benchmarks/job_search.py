@@ -0,0 +1,83 @@
+"""
+Benchmark of JobTextIndex query latency.
+
+Builds an on-disk index of synthetic job postings with about 1M postings
+and reports median and 95th percentile latency of 1-3 keyword queries.
+
+    python -m benchmarks.job_search [--postings 1000000] [--queries 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from services.search.job_text_index import JobTextIndex
+
+VOCABULARY_SIZE = 20_000
+TITLE_WORDS = 4
+DESCRIPTION_WORDS = 80
+
+
+def synthetic_words(size: int):
+    """Distinct alphabetic words the stemmer leaves alone"""
+    letters = 'abcdfghjklmnpqrtvwxz'
+    return [
+        'q' + ''.join(letters[(i // 20 ** j) % 20] for j in range(4))
+        for i in range(size)
+    ]
+
+
+def synthetic_jobs(postings: int, words, seed: int = 0):
+    """Jobs with Zipf-distributed words until about ``postings`` postings exist"""
+    rng = np.random.default_rng(seed)
+    total = job_id = 0
+    while total < postings:
+        job_id += 1
+        ids = np.minimum(rng.zipf(1.2, size=TITLE_WORDS + DESCRIPTION_WORDS), len(words)) - 1
+        title = ' '.join(words[i] for i in ids[:TITLE_WORDS])
+        description = ' '.join(words[i] for i in ids[TITLE_WORDS:])
+        total += len(set(ids.tolist()))
+        yield job_id, title, description
+
+
+def run(postings: int, queries: int, limit: int = 20) -> None:
+    words = synthetic_words(VOCABULARY_SIZE)
+    with tempfile.TemporaryDirectory() as directory:
+        index = JobTextIndex(os.path.join(directory, 'job_search.db'))
+        index._loaded = True  # built below, not from the database
+
+        start = time.perf_counter()
+        jobs = index.bulk_load(synthetic_jobs(postings, words))
+        build = time.perf_counter() - start
+        stored = index.connection.execute('SELECT COUNT(*) FROM postings').fetchone()[0]
+        print(f"indexed {jobs:,} jobs, {stored:,} postings in {build:.1f}s")
+
+        rng = np.random.default_rng(1)
+        timings = []
+        for _ in range(queries):
+            # Mix frequent and rare terms like real keyword queries
+            ids = rng.integers(0, 2000, size=rng.integers(1, 4))
+            query = ' '.join(words[i] for i in ids)
+            start = time.perf_counter()
+            index.search(query, limit=limit)
+            timings.append(time.perf_counter() - start)
+        index.close()
+
+    timings = np.array(timings) * 1000
+    print(f"{'queries':>10} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    print(f"{queries:>10} {np.percentile(timings, 50):>10.2f} "
+          f"{np.percentile(timings, 95):>10.2f} {timings.max():>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--postings', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+    run(args.postings, args.queries)
+
+
+if __name__ == '__main__':
+    main()
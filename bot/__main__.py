@@ -39,8 +39,9 @@ async def main():
         for sig in (signal.SIGINT, signal.SIGTERM):
             signal.signal(sig, signal_handler)
         
-        # Start bot
-        application = await start_bot()
+        # Start bot on the app its handlers share
+        from app import create_app
+        application = await start_bot(await create_app())
         if not application:
             logger.error("Failed to start bot")
             return
@@ -46,6 +46,17 @@ class BaseCommand:
         else:
             self.logger.error(f"Unexpected error: {error_message}", exc_info=True)
 
+    async def run_query(self, fn, *args, **kwargs) -> Any:
+        """Await blocking database work off the event loop (see ``BotRuntime.run``)"""
+        from bot.runtime import bot_runtime
+        return await bot_runtime.run(fn, *args, **kwargs)
+
+    def reply(self, update, context, text: str, **kwargs):
+        """Queue a reply on the rate-limited send queue (see ``bot.send_queue``)"""
+        from bot.send_queue import send_queue
+        send_queue.start(context.bot)
+        return send_queue.enqueue(update.effective_chat.id, text, **kwargs)
+
     async def get_db_session(self, tenant_id: Optional[str] = None):
         """Get database session based on tenant ID"""
         try:
@@ -1,9 +1,58 @@
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from typing import List, Optional, Tuple
+from telegram import Update
 from telegram.ext import ContextTypes
-from models import Job, JobSeeker
-from app.services.cv_matcher import calculate_job_match
+from bot.job_cards import job_card_cache, job_card_keyboard
+from models import JobRecommendation, JobSeeker
+from services.matching.ranking import RankingCursor
+from services.matching.recommendations import recommendation_builder
+from services.search.search_sessions import Key, SearchSessionStore
 from .base_command import BaseCommand
 
+MIN_MATCH_SCORE = 75
+MAX_RESULTS = 5
+# Matched jobs are paged from a ranking session; the key of the last job
+# shown is kept in user_data so "/jobs more" resumes the ranking after it
+JOBS_CURSOR_KEY = 'jobs_cursor'
+
+# Rankings of the users' stored recommendations, by Telegram user id
+job_rankings = SearchSessionStore()
+
+
+def _seeker_profile(telegram_id: str) -> Tuple[Optional[int], bool]:
+    """The job seeker id of a Telegram user and whether a CV was uploaded"""
+    from extensions import db
+
+    table = JobSeeker.__table__
+    job_seeker = db.session.execute(
+        table.select()
+        .with_only_columns(table.c.id, table.c.resume_path, table.c.recommendations_computed_at)
+        .where(table.c.telegram_user_id == telegram_id)
+    ).first()
+    if not job_seeker:
+        return None, False
+    if job_seeker.recommendations_computed_at is None and job_seeker.resume_path:
+        # Recommendations are kept up to date in the background; only a
+        # seeker who was never scored is scored here, once
+        recommendation_builder.rescore_seeker(job_seeker.id)
+    return job_seeker.id, bool(job_seeker.resume_path)
+
+
+def _seeker_ranking(job_seeker_id: int) -> RankingCursor:
+    """The seeker's stored recommendations above the threshold, best first"""
+    scores = JobRecommendation.scores_for_seeker(job_seeker_id, min_score=MIN_MATCH_SCORE)
+    # Only the pages asked for are taken off the heap
+    return RankingCursor(scores, score=scores.__getitem__, tiebreak=int)
+
+
+def _page_messages(page: List[Key]) -> List[Tuple[int, str]]:
+    """``(job_id, message)`` of the ``(-score, job_id)`` keys of a page"""
+    # Cards come rendered from the cache; missing ones are rendered in one query
+    cards = job_card_cache.get_many(job_id for _, job_id in page)
+    return [
+        (job_id, f"Match Score: {-negated_score}%\n{cards[job_id].summary}")
+        for negated_score, job_id in page if job_id in cards
+    ]
+
 
 class JobsCommand(BaseCommand):
     """Command handler for showing available jobs matching user's profile"""
@@ -13,53 +62,60 @@ class JobsCommand(BaseCommand):
         """Show available jobs that match the user's profile with 75% or higher match rate"""
         self.log_command_execution("jobs")
 
+        if context.args and context.args[0].lower() == 'more':
+            await self.show_more(update, context)
+            return
+
         # Get the JobSeeker profile
-        job_seeker = JobSeeker.query.filter_by(telegram_id=str(update.effective_user.id)).first()
-        
-        if not job_seeker:
-            await update.message.reply_text(
+        job_seeker_id, has_resume = await self.run_query(
+            _seeker_profile, str(update.effective_user.id))
+
+        if not job_seeker_id:
+            self.reply(update, context,
                 "Please set up your profile first with /profile command"
             )
             return
-        
-        if not job_seeker.resume_path:
-            await update.message.reply_text(
+
+        if not has_resume:
+            self.reply(update, context,
                 "Please upload your CV first using /profile command"
             )
             return
 
-        # Get active jobs and calculate match score for each
-        active_jobs = Job.query.filter_by(status='active').all()
-        matched_jobs = []
-        
-        for job in active_jobs:
-            match_score = calculate_job_match(job_seeker, job)
-            if match_score >= 75:  # Only include jobs with 75% or higher match
-                matched_jobs.append((job, match_score))
-        
-        # Sort by match score descending
-        matched_jobs.sort(key=lambda x: x[1], reverse=True)
-        
-        if not matched_jobs:
-            await update.message.reply_text(
+        session = job_rankings.start(
+            update.effective_user.id, await self.run_query(_seeker_ranking, job_seeker_id))
+
+        if not session:
+            context.user_data.pop(JOBS_CURSOR_KEY, None)
+            self.reply(update, context,
                 "No highly matching jobs found at the moment.\n"
                 "Try updating your profile or checking back later."
             )
             return
-            
-        for job, match_score in matched_jobs[:5]:  # Show top 5 matching jobs
-            keyboard = [[
-                InlineKeyboardButton("Apply", callback_data=f"apply_{job.id}"),
-                InlineKeyboardButton("More Info", callback_data=f"info_{job.id}")
-            ]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            message = (
-                f"Match Score: {match_score}%\n"
-                f"🏢 {job.employer.company_name}\n"
-                f"📋 {job.title}\n"
-                f"📍 {job.location}\n\n"
-                f"{job.description[:200]}..."
+
+        await self.send_page(update, context, session, None)
+
+    async def show_more(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Continue the user's last ranking after the last job shown"""
+        session = job_rankings.get(update.effective_user.id)
+        after = context.user_data.get(JOBS_CURSOR_KEY)
+        if not session or not after or after[0] != session.token:
+            context.user_data.pop(JOBS_CURSOR_KEY, None)
+            self.reply(update, context,
+                "No more matching jobs. Use /jobs to search again."
             )
-            
-            await update.message.reply_text(message, reply_markup=reply_markup)
\ No newline at end of file
+            return
+        await self.send_page(update, context, session, tuple(after[1:]))
+
+    async def send_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE, session, after):
+        """Send the matched jobs of a ranking session following the ``after`` key"""
+        page, has_more = session.page_after(after, MAX_RESULTS)
+        for job_id, message in await self.run_query(_page_messages, page):
+            self.reply(update, context, message, parse_mode='Markdown',
+                       reply_markup=job_card_keyboard(job_id))
+
+        if has_more:
+            context.user_data[JOBS_CURSOR_KEY] = (session.token, *page[-1])
+            self.reply(update, context, "Use /jobs more to see more matching jobs.")
+        else:
+            context.user_data.pop(JOBS_CURSOR_KEY, None)
@@ -3,10 +3,23 @@ from typing import Dict, Any
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 from bot.commands.base_command import BaseCommand
+from extensions import db
 from models.job_seeker import JobSeeker
+from bot.resume_pipeline import save_profile
 
 logger = logging.getLogger(__name__)
 
+
+def _is_registered(telegram_id: str) -> bool:
+    table = JobSeeker.__table__
+    return db.session.execute(
+        table.select().with_only_columns(table.c.id).where(table.c.telegram_user_id == telegram_id)
+    ).first() is not None
+
+
+def _create_job_seeker(telegram_id: str, location: str = None, **profile) -> None:
+    save_profile(telegram_id, preferred_location=location, **profile)
+
 class RegisterCommand(BaseCommand):
     # Conversation states
     FULL_NAME = 0
@@ -24,12 +37,7 @@ class RegisterCommand(BaseCommand):
         self.log_command_execution("register")
         
         # Check if user is already registered
-        session = await self.get_db_session()
-        existing_user = session.query(JobSeeker).filter_by(
-            telegram_id=str(update.effective_user.id)
-        ).first()
-        
-        if existing_user:
+        if await self.run_query(_is_registered, str(update.effective_user.id)):
             await update.message.reply_text(
                 "You are already registered! Use /search to look for jobs or /apply to apply for positions."
             )
@@ -106,8 +114,8 @@ class RegisterCommand(BaseCommand):
         
         # Save user data to database
         try:
-            session = await self.get_db_session()
-            job_seeker = JobSeeker(
+            await self.run_query(
+                _create_job_seeker,
                 telegram_id=str(update.effective_user.id),
                 full_name=self.user_data['full_name'],
                 phone_number=self.user_data['phone_number'],
@@ -116,8 +124,6 @@ class RegisterCommand(BaseCommand):
                 latitude=self.user_data['latitude'],
                 longitude=self.user_data['longitude']
             )
-            session.add(job_seeker)
-            await self.commit_transaction()
             
             await update.message.reply_text(
                 "Registration complete! You can now use /search to look for jobs and /apply to submit applications."
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from services.ai.cover_letter_generator import fallback_cover_letter, request_cover_letter
+from .runtime import BotRuntime, bot_runtime
+
+logger = logging.getLogger(__name__)
+
+# Cover letters requested from the AI backend at once
+COVER_LETTER_WORKERS = int(os.environ.get('COVER_LETTER_WORKERS', 4))
+
+# Applications waiting for a cover letter; beyond it they stay pending until
+# the next start picks them up
+COVER_LETTER_QUEUE_SIZE = int(os.environ.get('COVER_LETTER_QUEUE_SIZE', 1000))
+
+# Attempts at the AI backend before a template letter is used, and the delay
+# before the first retry, doubled after each
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 2.0
+
+# Seconds workers get to finish queued cover letters when the bot stops
+DRAIN_TIMEOUT = 30.0
+
+READY_TEXT = ("📝 Your cover letter for {title} at {company} is ready "
+              "and attached to your application.")
+
+
+def candidate_info(skills: Any, name: Optional[str] = None) -> Dict[str, Any]:
+    """Candidate details for ``generate_cover_letter`` from a job seeker's skills JSON"""
+    technical, soft, experience, education = [], [], [], []
+    if isinstance(skills, dict):
+        technical = (skills.get('technical_skills') or skills.get('extracted_skills')
+                     or skills.get('default_skills') or [])
+        soft = skills.get('soft_skills') or []
+        experience = skills.get('experience') or []
+        education = skills.get('education') or []
+    elif isinstance(skills, list):
+        technical = skills
+    info = {
+        'technical_skills': [str(skill) for skill in technical if isinstance(skill, str)],
+        'soft_skills': [str(skill) for skill in soft if isinstance(skill, str)],
+        'experience': [str(item) for item in experience],
+        'education': [str(item) for item in education],
+    }
+    if name:
+        info['name'] = name
+    return info
+
+
+def profile_hash(candidate: Dict[str, Any]) -> str:
+    """Cache key of the candidate details a cover letter is written from"""
+    return hashlib.sha256(json.dumps(candidate, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class CoverLetterRequest:
+    """An application waiting for its cover letter"""
+    application_id: int
+    chat_id: int
+    job_id: int
+    job_revision: int
+    candidate: Dict[str, Any]
+    job: Dict[str, str]  # title, company, description
+
+
+def _cached_cover_letter(key: str, job_id: int, job_revision: int) -> Optional[str]:
+    from extensions import db
+    from models import CoverLetterCache
+
+    table = CoverLetterCache.__table__
+    return db.session.execute(
+        table.select().with_only_columns(table.c.cover_letter).where(
+            table.c.profile_hash == key, table.c.job_id == job_id,
+            table.c.job_revision == job_revision)
+    ).scalar()
+
+
+def _store_cover_letter(request: CoverLetterRequest, cover_letter: str, status: str,
+                        cache_key: Optional[str]) -> None:
+    """Fill in the application's cover letter, and cache it under ``cache_key`` if given"""
+    from extensions import db
+    from models import Application, CoverLetterCache
+
+    applications = Application.__table__
+    db.session.execute(applications.update().where(applications.c.id == request.application_id)
+                       .values(cover_letter=cover_letter, cover_letter_status=status,
+                               updated_at=datetime.utcnow()))
+    if cache_key:
+        cache = CoverLetterCache.__table__
+        db.session.execute(cache.delete().where(cache.c.profile_hash == cache_key,
+                                                cache.c.job_id == request.job_id))
+        db.session.execute(cache.insert(), [{
+            'profile_hash': cache_key, 'job_id': request.job_id,
+            'job_revision': request.job_revision, 'cover_letter': cover_letter,
+            'created_at': datetime.utcnow(),
+        }])
+    db.session.commit()
+
+
+def _pending_requests(limit: int) -> List[CoverLetterRequest]:
+    """Requests for applications still waiting for a cover letter, oldest first"""
+    from extensions import db
+    from models import Application, Employer, Job, JobSeeker
+
+    applications, jobs = Application.__table__, Job.__table__
+    employers, seekers = Employer.__table__, JobSeeker.__table__
+    rows = db.session.execute(
+        applications.select()
+        .with_only_columns(applications.c.id, applications.c.telegram_user_id, jobs.c.id.label('job_id'),
+                           jobs.c.revision, jobs.c.title, jobs.c.description, employers.c.company_name,
+                           seekers.c.skills, seekers.c.first_name, seekers.c.last_name)
+        .join(jobs, jobs.c.id == applications.c.job_id)
+        .join(employers, employers.c.id == jobs.c.employer_id)
+        .outerjoin(seekers, seekers.c.telegram_user_id == applications.c.telegram_user_id)
+        .where(applications.c.cover_letter_status == Application.COVER_LETTER_PENDING)
+        .order_by(applications.c.id)
+        .limit(limit)
+    ).all()
+    return [
+        CoverLetterRequest(
+            application_id=row.id, chat_id=int(row.telegram_user_id), job_id=row.job_id,
+            job_revision=row.revision,
+            candidate=candidate_info(row.skills, ' '.join(filter(None, [row.first_name, row.last_name]))),
+            job={'title': row.title, 'company': row.company_name, 'description': row.description or ''})
+        for row in rows
+    ]
+
+
+class CoverLetterQueue:
+    """
+    Writes the cover letters of applications after they were created.
+
+    ``/apply`` creates the application with a pending cover letter and
+    ``submit``s a request; ``workers`` tasks take requests from a bounded
+    queue, so at most that many calls to the AI backend are in flight, all
+    over one pooled HTTP client. Letters are cached by (profile hash, job)
+    for the job's current revision, so re-applying or retrying with an
+    unchanged profile does not call the backend again. After
+    ``MAX_ATTEMPTS`` failed calls the application gets the template letter,
+    which is not cached. Applications left pending by a full queue or a
+    restart are queued again by ``start``.
+    """
+
+    def __init__(self, runtime: BotRuntime = bot_runtime, workers: int = COVER_LETTER_WORKERS,
+                 queue_size: int = COVER_LETTER_QUEUE_SIZE,
+                 generate: Callable[..., Awaitable[Optional[str]]] = request_cover_letter,
+                 retry_delay: float = RETRY_DELAY):
+        self.runtime = runtime
+        self.workers = workers
+        self.queue_size = queue_size
+        self.generate = generate
+        self.retry_delay = retry_delay
+        self._notify: Optional[Callable[[int, str], Any]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self, notify: Optional[Callable[[int, str], Any]] = None,
+              requeue_pending: bool = True) -> None:
+        """Start the workers on the running loop; ``notify(chat_id, text)`` tells users a letter is ready"""
+        if self._tasks:
+            return
+        self._notify = notify
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=self.workers))
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if requeue_pending:
+            self._tasks.append(asyncio.create_task(self._requeue_pending()))
+
+    def submit(self, request: CoverLetterRequest) -> bool:
+        """Queue a request; False if the queue is full and the application stays pending"""
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            logger.warning(f"Cover letter queue full, application {request.application_id} stays pending")
+            return False
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued request is done"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Finish the queued requests, then stop the workers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cover letter queue stopped with {self._queue.qsize()} requests left pending")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._client.aclose()
+        self._client = None
+
+    async def process(self, request: CoverLetterRequest) -> str:
+        """Fill in the cover letter of ``request``'s application; returns its cover letter status"""
+        from models import Application
+
+        key = profile_hash(request.candidate)
+        cover_letter = await self.runtime.run(_cached_cover_letter, key, request.job_id,
+                                              request.job_revision)
+        if cover_letter is not None:
+            status, cache_key = Application.COVER_LETTER_READY, None
+        else:
+            cover_letter = await self._generate(request)
+            if cover_letter is not None:
+                status, cache_key = Application.COVER_LETTER_READY, key
+            else:
+                cover_letter = fallback_cover_letter(request.candidate, request.job)
+                status, cache_key = Application.COVER_LETTER_FALLBACK, None
+
+        await self.runtime.run(_store_cover_letter, request, cover_letter, status, cache_key)
+        if self._notify is not None:
+            self._notify(request.chat_id, READY_TEXT.format(**request.job))
+        return status
+
+    async def _generate(self, request: CoverLetterRequest) -> Optional[str]:
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                cover_letter = await self.generate(request.candidate, request.job, client=self._client)
+                if cover_letter:
+                    return cover_letter
+                logger.warning(f"Empty cover letter for application {request.application_id}")
+            except Exception as e:
+                logger.error(f"Cover letter attempt {attempt + 1} for application "
+                             f"{request.application_id} failed: {e}")
+        return None
+
+    async def _requeue_pending(self) -> None:
+        try:
+            requests = await self.runtime.run(_pending_requests, self.queue_size)
+        except Exception as e:
+            logger.error(f"Failed to load applications pending a cover letter: {e}")
+            return
+        for request in requests:
+            if not self.submit(request):
+                break
+        if requests:
+            logger.info(f"Queued {len(requests)} applications pending a cover letter")
+
+    async def _work(self) -> None:
+        while True:
+            request = await self._queue.get()
+            try:
+                await self.process(request)
+            except Exception as e:
+                logger.error(f"Error writing cover letter of application {request.application_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+# Global instance
+cover_letter_queue = CoverLetterQueue()
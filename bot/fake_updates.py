@@ -0,0 +1,100 @@
+"""
+Fake Telegram updates for exercising the webhook server locally.
+
+Posts synthetic message updates from a pool of users to a running webhook
+server with its secret token, as Telegram would, and reports the response
+statuses, the request rate and the server's metrics afterwards.
+
+    python -m bot.fake_updates --url http://localhost:8443/telegram/webhook \\
+        --secret "$TELEGRAM_BOT_WEBHOOK_SECRET" [--count 1000] [--users 100] [--concurrency 40]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import aiohttp
+
+from bot.webhook import SECRET_HEADER
+
+COMMANDS = ('/start', '/search', '/search 25', '/search more', '/find python developer',
+            '/find more', '/apply 1', '/jobs')
+
+
+def fake_message_update(update_id: int, user_id: int, text: str,
+                        date: Optional[int] = None) -> Dict:
+    """JSON of a private chat message update as Telegram sends it"""
+    user = {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'}
+    message = {
+        'message_id': update_id,
+        'date': int(time.time()) if date is None else date,
+        'chat': {'id': user_id, 'type': 'private', 'first_name': user['first_name']},
+        'from': user,
+        'text': text,
+    }
+    if text.startswith('/'):
+        message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                'length': len(text.split()[0])}]
+    return {'update_id': update_id, 'message': message}
+
+
+def fake_updates(count: int, users: int = 100, texts: Sequence[str] = COMMANDS,
+                 seed: int = 0, first_update_id: int = 1) -> Iterator[Dict]:
+    """``count`` message updates from ``users`` random users"""
+    rng = random.Random(seed)
+    for update_id in range(first_update_id, first_update_id + count):
+        yield fake_message_update(update_id, 10_000 + rng.randrange(users), rng.choice(texts))
+
+
+async def post_updates(url: str, secret_token: str, updates: Iterable[Dict],
+                       concurrency: int = 40) -> Tuple[Counter, float]:
+    """Post updates with ``concurrency`` connections; returns status counts and seconds taken"""
+    statuses: Counter = Counter()
+    updates = iter(updates)
+    lock = asyncio.Lock()
+
+    async def connection(session: aiohttp.ClientSession):
+        while True:
+            async with lock:
+                update = next(updates, None)
+            if update is None:
+                return
+            try:
+                async with session.post(url, json=update, headers={SECRET_HEADER: secret_token}) as response:
+                    statuses[response.status] += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] += 1
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(connection(session) for _ in range(concurrency)))
+    return statuses, time.perf_counter() - start
+
+
+async def run(url: str, secret_token: str, count: int, users: int, concurrency: int) -> None:
+    statuses, elapsed = await post_updates(url, secret_token, fake_updates(count, users), concurrency)
+    print(f"posted {count} updates in {elapsed:.2f}s ({count / elapsed:.0f}/s)")
+    for status, n in sorted(statuses.items(), key=lambda item: str(item[0])):
+        print(f"  {status}: {n}")
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url.rstrip('/') + '/metrics') as response:
+            if response.status == 200:
+                for name, value in (await response.json()).items():
+                    print(f"  {name}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--secret', required=True)
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.secret, args.count, args.users, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,38 @@
 import logging
-from telegram import Update, KeyboardButton, ReplyKeyboardMarkup
+from telegram import (Update, KeyboardButton, ReplyKeyboardMarkup,
+                      InlineKeyboardButton, InlineKeyboardMarkup)
 from telegram.ext import ContextTypes, ConversationHandler, filters
 from models import JobSeeker, Job, Application, Employer
 from .decorators import monitor_handler, async_error_handler
-from services.file_service import save_resume
+from .runtime import bot_runtime
+from .send_queue import send_queue
+from .resume_pipeline import ResumeJob, progress_text, resume_pipeline
+from .cover_letter_queue import CoverLetterRequest, candidate_info, cover_letter_queue
+from .job_cards import callback_job_id, job_card_cache, job_card_keyboard
 
 logger = logging.getLogger(__name__)
 
 # Define conversation states
 FULL_NAME, PHONE_NUMBER, LOCATION, RESUME = range(4)
 
+# Jobs shown per /search page. Ranked results live in a search session
+# (services.search.search_sessions); "Next page" buttons carry the keyset
+# key of the page's last job, which is also kept in user_data for "/search more"
+SEARCH_PAGE_SIZE = 5
+SEARCH_CURSOR_KEY = 'search_cursor'
+SEARCH_PAGE_CALLBACK = 'search'
+
+# Jobs shown per /find page; the last query and offset are kept in user_data
+# so "/find more" continues it
+FIND_PAGE_SIZE = 5
+FIND_QUERY_KEY = 'find_query'
+
+def _reply(context: ContextTypes.DEFAULT_TYPE, message, text: str, **kwargs):
+    """Queue a reply to ``message`` on the rate-limited send queue (see ``SendQueue.enqueue``)"""
+    send_queue.start(context.bot)
+    return send_queue.enqueue(message.chat_id, text, **kwargs)
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send welcome message when /start command is issued"""
     logger.info("Start command received")
@@ -29,23 +52,24 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             "Available commands:\n"
             "🔹 /register - Create your profile\n"
             "🔹 /search - Find jobs near you\n"
+            "🔹 /find <keywords> - Search jobs by keywords\n"
             "🔹 /apply <job_id> - Apply for a specific job\n"
             "🔹 /cancel - Cancel current operation\n\n"
             "Let's get started! Use /register to create your profile."
         )
         
-        await update.message.reply_text(welcome_message)
+        _reply(context, update.message, welcome_message)
         logger.info(f"Start command response sent to user {user_id}")
         
     except Exception as e:
         logger.error(f"Error in start command: {e}")
-        await update.message.reply_text(
+        _reply(context, update.message,
             "😔 Sorry, something went wrong. Please try /start again.")
 
 
 async def register(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the registration process"""
-    await update.message.reply_text(
+    _reply(context, update.message,
         "Let's create your profile! First, please send me your full name.")
     return FULL_NAME
 
@@ -54,7 +78,7 @@ async def handle_full_name(update: Update,
                            context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle the full name input"""
     context.user_data['full_name'] = update.message.text
-    await update.message.reply_text(
+    _reply(context, update.message,
         "Please share your phone number in the format +1234567890 📱")
     return PHONE_NUMBER
 
@@ -64,7 +88,7 @@ async def handle_phone_number(update: Update,
     """Handle the phone number input"""
     phone = update.message.text
     if not phone.startswith('+') or not phone[1:].isdigit():
-        await update.message.reply_text(
+        _reply(context, update.message,
             "Please enter a valid phone number starting with + (e.g., +1234567890)"
         )
         return PHONE_NUMBER
@@ -74,7 +98,7 @@ async def handle_phone_number(update: Update,
         [[KeyboardButton('Share Location 📍', request_location=True)]],
         one_time_keyboard=True,
         resize_keyboard=True)
-    await update.message.reply_text(
+    _reply(context, update.message,
         "Please share your location to help find jobs near you.\n"
         "Click the 'Share Location' button below 👇",
         reply_markup=location_keyboard)
@@ -87,50 +111,40 @@ async def handle_location(update: Update,
     try:
         location = update.message.location
         if not location:
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "Please share your location using the button below.")
             return LOCATION
 
         context.user_data['latitude'] = location.latitude
         context.user_data['longitude'] = location.longitude
 
-        await update.message.reply_text(
+        _reply(context, update.message,
             "Perfect! Finally, please send your resume as a PDF file.")
         return RESUME
     except Exception as e:
         logging.error(f"Error handling location: {str(e)}")
-        await update.message.reply_text(
+        _reply(context, update.message,
             "There was an error processing your location. Please try again.")
         return LOCATION
 
 
 async def handle_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle the resume upload with proper database operations"""
-    from app import create_app
-    from extensions import db
-    from services.file_service import extract_skills
+    """Acknowledge the resume upload and queue it for processing"""
     logger = logging.getLogger(__name__)
 
-    app = await create_app()
-    if not app:
-        logger.error("Failed to create application context")
-        await update.message.reply_text(
-            "An error occurred. Please try again later.")
-        return ConversationHandler.END
-
     try:
         # Initial validation
         if not update.message.document:
             logger.warning(
                 f"No document provided by user {update.effective_user.id}")
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "Please send your resume as a PDF file.")
             return ConversationHandler.END
 
         if not update.message.document.file_name.lower().endswith('.pdf'):
             logger.warning(
                 f"Non-PDF file uploaded by user {update.effective_user.id}")
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "Please upload your resume in PDF format only.")
             return ConversationHandler.END
 
@@ -149,84 +163,30 @@ async def handle_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
             logger.error(
                 f"Missing required fields for user {update.effective_user.id}: {missing_fields}"
             )
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "Some information is missing. Please start registration again with /register"
             )
             return ConversationHandler.END
 
-        # Save resume file
-        file = await update.message.document.get_file()
-        logger.info(f"Got file object for user {update.effective_user.id}")
-        resume_path = await save_resume(file, update.effective_user.id)
-        logger.info(f"Resume saved at {resume_path}")
-
-        # Extract skills with better error handling
-        skills = {"default_skills": ["general"]}  # Default skills
-        try:
-            extracted_skills = await extract_skills(resume_path)
-            if extracted_skills:
-                if isinstance(extracted_skills, str):
-                    skills = {"extracted_skills": [extracted_skills]}
-                elif isinstance(extracted_skills, (list, dict)):
-                    skills = extracted_skills
-                logger.info(f"Skills extracted successfully: {skills}")
-        except Exception as skill_error:
-            logger.error(f"Error extracting skills: {str(skill_error)}")
-            # Continue with default skills
-
-        # Database operations
-        if not app:
-            logger.error("Failed to create application context")
-            await update.message.reply_text(
-                "System error: Unable to access application context. "
-                "Please try again later.")
-            return ConversationHandler.END
-
-        with app.app_context():  # Use regular context manager
-            try:
-                # Check for existing profile
-                existing_profile = JobSeeker.query.filter_by(
-                    telegram_id=str(update.effective_user.id)).first()
-
-                if existing_profile:
-                    logger.info(
-                        f"Updating existing profile for user {update.effective_user.id}"
-                    )
-                    existing_profile.full_name = context.user_data['full_name']
-                    existing_profile.phone_number = context.user_data[
-                        'phone_number']
-                    existing_profile.resume_path = resume_path
-                    existing_profile.skills = skills
-                    existing_profile.latitude = context.user_data['latitude']
-                    existing_profile.longitude = context.user_data['longitude']
-                else:
-                    logger.info(
-                        f"Creating new profile for user {update.effective_user.id}"
-                    )
-                    new_job_seeker = JobSeeker(
-                        telegram_id=str(update.effective_user.id),
-                        full_name=context.user_data['full_name'],
-                        phone_number=context.user_data['phone_number'],
-                        resume_path=resume_path,
-                        skills=skills,
-                        latitude=context.user_data['latitude'],
-                        longitude=context.user_data['longitude'])
-                    db.session.add(new_job_seeker)
-
-                db.session.commit()
-                logger.info(
-                    f"Successfully saved profile for user {update.effective_user.id}"
-                )
-
-                await update.message.reply_text(
-                    "Registration complete! 🎉\n"
-                    "Use /search to find jobs in your area.")
-                return ConversationHandler.END
-
-            except Exception as db_error:
-                logger.error(f"Database error: {str(db_error)}")
-                db.session.rollback()
-                raise
+        # Download, text extraction, OCR and skill extraction run in the
+        # resume pipeline; the acknowledgement is edited with its progress
+        resume_pipeline.start(context.bot)
+        if resume_pipeline.is_full:
+            _reply(context, update.message,
+                "We're processing a lot of resumes right now. "
+                "Please send yours again in a few minutes.")
+            return RESUME
+
+        job = ResumeJob(
+            user_id=update.effective_user.id,
+            chat_id=update.message.chat_id,
+            file_id=update.message.document.file_id,
+            profile={field: context.user_data[field] for field in required_fields})
+        # Sent on its own, as the progress edits replace its whole text
+        job.progress = _reply(context, update.message, progress_text(0), coalesce=False)
+        resume_pipeline.submit(job)
+        logger.info(f"Queued resume of user {update.effective_user.id}")
+        return ConversationHandler.END
 
     except Exception as e:
         error_msg = str(e)
@@ -235,162 +195,404 @@ async def handle_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         
         if "app_context" in error_msg:
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "System error: Unable to access application context. "
                 "Please try again later.")
         else:
-            await update.message.reply_text(
+            _reply(context, update.message,
                 "Sorry, there was an error processing your registration. "
                 "Please try again with /register")
         return ConversationHandler.END
 
 
+def _seeker_location(telegram_id: str):
+    """Coordinates of a registered job seeker, None if not registered"""
+    from extensions import db
+
+    table = JobSeeker.__table__
+    job_seeker = db.session.execute(
+        table.select().with_only_columns(table.c.latitude, table.c.longitude)
+        .where(table.c.telegram_user_id == telegram_id)
+    ).first()
+    if job_seeker is None:
+        return None
+    return job_seeker.latitude, job_seeker.longitude
+
+
 @monitor_handler
 @async_error_handler
 async def handle_job_search(update: Update,
                             context: ContextTypes.DEFAULT_TYPE):
     """Handle job search command with proper monitoring and error handling"""
-    from app import create_app
-    app = await create_app()
+    from services.geo_service import rank_nearby_jobs
+    from services.search.search_sessions import search_sessions
 
+    user_id = update.effective_user.id
+    show_more = bool(context.args) and context.args[0].lower() == 'more'
     try:
-        radius = float(context.args[0]) if context.args else 15
+        radius = float(context.args[0]) if context.args and not show_more else 15
     except (ValueError, IndexError):
         radius = 15
 
     try:
-        with app.app_context():
-            job_seeker = JobSeeker.query.filter_by(
-                telegram_id=str(update.effective_user.id)).first()
-
-            if not job_seeker:
-                await update.message.reply_text(
-                    "⚠️ Please register first using /register command.\n"
-                    "This will help us find jobs near you!")
+        if show_more:
+            # Same as pressing the last "Next page" button
+            session = search_sessions.get(user_id)
+            after = context.user_data.get(SEARCH_CURSOR_KEY)
+            if not session or not after or after[0] != session.token:
+                _reply(context, update.message,
+                    "No more jobs from your last search.\n"
+                    "Use /search <radius> to start a new search.")
                 return
+            await _send_search_page(update.message, context, session, after[1:])
+            return
 
-            if not job_seeker.latitude or not job_seeker.longitude:
-                await update.message.reply_text(
-                    "📍 Please share your location to find nearby jobs.\n"
-                    "Use /register to update your location.")
-                return
+        location = await bot_runtime.run(_seeker_location, str(user_id))
 
-            await update.message.reply_text(
-                "🔍 Searching for jobs in your area...")
+        if location is None:
+            _reply(context, update.message,
+                "⚠️ Please register first using /register command.\n"
+                "This will help us find jobs near you!")
+            return
 
-            nearby_jobs = get_nearby_jobs(job_seeker.latitude,
-                                          job_seeker.longitude, int(radius))
+        latitude, longitude = location
+        if not latitude or not longitude:
+            _reply(context, update.message,
+                "📍 Please share your location to find nearby jobs.\n"
+                "Use /register to update your location.")
+            return
 
-            if not nearby_jobs:
-                await update.message.reply_text(
-                    f"😔 No jobs found within {radius}km of your location.\n\n"
-                    "We'll notify you when new positions become available!\n\n"
-                    "💡 Tip: Try expanding your search radius using /search <radius>\n"
-                    "Example: /search 25 to search within 25km")
-                return
+        _reply(context, update.message,
+            "🔍 Searching for jobs in your area...")
 
-            await update.message.reply_text(
-                f"🎉 Found {len(nearby_jobs)} jobs near you!")
+        # Distances are computed once; later pages resume the stored ranking
+        session = search_sessions.start(
+            user_id, await bot_runtime.run(rank_nearby_jobs, latitude, longitude, radius), radius)
 
-            for job in nearby_jobs[:5]:  # Limit to 5 jobs per search
-                employer_name = db.session.merge(job).employer.company_name
-                await update.message.reply_text(
-                    f"🏢 *{job.title}*\n"
-                    f"🏗 _{employer_name}_\n"
-                    f"📍 {job.location} ({job.distance:.1f}km away)\n"
-                    f"💼 Description:\n{job.description}\n\n"
-                    f"📝 To apply, use /apply {job.id}",
-                    parse_mode='Markdown')
+        if not session:
+            search_sessions.end(user_id)
+            _reply(context, update.message,
+                f"😔 No jobs found within {radius}km of your location.\n\n"
+                "We'll notify you when new positions become available!\n\n"
+                "💡 Tip: Try expanding your search radius using /search <radius>\n"
+                "Example: /search 25 to search within 25km")
+            return
 
-            if len(nearby_jobs) > 5:
-                await update.message.reply_text(
-                    f"🔍 {len(nearby_jobs) - 5} more jobs available.\n"
-                    "Use /search again to see more results!")
+        _reply(context, update.message,
+            f"🎉 Found {len(session)} jobs near you! Closest first:")
+        await _send_search_page(update.message, context, session, None)
 
     except Exception as e:
         logging.error(f"Error in handle_job_search: {e}")
-        await update.message.reply_text(
+        _reply(context, update.message,
             "😓 Sorry, something went wrong while searching for jobs.\n"
             "Please try again later.")
 
 
 @monitor_handler
 @async_error_handler
-async def handle_application(update: Update,
-                             context: ContextTypes.DEFAULT_TYPE):
-    """Handle job application with monitoring and error handling"""
-    from app import create_app
-    app = await create_app()
+async def handle_search_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle a "Next page" button of a /search result list"""
+    from services.search.search_sessions import search_sessions
 
+    query = update.callback_query
     try:
-        if not context.args:
-            await update.message.reply_text("⚠️ Please specify a job ID.\n"
-                                            "Example: /apply 123")
+        _, token, distance, job_id = query.data.split(':')
+        after = (float(distance), int(job_id))
+    except ValueError:
+        await query.answer()
+        return
+
+    session = search_sessions.get(update.effective_user.id, token)
+    if session is None:
+        await query.answer("This search has expired. Use /search to start a new one.",
+                           show_alert=True)
+        return
+
+    await query.answer()
+    # The button is spent; the next page brings its own
+    await query.edit_message_reply_markup(reply_markup=None)
+    await _send_search_page(query.message, context, session, after)
+
+
+def _active_jobs(job_ids):
+    """Active jobs among ``job_ids`` with their employer's name, by id, in one query"""
+    from extensions import db
+
+    if not job_ids:
+        return {}
+    jobs, employers = Job.__table__, Employer.__table__
+    rows = db.session.execute(
+        jobs.select()
+        .with_only_columns(jobs.c.id, jobs.c.title, jobs.c.location, jobs.c.description,
+                           employers.c.company_name)
+        .join(employers, employers.c.id == jobs.c.employer_id)
+        .where(jobs.c.id.in_(job_ids), jobs.c.status == Job.STATUS_ACTIVE)
+    )
+    return {row.id: row for row in rows}
+
+
+def _search_page_texts(page):
+    """Messages for the jobs of a search page, skipping jobs no longer active"""
+    jobs = _active_jobs([job_id for _, job_id in page])
+    return [
+        f"🏢 *{job.title}*\n"
+        f"🏗 _{job.company_name}_\n"
+        f"📍 {job.location} ({distance:.1f}km away)\n"
+        f"💼 Description:\n{job.description}\n\n"
+        f"📝 To apply, use /apply {job.id}"
+        for distance, job in ((distance, jobs.get(job_id)) for distance, job_id in page)
+        if job is not None
+    ]
+
+
+async def _send_search_page(message, context, session, after):
+    """Send the jobs of a search session following the ``after`` key"""
+    page, has_more = session.page_after(after, SEARCH_PAGE_SIZE)
+    texts = await bot_runtime.run(_search_page_texts, page)
+    if not texts and not has_more:
+        _reply(context, message,
+            "No more jobs from your last search.\n"
+            "Use /search <radius> to start a new search.")
+
+    for text in texts:
+        _reply(context, message, text, parse_mode='Markdown')
+
+    if has_more:
+        last_distance, last_job_id = page[-1]
+        context.user_data[SEARCH_CURSOR_KEY] = (session.token, last_distance, last_job_id)
+        keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(
+            "Next page ➡️",
+            callback_data=f"{SEARCH_PAGE_CALLBACK}:{session.token}:{last_distance!r}:{last_job_id}"
+        )]])
+        _reply(context, message, "🔍 More jobs available.", reply_markup=keyboard)
+    else:
+        context.user_data.pop(SEARCH_CURSOR_KEY, None)
+
+
+def _find_texts(query: str, offset: int):
+    """Messages for a page of /find results and whether another page follows"""
+    from services.search.job_text_index import job_text_index
+    from services.search.near_duplicates import near_duplicate_index
+
+    # One extra result tells whether there is another page
+    ranked = job_text_index.search(query, limit=FIND_PAGE_SIZE + 1, offset=offset,
+                                   exclude=near_duplicate_index.superseded_ids())
+    has_more = len(ranked) > FIND_PAGE_SIZE
+    ranked = ranked[:FIND_PAGE_SIZE]
+    jobs = _active_jobs([job_id for job_id, _ in ranked])
+    texts = [
+        f"🏢 *{job.title}*\n"
+        f"🏗 _{job.company_name}_\n"
+        f"📍 {job.location}\n"
+        f"💼 Description:\n{job.description}\n\n"
+        f"📝 To apply, use /apply {job.id}"
+        for job in (jobs.get(job_id) for job_id, _ in ranked) if job is not None
+    ]
+    return texts, has_more
+
+
+@monitor_handler
+@async_error_handler
+async def handle_find(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /find <keywords>: full-text job search ranked by relevance"""
+    show_more = len(context.args or []) == 1 and context.args[0].lower() == 'more'
+    if show_more:
+        query, offset = context.user_data.get(FIND_QUERY_KEY, (None, 0))
+        if not query:
+            _reply(context, update.message,
+                "No more jobs from your last search.\n"
+                "Use /find <keywords> to start a new search.")
+            return
+    else:
+        query, offset = ' '.join(context.args or []).strip(), 0
+        if not query:
+            _reply(context, update.message,
+                "⚠️ Please tell me what to look for.\n"
+                "Example: /find python developer")
+            return
+
+    try:
+        texts, has_more = await bot_runtime.run(_find_texts, query, offset)
+
+        if not texts:
+            context.user_data.pop(FIND_QUERY_KEY, None)
+            _reply(context, update.message,
+                f"😔 No jobs found for \"{query}\".\n"
+                "💡 Tip: Try fewer or more general keywords.")
             return
 
-        with app.app_context():
-            job_id = int(context.args[0])
-            job_seeker = JobSeeker.query.filter_by(
-                telegram_id=str(update.effective_user.id)).first()
+        if not show_more:
+            _reply(context, update.message,
+                f"🎉 Jobs matching \"{query}\", most relevant first:")
 
-            if not job_seeker:
-                await update.message.reply_text(
-                    "⚠️ Please register first using /register command.\n"
-                    "This will help us create your profile!")
-                return
+        for text in texts:
+            _reply(context, update.message, text, parse_mode='Markdown')
 
-            job = Job.query.get(job_id)
-            if not job:
-                await update.message.reply_text(
-                    "❌ Job not found. Please check the job ID and try again.\n"
-                    "Use /search to see available jobs.")
-                return
+        if has_more:
+            context.user_data[FIND_QUERY_KEY] = (query, offset + FIND_PAGE_SIZE)
+            _reply(context, update.message,
+                "🔍 More jobs available.\n"
+                "Use /find more to see the next results!")
+        else:
+            context.user_data.pop(FIND_QUERY_KEY, None)
 
-            # Check if already applied
-            existing_application = Application.query.filter_by(
-                job_id=job.id, job_seeker_id=job_seeker.id).first()
+    except Exception as e:
+        logging.error(f"Error in handle_find: {e}")
+        _reply(context, update.message,
+            "😓 Sorry, something went wrong while searching for jobs.\n"
+            "Please try again later.")
 
-            if existing_application:
-                await update.message.reply_text(
-                    "📝 You have already applied for this position!\n"
-                    f"Current status: {existing_application.status}")
-                return
 
-            await update.message.reply_text(
-                "🤖 Generating your personalized cover letter...")
+def _application_details(telegram_id: str, job_id: int):
+    """
+    What an application of a Telegram user to a job needs, as
+    ``(refusal, details)``; ``refusal`` is the reply when it can't be made.
+    """
+    from extensions import db
 
-            # Generate cover letter using AI
-            cover_letter = generate_cover_letter(job_seeker.skills,
-                                                 job.description)
+    seekers, jobs = JobSeeker.__table__, Job.__table__
+    employers, applications = Employer.__table__, Application.__table__
+    job_seeker = db.session.execute(
+        seekers.select()
+        .with_only_columns(seekers.c.skills, seekers.c.first_name, seekers.c.last_name)
+        .where(seekers.c.telegram_user_id == telegram_id)
+    ).first()
+    if not job_seeker:
+        return ("⚠️ Please register first using /register command.\n"
+                "This will help us create your profile!"), None
+
+    job = db.session.execute(
+        jobs.select()
+        .with_only_columns(jobs.c.revision, jobs.c.title, jobs.c.description, employers.c.company_name)
+        .join(employers, employers.c.id == jobs.c.employer_id)
+        .where(jobs.c.id == job_id)
+    ).first()
+    if not job:
+        return ("❌ Job not found. Please check the job ID and try again.\n"
+                "Use /search to see available jobs."), None
+
+    # Check if already applied
+    existing_status = db.session.execute(
+        applications.select().with_only_columns(applications.c.status)
+        .where(applications.c.job_id == job_id, applications.c.telegram_user_id == telegram_id)
+        .limit(1)
+    ).scalar()
+    if existing_status is not None:
+        return ("📝 You have already applied for this position!\n"
+                f"Current status: {existing_status}"), None
+
+    return None, {
+        'job_revision': job.revision,
+        'candidate': candidate_info(job_seeker.skills, ' '.join(
+            filter(None, [job_seeker.first_name, job_seeker.last_name]))),
+        'job': {
+            'title': job.title,
+            'company': job.company_name,
+            'description': job.description or '',
+        },
+    }
+
+
+def _submit_application(job_id: int, telegram_id: str) -> int:
+    """Create an application whose cover letter is still to be written; returns its id"""
+    from extensions import db
+
+    result = db.session.execute(Application.__table__.insert().values(
+        job_id=job_id, telegram_user_id=telegram_id, status=Application.STATUS_PENDING,
+        cover_letter_status=Application.COVER_LETTER_PENDING))
+    db.session.commit()
+    return result.inserted_primary_key[0]
+
+
+async def _apply(context: ContextTypes.DEFAULT_TYPE, message, telegram_id: str, job_id: int):
+    """Apply a Telegram user to a job, answering in ``message``'s chat"""
+    refusal, details = await bot_runtime.run(_application_details, telegram_id, job_id)
+    if refusal:
+        _reply(context, message, refusal)
+        return
 
-            # Create application
-            application = Application(job_id=job.id,
-                                      job_seeker_id=job_seeker.id,
-                                      cover_letter=cover_letter)
+    # The cover letter is written afterwards by the cover letter queue, which
+    # the bot starts with the send queue
+    application_id = await bot_runtime.run(_submit_application, job_id, telegram_id)
+    cover_letter_queue.submit(CoverLetterRequest(
+        application_id=application_id, chat_id=message.chat_id, job_id=job_id,
+        job_revision=details['job_revision'], candidate=details['candidate'],
+        job=details['job']))
 
-            db.session.add(application)
-            db.session.commit()
+    _reply(context, message,
+        f"✅ Application submitted successfully for:\n"
+        f"🏢 {details['job']['title']} at {details['job']['company']}\n\n"
+        "✍️ Your personalized cover letter is being written and will be "
+        "attached shortly.\n"
+        "We'll notify you of any updates from the employer!")
 
-            await update.message.reply_text(
-                f"✅ Application submitted successfully for:\n"
-                f"🏢 {job.title} at {job.employer.company_name}\n\n"
-                f"Your cover letter has been generated based on your skills.\n"
-                "We'll notify you of any updates from the employer!")
+
+@monitor_handler
+@async_error_handler
+async def handle_application(update: Update,
+                             context: ContextTypes.DEFAULT_TYPE):
+    """Handle job application with monitoring and error handling"""
+    try:
+        if not context.args:
+            _reply(context, update.message, "⚠️ Please specify a job ID.\n"
+                                           "Example: /apply 123")
+            return
+
+        job_id = int(context.args[0])
+        await _apply(context, update.message, str(update.effective_user.id), job_id)
 
     except ValueError:
-        await update.message.reply_text(
+        _reply(context, update.message,
             "❌ Invalid job ID. Please use a number.\n"
             "Example: /apply 123")
     except Exception as e:
         logging.error(f"Error in handle_application: {e}")
-        await update.message.reply_text(
+        _reply(context, update.message,
+            "😓 Sorry, there was an error submitting your application.\n"
+            "Please try again later.")
+
+
+@monitor_handler
+@async_error_handler
+async def handle_apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle the "Apply" button of a job card, as /apply <job id> would"""
+    query = update.callback_query
+    await query.answer()
+    job_id = callback_job_id(query.data)
+    if job_id is None:
+        return
+    try:
+        await _apply(context, query.message, str(update.effective_user.id), job_id)
+    except Exception as e:
+        logging.error(f"Error in handle_apply_button: {e}")
+        _reply(context, query.message,
             "😓 Sorry, there was an error submitting your application.\n"
             "Please try again later.")
 
 
+@monitor_handler
+@async_error_handler
+async def handle_job_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle the "More Info" button of a job card with its cached detailed card"""
+    query = update.callback_query
+    job_id = callback_job_id(query.data)
+    card = job_card_cache.get(job_id) if job_id is not None else None
+    if card is None and job_id is not None:
+        # Not rendered yet, or no longer active
+        card = (await bot_runtime.run(job_card_cache.get_many, [job_id])).get(job_id)
+    if card is None:
+        await query.answer("This job is no longer available.", show_alert=True)
+        return
+
+    await query.answer()
+    _reply(context, query.message, card.details, parse_mode='Markdown',
+           reply_markup=job_card_keyboard(job_id, info=False))
+
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancel the conversation"""
-    await update.message.reply_text(
+    _reply(context, update.message,
         "Registration cancelled. Use /register to start again.")
     return ConversationHandler.END
 
@@ -399,18 +601,19 @@ async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle unknown commands"""
     try:
         logger.info(f"Unknown command received: {update.message.text}")
-        await update.message.reply_text(
+        _reply(context, update.message,
             "Sorry, I don't understand that command.\n"
             "Available commands:\n"
             "/start - Start using the bot\n"
             "/register - Create your profile\n"
             "/search - Find jobs near you\n"
+            "/find <keywords> - Search jobs by keywords\n"
             "/apply <job_id> - Apply for a job\n"
             "/cancel - Cancel current operation"
         )
     except Exception as e:
         logger.error(f"Error in unknown_command handler: {e}")
-        await update.message.reply_text("An error occurred. Please try /start")
+        _reply(context, update.message, "An error occurred. Please try /start")
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle errors in bot updates"""
@@ -426,6 +629,7 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Export error_handler at module level
 __all__ = ['error_handler', 'start', 'register', 'handle_full_name',
            'handle_phone_number', 'handle_location', 'handle_resume',
-           'handle_job_search', 'handle_application', 'cancel',
+           'handle_job_search', 'handle_search_page', 'handle_find', 'handle_application',
+           'handle_apply_button', 'handle_job_info', 'cancel',
            'unknown_command', 'FULL_NAME', 'PHONE_NUMBER', 'LOCATION', 'RESUME']
 
@@ -0,0 +1,67 @@
+import logging
+import os
+from typing import Iterable, List
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
+
+from services.search.inline_index import InlineJob, inline_job_index
+from .runtime import bot_runtime
+
+logger = logging.getLogger(__name__)
+
+# Results per answer; Telegram shows at most 50 and asks for the next page
+# with the answer's next_offset as the new query's offset
+INLINE_PAGE_SIZE = 20
+
+# Seconds Telegram may serve an answer from its own cache. Answers are the
+# same for everyone, so one user's query warms it for all
+INLINE_CACHE_TIME = int(os.environ.get('TELEGRAM_BOT_INLINE_CACHE_TIME', 60))
+
+# Skills listed in a result's description
+RESULT_SKILLS = 5
+
+
+def inline_results(jobs: Iterable[InlineJob]) -> List[InlineQueryResultArticle]:
+    """Inline results for jobs; choosing one posts its card to the chat"""
+    results = []
+    for job in jobs:
+        where = 'Remote' if job.is_remote and not job.location else job.location
+        skills = ', '.join(job.skills[:RESULT_SKILLS])
+        card = (f"🏢 *{escape_markdown(job.title)}*\n"
+                f"📍 {escape_markdown(where)}\n"
+                + (f"🛠 {escape_markdown(skills)}\n" if skills else '')
+                + f"\n📝 To apply, use /apply {job.id}")
+        results.append(InlineQueryResultArticle(
+            id=str(job.id),
+            title=job.title,
+            description=' · '.join(part for part in (where, skills) if part),
+            input_message_content=InputTextMessageContent(card, parse_mode='Markdown'),
+        ))
+    return results
+
+
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer ``@bot <keywords>`` from the in-memory inline job index"""
+    query = update.inline_query
+    try:
+        offset = int(query.offset) if query.offset else 0
+    except ValueError:
+        offset = 0
+
+    try:
+        if not inline_job_index.is_loaded:
+            # Built once, from the database
+            await bot_runtime.run(inline_job_index.ensure_loaded)
+        # One extra job tells whether there is another page
+        jobs = inline_job_index.search(query.query, INLINE_PAGE_SIZE + 1, offset)
+        has_more = len(jobs) > INLINE_PAGE_SIZE
+        await query.answer(
+            inline_results(jobs[:INLINE_PAGE_SIZE]),
+            cache_time=INLINE_CACHE_TIME,
+            is_personal=False,
+            next_offset=str(offset + INLINE_PAGE_SIZE) if has_more else '',
+        )
+    except Exception as e:
+        logger.error(f"Error answering inline query {query.query!r}: {e}")
@@ -0,0 +1,237 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+
+logger = logging.getLogger(__name__)
+
+# Buttons under a job card carry "apply_<job id>" and "info_<job id>"
+APPLY_CALLBACK = 'apply'
+INFO_CALLBACK = 'info'
+APPLY_PATTERN = rf'^{APPLY_CALLBACK}_\d+$'
+INFO_PATTERN = rf'^{INFO_CALLBACK}_\d+$'
+
+# Cards kept rendered; the newest active jobs are rendered when the cache is
+# first used, others when they are first shown
+JOB_CARD_CACHE_SIZE = int(os.environ.get('JOB_CARD_CACHE_SIZE', 10_000))
+
+# Job columns shown on a card; edits to others keep the card
+CARD_FIELDS = ('title', 'description', 'location', 'status', 'employer_id', 'job_type',
+               'is_remote', 'salary_min', 'salary_max', 'required_skills', 'experience_level')
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+SUMMARY_DESCRIPTION = 200
+# Telegram messages hold at most 4096 characters
+DETAILS_DESCRIPTION = 3000
+
+
+class JobCard(NamedTuple):
+    """Pre-rendered Markdown messages of a job at one revision"""
+    job_id: int
+    revision: int
+    employer_id: int
+    summary: str  # shown in job lists
+    details: str  # shown by "More Info"
+
+
+def job_card_keyboard(job_id: int, info: bool = True) -> InlineKeyboardMarkup:
+    """Apply (and More Info) buttons of a job card"""
+    buttons = [InlineKeyboardButton("Apply", callback_data=f"{APPLY_CALLBACK}_{job_id}")]
+    if info:
+        buttons.append(InlineKeyboardButton("More Info", callback_data=f"{INFO_CALLBACK}_{job_id}"))
+    return InlineKeyboardMarkup([buttons])
+
+
+def callback_job_id(data: Optional[str]) -> Optional[int]:
+    """Job id of an Apply or More Info button's callback data"""
+    match = re.fullmatch(r'[a-z]+_(\d+)', data or '')
+    return int(match.group(1)) if match else None
+
+
+def _skill_names(skills) -> str:
+    if isinstance(skills, dict):
+        skills = [skill for values in skills.values() if isinstance(values, list) for skill in values]
+    if not isinstance(skills, list):
+        return ''
+    return ', '.join(str(skill) for skill in skills if skill)
+
+
+def _salary(values) -> str:
+    low, high = values.get('salary_min'), values.get('salary_max')
+    if low and high:
+        return f"{low:,} - {high:,}"
+    if low or high:
+        return f"{'from' if low else 'up to'} {(low or high):,}"
+    return ''
+
+
+def render_card(values, company: str) -> JobCard:
+    """``JobCard`` of a job row or ``ModelChange.values`` mapping"""
+    title = escape_markdown(values.get('title') or '')
+    company = escape_markdown(company or '')
+    location = values.get('location') or ''
+    if values.get('is_remote'):
+        location = f"{location} (remote)" if location else 'Remote'
+    location = escape_markdown(location)
+    description = values.get('description') or ''
+
+    summary = (f"🏢 *{title}*\n"
+               f"🏗 _{company}_\n"
+               f"📍 {location}\n\n"
+               f"{escape_markdown(description[:SUMMARY_DESCRIPTION])}"
+               + ('...' if len(description) > SUMMARY_DESCRIPTION else ''))
+
+    facts = [
+        ('💼', escape_markdown(values.get('job_type') or '')),
+        ('📈', escape_markdown(values.get('experience_level') or '')),
+        ('💰', _salary(values)),
+        ('🛠', escape_markdown(_skill_names(values.get('required_skills')))),
+    ]
+    details = (f"🏢 *{title}*\n"
+               f"🏗 _{company}_\n"
+               f"📍 {location}\n"
+               + ''.join(f"{icon} {text}\n" for icon, text in facts if text)
+               + f"\n{escape_markdown(description[:DETAILS_DESCRIPTION])}"
+               + ('...' if len(description) > DETAILS_DESCRIPTION else '')
+               + f"\n\n📝 To apply, use /apply {values['id']}")
+    return JobCard(values['id'], values.get('revision') or 1, values.get('employer_id'),
+                   summary, details)
+
+
+class JobCardCache:
+    """
+    Rendered cards of active jobs, so showing a job needs no database query.
+
+    Cards are rendered from one query joining jobs with their employers: the
+    newest ``cache_size`` active jobs when the cache is first used, others
+    when first shown through ``get_many``. Committed job edits re-render the
+    card at the job's new revision, and renaming an employer drops its
+    cards; jobs that stop being active are dropped. The least recently used
+    cards are evicted beyond ``cache_size``.
+    """
+
+    def __init__(self, cache_size: int = JOB_CARD_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cards: 'OrderedDict[int, JobCard]' = OrderedDict()
+        self._companies: Dict[int, str] = {}
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, job_id: int) -> Optional[JobCard]:
+        """The card of a job if rendered; never queries the database"""
+        with self._lock:
+            card = self._cards.get(job_id)
+            if card is not None:
+                self._cards.move_to_end(job_id)
+            return card
+
+    def ensure_loaded(self) -> None:
+        """Render the newest active jobs and start following job and employer changes"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from models import Job
+
+            self._listen()
+            self._render(Job.__table__.c.status == Job.STATUS_ACTIVE, newest=self.cache_size)
+            self._loaded = True
+            logger.info(f"Job card cache warmed with {len(self._cards)} cards")
+
+    def get_many(self, job_ids: Iterable[int]) -> Dict[int, JobCard]:
+        """Cards of the active jobs among ``job_ids``, rendering missing ones in one query"""
+        from models import Job
+
+        self.ensure_loaded()
+        job_ids = list(job_ids)
+        with self._lock:
+            cards = {job_id: self._cards[job_id] for job_id in job_ids if job_id in self._cards}
+            missing = [job_id for job_id in job_ids if job_id not in cards]
+            if missing:
+                table = Job.__table__
+                self._render((table.c.id.in_(missing)) & (table.c.status == Job.STATUS_ACTIVE))
+            for job_id in job_ids:
+                card = self._cards.get(job_id)
+                if card is not None:
+                    self._cards.move_to_end(job_id)
+                    cards[job_id] = card
+            return cards
+
+    def apply_job_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        with self._lock:
+            company = self._companies.get(values.get('employer_id'))
+            if change.op == 'delete' or values.get('status') != ACTIVE_STATUS or company is None:
+                # An unknown employer is looked up when the job is next shown
+                self._cards.pop(change.id, None)
+                return
+            self._store(render_card(values, company))
+
+    def apply_employer_change(self, change) -> None:
+        """Apply a committed ``Employer`` change; its jobs are rendered again when shown"""
+        with self._lock:
+            self._companies.pop(change.id, None)
+            for job_id in [job_id for job_id, card in self._cards.items()
+                           if card.employer_id == change.id]:
+                del self._cards[job_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cards.clear()
+            self._companies.clear()
+            self._loaded = False
+
+    def _listen(self) -> None:
+        # Listen before rendering so edits committed meanwhile are not lost
+        if self._listening:
+            return
+        from core.db_events import on_commit
+        from models import Employer, Job
+
+        on_commit(Job, self.apply_job_change, watch=CARD_FIELDS)
+        on_commit(Employer, self.apply_employer_change, watch=('company_name',))
+        self._listening = True
+
+    def _render(self, condition, newest: Optional[int] = None) -> None:
+        from extensions import db
+        from models import Employer, Job
+
+        jobs, employers = Job.__table__, Employer.__table__
+        statement = (jobs.select()
+                     .with_only_columns(jobs.c.id, jobs.c.revision, jobs.c.employer_id,
+                                        employers.c.company_name,
+                                        *(jobs.c[field] for field in CARD_FIELDS if field != 'employer_id'))
+                     .join(employers, employers.c.id == jobs.c.employer_id)
+                     .where(condition))
+        if newest is not None:
+            statement = statement.order_by(jobs.c.id.desc()).limit(newest)
+        rows = db.session.execute(statement).mappings().all()
+        # The newest jobs are stored last, so the oldest are evicted first
+        for row in reversed(rows) if newest is not None else rows:
+            self._companies[row['employer_id']] = row['company_name']
+            self._store(render_card(row, row['company_name']))
+
+    def _store(self, card: JobCard) -> None:
+        self._cards[card.job_id] = card
+        self._cards.move_to_end(card.job_id)
+        while len(self._cards) > self.cache_size:
+            self._cards.popitem(last=False)
+
+
+# Global instance
+job_card_cache = JobCardCache()
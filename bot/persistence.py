@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from .runtime import BotRuntime, bot_runtime
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the application handing changed data to the persistence;
+# at most this much is lost if the process dies
+UPDATE_INTERVAL = float(os.environ.get('BOT_PERSISTENCE_INTERVAL', 5))
+
+# Keys per DELETE statement when writing a batch
+DELETE_CHUNK = 500
+
+# (kind, key) of a bot_state row
+_Entry = Tuple[str, str]
+
+
+def _select(kind: str):
+    from extensions import db
+    from models import BotState
+
+    table = BotState.__table__
+    return db.session.execute(
+        table.select().with_only_columns(table.c.key, table.c.data).where(table.c.kind == kind)
+    ).all()
+
+
+def _write(batch: Dict[_Entry, Optional[str]]) -> None:
+    """Replace the rows of ``batch`` in one transaction; ``None`` deletes the row"""
+    from extensions import db
+    from models import BotState
+
+    table = BotState.__table__
+    keys_by_kind = defaultdict(list)
+    for kind, key in batch:
+        keys_by_kind[kind].append(key)
+    for kind, keys in keys_by_kind.items():
+        for start in range(0, len(keys), DELETE_CHUNK):
+            db.session.execute(table.delete().where(
+                table.c.kind == kind, table.c.key.in_(keys[start:start + DELETE_CHUNK])))
+    now = datetime.utcnow()
+    rows = [{'kind': kind, 'key': key, 'data': data, 'updated_at': now}
+            for (kind, key), data in batch.items() if data is not None]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+class SQLAlchemyPersistence(BasePersistence):
+    """
+    Keeps user_data, chat_data, bot_data and conversation states in ``bot_state``.
+
+    Writes are behind: ``update_*`` only record the entry's JSON and return,
+    and a background task writes everything recorded since its last run in
+    one transaction on the bot's DB thread pool. Neither handlers nor the
+    application's persistence loop wait for the database, and an entry that
+    changed several times between runs is written once. Entries whose JSON
+    did not change are not written at all. ``flush`` (called when the
+    application stops) waits until everything is written.
+
+    State is loaded when the application initializes, so a restarted bot
+    resumes in-flight registrations. Values are stored as JSON: they must be
+    JSON serializable, and tuples come back as lists.
+    """
+
+    def __init__(self, runtime: BotRuntime = bot_runtime, update_interval: float = UPDATE_INTERVAL):
+        super().__init__(store_data=PersistenceInput(callback_data=False),
+                         update_interval=update_interval)
+        self.runtime = runtime
+        # Entries waiting to be written, and the last written JSON of each
+        self._pending: Dict[_Entry, Optional[str]] = {}
+        self._stored: Dict[_Entry, str] = {}
+        self._writer: Optional[asyncio.Task] = None
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {int(key): data for key, data in (await self._load('user')).items()}
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {int(key): data for key, data in (await self._load('chat')).items()}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return (await self._load('bot')).get('', {})
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[Tuple, object]:
+        return {tuple(json.loads(key)): state
+                for key, state in (await self._load(f'conversation:{name}')).items()}
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        self._record(('user', str(user_id)), data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        self._record(('chat', str(chat_id)), data)
+
+    async def update_bot_data(self, data: Dict) -> None:
+        self._record(('bot', ''), data)
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]) -> None:
+        # A conversation that ended is deleted
+        self._record((f'conversation:{name}', json.dumps(list(key))), new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._record(('user', str(user_id)), None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._record(('chat', str(chat_id)), None)
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Wait until every recorded entry is written"""
+        if self._writer is not None:
+            await self._writer
+        if self._pending:
+            await self._write_pending()
+
+    async def _load(self, kind: str) -> Dict[str, Any]:
+        rows = await self.runtime.run(_select, kind)
+        for key, data in rows:
+            self._stored[(kind, key)] = data
+        return {key: json.loads(data) for key, data in rows}
+
+    def _record(self, entry: _Entry, value: Any) -> None:
+        if value is not None:
+            try:
+                value = json.dumps(value, sort_keys=True)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Bot state {entry} is not JSON serializable, not persisted: {e}")
+                return
+        latest = self._pending[entry] if entry in self._pending else self._stored.get(entry)
+        if value == latest:
+            return
+        self._pending[entry] = value
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            try:
+                await self.runtime.run(_write, batch)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} bot state entries: {e}")
+                # Retried with the next batch, unless a newer value came meanwhile
+                for entry, value in batch.items():
+                    self._pending.setdefault(entry, value)
+                return
+            for entry, value in batch.items():
+                if value is None:
+                    self._stored.pop(entry, None)
+                else:
+                    self._stored[entry] = value
@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .runtime import BotRuntime, bot_runtime
+
+logger = logging.getLogger(__name__)
+
+# Resumes processed at once
+RESUME_WORKERS = int(os.environ.get('RESUME_WORKERS', 4))
+
+# Processes running text extraction and OCR, which are CPU bound; 0 runs
+# them on threads instead
+RESUME_PROCESSES = int(os.environ.get('RESUME_PROCESSES', min(4, os.cpu_count() or 1)))
+
+# Resumes waiting for a worker before uploads are refused
+RESUME_QUEUE_SIZE = int(os.environ.get('RESUME_QUEUE_SIZE', 100))
+
+# Seconds workers get to finish queued resumes when the bot stops
+DRAIN_TIMEOUT = 30.0
+
+# Skills of a profile whose resume yielded none
+DEFAULT_SKILLS = {"default_skills": ["general"]}
+
+# Stages in order, with their line in the progress message
+STAGES: Tuple[Tuple[str, str], ...] = (
+    ('download', 'Downloading your resume'),
+    ('text', 'Reading the text'),
+    ('ocr', 'Reading images'),
+    ('skills', 'Extracting your skills'),
+    ('save', 'Saving your profile'),
+)
+
+COMPLETE_TEXT = ("Registration complete! 🎉\n"
+                 "Use /search to find jobs in your area.")
+FAILED_TEXT = ("Sorry, there was an error processing your resume. "
+               "Please try again with /register")
+
+
+def progress_text(done: int, failed: bool = False) -> str:
+    """Progress message once ``done`` stages finished; ``failed`` marks the next one"""
+    lines = ["📄 Processing your resume..."]
+    for index, (_, label) in enumerate(STAGES):
+        if index < done:
+            mark = '✅'
+        elif index == done:
+            mark = '❌' if failed else '⏳'
+        else:
+            mark = '▫️'
+        lines.append(f"{mark} {label}")
+    if failed:
+        lines.append(f"\n{FAILED_TEXT}")
+    return '\n'.join(lines)
+
+
+@dataclass
+class ResumeJob:
+    """A resume upload and what its stages produced so far"""
+    user_id: int
+    chat_id: int
+    file_id: str
+    profile: Dict[str, Any]  # full_name, phone_number, latitude, longitude
+    # Resolves to the acknowledgement message, which is edited with the progress
+    progress: Optional[asyncio.Future] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    submitted_at: float = field(default_factory=time.monotonic)
+    timings: Dict[str, float] = field(default_factory=dict)
+    resume_path: Optional[str] = None
+    text: str = ''
+    image_count: int = 0
+    skills: Dict[str, List[str]] = field(default_factory=lambda: dict(DEFAULT_SKILLS))
+
+
+def profile_columns(full_name: Optional[str] = None, phone_number: Optional[str] = None,
+                    **columns) -> Dict[str, Any]:
+    """``JobSeeker`` column values of a registration profile"""
+    if full_name is not None:
+        first_name, _, last_name = full_name.strip().partition(' ')
+        columns.update(first_name=first_name, last_name=last_name.strip() or None)
+    if phone_number is not None:
+        columns['phone'] = phone_number
+    return columns
+
+
+def save_profile(telegram_id: str, **profile):
+    """Create or update the job seeker profile of a Telegram user"""
+    from core.db_events import ModelChange, publish
+    from extensions import db
+    from models import JobSeeker
+
+    table = JobSeeker.__table__
+    values = profile_columns(**profile)
+    updated = db.session.execute(
+        table.update().where(table.c.telegram_user_id == telegram_id).values(**values)
+    ).rowcount
+    if updated:
+        logger.info(f"Updated existing profile for user {telegram_id}")
+    else:
+        logger.info(f"Creating new profile for user {telegram_id}")
+        values.setdefault('job_preferences', JobSeeker.default_job_preferences())
+        db.session.execute(table.insert().values(telegram_user_id=telegram_id, **values))
+
+    # Core statements skip the mapper events, so the recommendations and the
+    # score cache are told about the new profile here
+    row = db.session.execute(
+        table.select().where(table.c.telegram_user_id == telegram_id)
+    ).mappings().one()
+    publish(db.session, JobSeeker, ModelChange('update' if updated else 'insert', row['id'], dict(row)),
+            changed=values if updated else None)
+    db.session.commit()
+
+
+def _record_ingestion(row: Dict[str, Any]) -> None:
+    from extensions import db
+    from models import ResumeIngestion
+
+    db.session.execute(ResumeIngestion.__table__.insert(), [row])
+    db.session.commit()
+
+
+# Run in the worker processes, so they import the OCR stack there
+def _extract_text(resume_path: str) -> Tuple[str, int]:
+    from services.file_service import UPLOAD_FOLDER, extract_pdf_text
+    return extract_pdf_text(os.path.join(UPLOAD_FOLDER, resume_path))
+
+
+def _ocr_images(resume_path: str) -> str:
+    from services.file_service import UPLOAD_FOLDER, ocr_pdf_images
+    return ocr_pdf_images(os.path.join(UPLOAD_FOLDER, resume_path))
+
+
+def _analyze_text(text: str) -> Dict[str, Any]:
+    from services.file_service import analyze_resume_text
+    return analyze_resume_text(text)
+
+
+class ResumePipeline:
+    """
+    Turns uploaded resumes into job seeker profiles off the handler's path.
+
+    ``handle_resume`` only acknowledges the upload and queues a
+    ``ResumeJob``; ``workers`` tasks take jobs from a bounded queue and run
+    them through ``STAGES``. Text extraction and OCR run on a process pool
+    so they neither block the event loop nor hold the GIL, the AI call runs
+    on a thread and the profile is saved on the bot's DB thread pool. The
+    acknowledgement is edited as each stage finishes, and each resume's
+    queue wait and stage times are stored in ``resume_ingestion``.
+    """
+
+    def __init__(self, runtime: BotRuntime = bot_runtime, workers: int = RESUME_WORKERS,
+                 processes: int = RESUME_PROCESSES, queue_size: int = RESUME_QUEUE_SIZE):
+        self.runtime = runtime
+        self.workers = workers
+        self.processes = processes
+        self.queue_size = queue_size
+        self._bot = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[Executor] = None
+
+    def start(self, bot) -> None:
+        """Start the workers on the running loop; later calls only update the bot"""
+        self._bot = bot
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    @property
+    def is_full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(self, job: ResumeJob) -> bool:
+        """Queue a resume; False if the queue is full"""
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued resume is processed"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Finish the queued resumes, then stop the workers and the process pool"""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Resume pipeline stopped with {self._queue.qsize()} resumes unprocessed")
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def process(self, job: ResumeJob) -> bool:
+        """Run ``job`` through every stage; False if a stage failed"""
+        job.timings['queued'] = time.monotonic() - job.submitted_at
+        for done, (stage, _) in enumerate(STAGES):
+            started = time.monotonic()
+            try:
+                await getattr(self, f'_{stage}')(job)
+            except Exception as e:
+                job.timings[stage] = time.monotonic() - started
+                logger.error(f"Resume of user {job.user_id} failed at {stage}: {e}")
+                await self._show(job, progress_text(done, failed=True))
+                await self._record(job, failed_stage=stage, error=str(e))
+                return False
+            job.timings[stage] = time.monotonic() - started
+            if done + 1 < len(STAGES):
+                await self._show(job, progress_text(done + 1))
+        await self._show(job, COMPLETE_TEXT)
+        await self._record(job)
+        return True
+
+    async def _download(self, job: ResumeJob) -> None:
+        from services.file_service import save_resume
+
+        file = await self._bot.get_file(job.file_id)
+        job.resume_path = await save_resume(file, job.user_id)
+        if not job.resume_path:
+            raise RuntimeError("resume could not be saved")
+
+    async def _text(self, job: ResumeJob) -> None:
+        job.text, job.image_count = await self._run_cpu(_extract_text, job.resume_path)
+
+    async def _ocr(self, job: ResumeJob) -> None:
+        if job.image_count:
+            job.text += await self._run_cpu(_ocr_images, job.resume_path)
+
+    async def _skills(self, job: ResumeJob) -> None:
+        # Failures keep the default skills rather than failing the registration
+        try:
+            data = await asyncio.to_thread(_analyze_text, job.text)
+            if data.get('skills'):
+                job.skills = {"extracted_skills": data['skills']}
+        except Exception as e:
+            logger.error(f"Error extracting skills: {str(e)}")
+
+    async def _save(self, job: ResumeJob) -> None:
+        await self.runtime.run(save_profile, str(job.user_id), resume_path=job.resume_path,
+                               skills=job.skills, **job.profile)
+
+    async def _run_cpu(self, fn: Callable[..., Any], *args) -> Any:
+        if self._pool is None:
+            if self.processes > 0:
+                # Spawned, not forked: the bot process has threads and a running loop
+                self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='resume')
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _show(self, job: ResumeJob, text: str) -> None:
+        if job.progress is None:
+            return
+        try:
+            message = await job.progress
+            await self._bot.edit_message_text(text, chat_id=message.chat_id,
+                                              message_id=message.message_id)
+        except Exception as e:
+            logger.warning(f"Could not update resume progress of user {job.user_id}: {e}")
+
+    async def _record(self, job: ResumeJob, failed_stage: Optional[str] = None,
+                      error: Optional[str] = None) -> None:
+        from models import ResumeIngestion
+
+        row = {
+            'telegram_user_id': str(job.user_id),
+            'status': ResumeIngestion.STATUS_FAILED if failed_stage else ResumeIngestion.STATUS_DONE,
+            'failed_stage': failed_stage,
+            'resume_path': job.resume_path,
+            'stage_timings': {stage: round(seconds, 4) for stage, seconds in job.timings.items()},
+            'error': error,
+            'created_at': job.created_at,
+            'finished_at': datetime.utcnow(),
+        }
+        logger.info(f"Resume of user {job.user_id} {row['status']}: {row['stage_timings']}")
+        try:
+            await self.runtime.run(_record_ingestion, row)
+        except Exception as e:
+            logger.error(f"Failed to record resume ingestion of user {job.user_id}: {e}")
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.process(job)
+            except Exception as e:
+                logger.error(f"Error processing resume of user {job.user_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+# Global instance
+resume_pipeline = ResumePipeline()
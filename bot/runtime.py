@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Threads running blocking database work for handlers; bounds the bot's
+# share of the connection pool
+DB_WORKERS = int(os.environ.get('BOT_DB_WORKERS', 8))
+
+
+async def _default_app_factory():
+    from app import create_app
+    return await create_app()
+
+
+class BotRuntime:
+    """
+    The Flask app shared by every bot handler.
+
+    The app is built once when the bot starts (or handed over by the runner
+    that already built one) instead of on every update, so handlers only pay
+    for pushing an app context and checking out a pooled connection.
+
+    Queries block, so handlers ``await run(...)`` them on a bounded thread
+    pool rather than on the event loop, which keeps serving other updates
+    meanwhile.
+    """
+
+    def __init__(self, app_factory: Callable[[], Awaitable] = _default_app_factory,
+                 db_workers: int = DB_WORKERS):
+        self.app_factory = app_factory
+        self.db_workers = db_workers
+        self._app = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            raise RuntimeError("Bot runtime not started")
+        return self._app
+
+    @property
+    def is_started(self) -> bool:
+        return self._app is not None
+
+    async def start(self, app=None):
+        """Use ``app``, or build the app once; later calls return the same app"""
+        if self._app is not None:
+            return self._app
+        if app is not None:
+            self._app = app
+            return app
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._app is None:
+                self._app = await self.app_factory()
+                logger.info("Bot runtime started")
+        return self._app
+
+    @contextmanager
+    def session(self) -> Iterator:
+        """
+        App context with a scoped DB session for one handler invocation.
+
+        The session is rolled back if the block raises and always removed
+        afterwards, returning its connection to the pool.
+        """
+        from extensions import db
+
+        with self.app.app_context():
+            try:
+                yield db.session
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Await ``fn(*args, **kwargs)`` run on the DB thread pool in its own ``session()``.
+
+        The session is removed when ``fn`` returns, so it should return plain
+        values (ids, text, tuples) rather than ORM objects.
+        """
+        await self.start()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.db_workers,
+                                                thread_name_prefix='bot-db')
+        call = functools.partial(self._run_in_session, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def _run_in_session(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.session():
+            return fn(*args, **kwargs)
+
+    def shutdown(self) -> None:
+        """Stop the DB thread pool once running tasks are done"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Global instance
+bot_runtime = BotRuntime()
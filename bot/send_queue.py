@@ -0,0 +1,409 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from telegram.error import RetryAfter
+from telegram.helpers import escape_markdown
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows about 30 messages per second per bot and about one per
+# second per chat, tolerating short bursts
+GLOBAL_RATE = 30.0
+GLOBAL_BURST = 30
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+
+# Messages sent at once; a chat never has more than one in flight so its
+# messages arrive in order
+MAX_IN_FLIGHT = 16
+
+# Attempts of a message Telegram answers with RetryAfter before giving up
+MAX_RETRIES = 3
+
+# Messages queued from other threads wait while this many are unsent, so a
+# large fan-out is fed in as fast as it goes out instead of held in memory
+MAX_BACKLOG = 1000
+
+# Consecutive messages to a chat are joined while the result fits one message
+MAX_MESSAGE_LENGTH = 4096
+COALESCE_SEPARATOR = '\n\n'
+
+# Legacy Markdown, the parse mode of the bot's job cards. Plain texts are
+# escaped to join Markdown ones; other parse modes only join their own kind
+MARKDOWN = 'Markdown'
+_MARKDOWN_TOKEN = re.compile(r'\\.|```|\]\([^)]*\)|[*_`\[\]]', re.DOTALL)
+_MARKDOWN_CLOSER = {'*': '*', '_': '_', '`': '`', '```': '```', '[': ']'}
+
+# Priority lanes, served lowest first: replies to the user's own commands go
+# ahead of notifications and broadcasts
+INTERACTIVE = 0
+NOTIFICATION = 1
+LANES = (INTERACTIVE, NOTIFICATION)
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+
+def markdown_balanced(text: str) -> bool:
+    """
+    Whether legacy Markdown ``text`` closes every entity it opens.
+
+    Joined texts are only valid Markdown if each closes its own entities;
+    otherwise a bold or code span would run on into the next message.
+    """
+    closer = None
+    for match in _MARKDOWN_TOKEN.finditer(text):
+        token = match.group()
+        if closer is None:
+            if token in _MARKDOWN_CLOSER:
+                closer = _MARKDOWN_CLOSER[token]
+        elif token == closer or closer == ']' and token.startswith(']'):
+            # A link's URL closes it with the text
+            closer = None
+    return closer is None
+
+
+@dataclass
+class OutboundMessage:
+    chat_id: int
+    text: str
+    priority: int
+    reply_markup: Any
+    options: Dict[str, Any]
+    future: asyncio.Future
+    seq: int
+    attempts: int = 0
+    coalesce: bool = True
+
+    @property
+    def parse_mode(self) -> Optional[str]:
+        return self.options.get('parse_mode')
+
+
+def _joinable(first: OutboundMessage, other: OutboundMessage) -> bool:
+    """Whether ``other`` can be joined to a batch starting with ``first``"""
+    if not (first.coalesce and other.coalesce):
+        return False
+    if ({key: value for key, value in first.options.items() if key != 'parse_mode'}
+            != {key: value for key, value in other.options.items() if key != 'parse_mode'}):
+        return False
+    modes = {first.parse_mode, other.parse_mode}
+    if len(modes) > 1 and not modes <= {None, MARKDOWN}:
+        return False
+    return all(markdown_balanced(message.text) for message in (first, other)
+               if message.parse_mode == MARKDOWN)
+
+
+def batch_message(batch: List[OutboundMessage]) -> Tuple[str, Dict[str, Any]]:
+    """Text and ``send_message`` options of a batch of joined messages"""
+    options = dict(batch[-1].options)
+    if len(batch) > 1 and any(message.parse_mode == MARKDOWN for message in batch):
+        options['parse_mode'] = MARKDOWN
+        texts = [message.text if message.parse_mode == MARKDOWN else escape_markdown(message.text)
+                 for message in batch]
+    else:
+        texts = [message.text for message in batch]
+    return COALESCE_SEPARATOR.join(texts), options
+
+
+@dataclass
+class _Chat:
+    chat_id: int
+    bucket: TokenBucket
+    lanes: List[Deque[OutboundMessage]] = field(default_factory=lambda: [deque() for _ in LANES])
+    in_flight: bool = False
+    # Bumped whenever the chat is (re)scheduled; older heap entries are stale
+    version: int = 0
+
+    def head(self) -> Optional[OutboundMessage]:
+        for lane in self.lanes:
+            if lane:
+                return lane[0]
+        return None
+
+    def pop_batch(self) -> List[OutboundMessage]:
+        """The head message and the following ones of its lane it can be joined with"""
+        lane = self.lanes[self.head().priority]
+        first = lane.popleft()
+        batch = [first]
+        # A keyboard belongs under the text it was sent with, so it ends a batch
+        while lane and batch[-1].reply_markup is None and _joinable(first, lane[0]):
+            text, _ = batch_message(batch + [lane[0]])
+            if len(text) > MAX_MESSAGE_LENGTH:
+                break
+            batch.append(lane.popleft())
+        return batch
+
+
+class SendQueue:
+    """
+    Outbound Telegram messages, sent within the bot's flood limits.
+
+    Handlers ``enqueue`` messages instead of awaiting the network. A
+    dispatcher task sends them through a global and a per-chat token
+    bucket. Chats take turns by the priority lane and age of their oldest
+    message, so a broadcast doesn't delay replies. Messages queued for the
+    same chat meanwhile are coalesced into one, and a RetryAfter answer
+    pauses sending and puts the messages back in front of their lane.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, global_burst: float = GLOBAL_BURST,
+                 chat_rate: float = CHAT_RATE, chat_burst: float = CHAT_BURST,
+                 max_in_flight: int = MAX_IN_FLIGHT, max_retries: int = MAX_RETRIES,
+                 max_backlog: int = MAX_BACKLOG, clock: Callable[[], float] = time.monotonic):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.max_backlog = max_backlog
+        self.clock = clock
+        self.bot = None
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        self._chats: Dict[int, _Chat] = {}
+        # (priority, seq, version, chat_id) of chats whose head can be sent
+        self._ready: List[Tuple[int, int, int, int]] = []
+        # (ready_at, priority, seq, version, chat_id) of chats waiting for their bucket
+        self._delayed: List[Tuple[float, int, int, int, int]] = []
+        # (idle_since, chat_id) of chats dropped once their bucket refilled
+        self._idle: Deque[Tuple[float, int]] = deque()
+        self._seq = itertools.count()
+        self._pending = 0
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._progress = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        """Messages not sent yet"""
+        return self._pending
+
+    @property
+    def is_started(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, bot) -> None:
+        """Start sending through ``bot``; later calls are no-ops"""
+        if self.is_started:
+            return
+        self.bot = bot
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._dispatch())
+
+    async def join(self) -> None:
+        """Wait until every queued message was sent or given up on"""
+        await self._drained.wait()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Send what is queued within ``timeout`` seconds, then stop the dispatcher"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Send queue stopped with {self._pending} messages unsent")
+        self._task.cancel()
+        self._task = None
+        self._loop = None
+
+    def enqueue(self, chat_id: int, text: str, priority: int = INTERACTIVE,
+                reply_markup=None, coalesce: bool = True, **options) -> asyncio.Future:
+        """
+        Queue a message; ``options`` are passed on to ``Bot.send_message``.
+
+        Returns a future of the sent Message, which messages coalesced
+        together share. Failures are logged, so it needn't be awaited.
+        Messages the caller edits later pass ``coalesce=False``, so the edit
+        cannot overwrite other messages joined with them.
+        """
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority lane {priority}")
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_log_failure)
+        message = OutboundMessage(chat_id, text, priority, reply_markup, options,
+                                  future, next(self._seq), coalesce=coalesce)
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _Chat(
+                chat_id, TokenBucket(self.chat_rate, self.chat_burst, self.clock()))
+        head = chat.head()
+        chat.lanes[priority].append(message)
+        self._pending += 1
+        self._drained.clear()
+        if head is None or priority < head.priority:
+            self._schedule(chat)
+        return future
+
+    def notify(self, chat_id: int, text: str, **options) -> asyncio.Future:
+        """Queue a message the user did not ask for, behind the replies"""
+        return self.enqueue(chat_id, text, priority=NOTIFICATION, **options)
+
+    def enqueue_from_thread(self, messages: Iterable[Tuple[int, str]],
+                            priority: int = NOTIFICATION, **options) -> None:
+        """
+        Queue ``(chat_id, text)`` pairs from a thread other than the bot's loop.
+
+        Blocks while ``max_backlog`` messages are unsent.
+        """
+        if self._loop is None:
+            raise RuntimeError("Send queue not started")
+        asyncio.run_coroutine_threadsafe(
+            self._enqueue_all(messages, priority, options), self._loop
+        ).result()
+
+    async def _enqueue_all(self, messages, priority: int, options: Dict[str, Any]) -> None:
+        for chat_id, text in messages:
+            while self._pending >= self.max_backlog:
+                self._progress.clear()
+                await self._progress.wait()
+            self.enqueue(chat_id, text, priority, **options)
+
+    def _schedule(self, chat: _Chat) -> None:
+        head = chat.head()
+        if chat.in_flight or head is None:
+            return
+        chat.version += 1
+        heapq.heappush(self._ready, (head.priority, head.seq, chat.version, chat.chat_id))
+        self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            wait = self._send_ready()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _send_ready(self) -> Optional[float]:
+        """Start sending every message the buckets allow; return seconds until more can go"""
+        now = self.clock()
+        self._prune_idle(now)
+        while self._delayed and self._delayed[0][0] <= now:
+            _, *entry = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, tuple(entry))
+        if self._paused_until > now:
+            return self._paused_until - now
+
+        wait = None
+        while self._ready and self._in_flight < self.max_in_flight:
+            global_delay = self._global.delay(now)
+            if global_delay > 0:
+                wait = global_delay
+                break
+            priority, seq, version, chat_id = heapq.heappop(self._ready)
+            chat = self._chats.get(chat_id)
+            if chat is None or chat.version != version:
+                continue
+            chat_delay = chat.bucket.delay(now)
+            if chat_delay > 0:
+                heapq.heappush(self._delayed, (now + chat_delay, priority, seq, version, chat_id))
+                continue
+            chat.bucket.take(now)
+            self._global.take(now)
+            chat.in_flight = True
+            chat.version += 1
+            self._in_flight += 1
+            asyncio.get_running_loop().create_task(self._deliver(chat, chat.pop_batch()))
+
+        if self._delayed:
+            delayed = self._delayed[0][0] - now
+            wait = delayed if wait is None else min(wait, delayed)
+        return wait
+
+    async def _deliver(self, chat: _Chat, batch: List[OutboundMessage]) -> None:
+        text, options = batch_message(batch)
+        try:
+            sent = await self.bot.send_message(
+                chat_id=chat.chat_id, text=text, reply_markup=batch[-1].reply_markup, **options)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            if max(message.attempts for message in batch) + 1 < self.max_retries:
+                logger.warning(f"Flood limit hit sending to chat {chat.chat_id}, "
+                               f"retrying in {retry_after}s")
+                for message in batch:
+                    message.attempts += 1
+                chat.lanes[batch[0].priority].extendleft(reversed(batch))
+                self._paused_until = max(self._paused_until, self.clock() + retry_after)
+            else:
+                self._finish(batch, error=e)
+        except Exception as e:
+            self._finish(batch, error=e)
+        else:
+            self._finish(batch, sent=sent)
+        finally:
+            chat.in_flight = False
+            self._in_flight -= 1
+            if chat.head() is None:
+                self._idle.append((self.clock(), chat.chat_id))
+            self._schedule(chat)
+            self._wakeup.set()
+
+    def _finish(self, batch: List[OutboundMessage], sent=None, error: Exception = None) -> None:
+        for message in batch:
+            if not message.future.done():
+                if error is None:
+                    message.future.set_result(sent)
+                else:
+                    message.future.set_exception(error)
+        self._pending -= len(batch)
+        self._progress.set()
+        if not self._pending:
+            self._drained.set()
+
+    def _prune_idle(self, now: float) -> None:
+        """Forget idle chats once their bucket refilled, when a new one is the same"""
+        refill_seconds = self.chat_burst / self.chat_rate
+        while self._idle and self._idle[0][0] + refill_seconds <= now:
+            _, chat_id = self._idle.popleft()
+            chat = self._chats.get(chat_id)
+            if (chat is not None and not chat.in_flight and chat.head() is None
+                    and chat.bucket.is_full(now)):
+                del self._chats[chat_id]
+
+
+def _log_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Failed to send message: {future.exception()}")
+
+
+# Global instance
+send_queue = SendQueue()
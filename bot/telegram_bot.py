@@ -5,11 +5,12 @@ from telegram.ext import Application
 
 logger = logging.getLogger(__name__)
 _instance = None
+_webhook = None
 _lock = asyncio.Lock()
 TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 
-async def create_application():
-    """Create and configure the bot application"""
+async def create_application(app=None):
+    """Create and configure the bot application; handlers share ``app``, built here if not given"""
     if not TOKEN:
         logger.error("No telegram bot token provided")
         return None
@@ -18,6 +19,8 @@ async def create_application():
         # Import handlers at the start to avoid circular imports
         from telegram.ext import (
             CommandHandler,
+            CallbackQueryHandler,
+            InlineQueryHandler,
             MessageHandler, 
             ConversationHandler,
             CallbackContext,
@@ -32,17 +35,30 @@ async def create_application():
             handle_location,
             handle_resume,
             handle_job_search,
+            handle_search_page,
+            handle_find,
             handle_application,
+            handle_apply_button,
+            handle_job_info,
             cancel,
             unknown_command,
             error_handler,
             FULL_NAME, 
             PHONE_NUMBER, 
             LOCATION, 
-            RESUME
+            RESUME,
+            SEARCH_PAGE_CALLBACK
         )
+        from .inline import handle_inline_query
+        from .job_cards import APPLY_PATTERN, INFO_PATTERN
+        from .commands.jobs_command import JobsCommand
 
-        application = Application.builder().token(TOKEN).build()
+        from .runtime import bot_runtime
+        await bot_runtime.start(app)
+
+        # user_data and registrations in progress are kept in the database
+        from .persistence import SQLAlchemyPersistence
+        application = Application.builder().token(TOKEN).persistence(SQLAlchemyPersistence()).build()
 
         # Set up conversation handler for registration
         conv_handler = ConversationHandler(
@@ -53,18 +69,38 @@ async def create_application():
                 LOCATION: [MessageHandler(filters.LOCATION, handle_location)],
                 RESUME: [MessageHandler(filters.Document.ALL, handle_resume)]
             },
-            fallbacks=[CommandHandler('cancel', cancel)]
+            fallbacks=[CommandHandler('cancel', cancel)],
+            name='registration',
+            persistent=True
         )
 
         # Add handlers
         application.add_handler(CommandHandler("start", start))
         application.add_handler(conv_handler)
         application.add_handler(CommandHandler("search", handle_job_search))
+        application.add_handler(CallbackQueryHandler(handle_search_page, pattern=f"^{SEARCH_PAGE_CALLBACK}:"))
+        application.add_handler(CommandHandler("find", handle_find))
         application.add_handler(CommandHandler("apply", handle_application))
+        application.add_handler(CommandHandler("jobs", JobsCommand().execute))
+        application.add_handler(CallbackQueryHandler(handle_apply_button, pattern=APPLY_PATTERN))
+        application.add_handler(CallbackQueryHandler(handle_job_info, pattern=INFO_PATTERN))
+        application.add_handler(InlineQueryHandler(handle_inline_query))
         # Add error handler
         application.add_error_handler(error_handler)
         # Add unknown command handler last
         application.add_handler(MessageHandler(filters.COMMAND, unknown_command))
+
+        # Announce jobs going active to matching seekers
+        from services.matching.job_alerts import job_alert_fanout
+        from .send_queue import send_queue
+        send_queue.start(application.bot)
+        job_alert_fanout.start(bot_runtime.app, send_queue.enqueue_from_thread)
+        # Keep job recommendations up to date in the background
+        from services.matching.recommendations import recommendation_builder
+        recommendation_builder.start(bot_runtime.app)
+        # Write the cover letters of applications left pending
+        from .cover_letter_queue import cover_letter_queue
+        cover_letter_queue.start(send_queue.notify)
         
         logger.info("Telegram bot application created successfully")
         return application
@@ -74,14 +110,18 @@ async def create_application():
         return None
 
 
-async def start_bot():
+async def start_bot(app=None):
     """Start the Telegram bot.
 
+    Args:
+        app: Flask app the handlers share; pass the one the process already
+            built, so there is one engine and config. Built here if None.
+
     Returns:
         The bot instance if successfully started, None otherwise.
     """
     try:
-        global _instance
+        global _instance, _webhook
         async with _lock:
             if _instance:
                 logger.info("Bot instance already exists")
@@ -92,10 +132,17 @@ async def start_bot():
                 logger.error("No telegram bot token provided")
                 return None
 
-            _instance = await create_application()
+            _instance = await create_application(app)
             if _instance:
                 await _instance.initialize()
                 await _instance.start()
+                from .webhook import WEBHOOK_URL, webhook_server
+                if WEBHOOK_URL:
+                    # Receive updates by webhook (see WebhookServer on running several processes)
+                    _webhook = webhook_server(_instance)
+                    await _webhook.start(WEBHOOK_URL)
+                    logger.info("Telegram bot started successfully and receiving updates by webhook")
+                    return _instance
                 # Start polling for updates
                 await _instance.updater.start_polling()
                 logger.info("Telegram bot started successfully and polling for updates")
@@ -116,7 +163,7 @@ async def stop_bot(cleanup_only: bool = False):
             without full shutdown. Defaults to False.
     """
     try:
-        global _instance
+        global _instance, _webhook
         async with _lock:
             if not _instance:
                 logger.info("No active bot instance to stop")
@@ -126,12 +173,27 @@ async def stop_bot(cleanup_only: bool = False):
 
             try:
                 if not cleanup_only:
-                    # Full shutdown - stop polling first
-                    if hasattr(_instance, 'updater') and _instance.updater:
+                    # Full shutdown - stop receiving updates first
+                    if _webhook:
+                        await _webhook.stop()
+                        _webhook = None
+                    elif hasattr(_instance, 'updater') and _instance.updater:
                         await _instance.updater.stop()
+                    # Finish queued resumes and cover letters and send the replies still queued
+                    # before the bot goes away
+                    from .cover_letter_queue import cover_letter_queue
+                    from .resume_pipeline import resume_pipeline
+                    from .send_queue import send_queue
+                    await resume_pipeline.stop()
+                    await cover_letter_queue.stop()
+                    await send_queue.stop()
+                    from services.matching.recommendations import recommendation_builder
+                    await asyncio.to_thread(recommendation_builder.stop)
                     # Then stop the application
                     await _instance.shutdown()
                     _instance = None
+                    from .runtime import bot_runtime
+                    bot_runtime.shutdown()
                     logger.info("Telegram bot stopped successfully")
                 else:
                     # Just cleanup resources
@@ -0,0 +1,232 @@
+import asyncio
+import hmac
+import logging
+import math
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the secret_token given to setWebhook
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+# Webhook mode is used when TELEGRAM_BOT_WEBHOOK_URL is set; its settings
+# are read here only
+WEBHOOK_URL = os.environ.get('TELEGRAM_BOT_WEBHOOK_URL')
+WEBHOOK_SECRET = os.environ.get('TELEGRAM_BOT_WEBHOOK_SECRET')
+WEBHOOK_HOST = os.environ.get('TELEGRAM_BOT_WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.environ.get('TELEGRAM_BOT_WEBHOOK_PORT', '8443'))
+WEBHOOK_WORKERS = int(os.environ.get('TELEGRAM_BOT_WEBHOOK_WORKERS', '8'))
+WEBHOOK_QUEUE_SIZE = int(os.environ.get('TELEGRAM_BOT_WEBHOOK_QUEUE_SIZE', '1000'))
+MAX_CONNECTIONS = int(os.environ.get('TELEGRAM_BOT_MAX_CONNECTIONS', '40'))
+
+# Seconds a request waits for room in a full queue before Telegram is told
+# to retry later
+ENQUEUE_TIMEOUT = 1.0
+
+# Recent queue waits and processing times kept for the metrics
+TIMING_SAMPLES = 1000
+
+# Seconds workers get to finish queued updates when the server stops
+DRAIN_TIMEOUT = 10.0
+
+
+@dataclass
+class WebhookMetrics:
+    """Counters and gauges of a webhook server; times are over recent updates"""
+    received: int
+    rejected: int
+    invalid: int
+    overflowed: int
+    processed: int
+    failed: int
+    queued: int
+    peak_queued: int
+    queue_capacity: int
+    busy_workers: int
+    workers: int
+    wait_ms_avg: float
+    wait_ms_p95: float
+    processing_ms_avg: float
+    processing_ms_p95: float
+
+
+def _avg_p95(samples: Deque[float]) -> Tuple[float, float]:
+    if not samples:
+        return 0.0, 0.0
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return sum(ordered) / len(ordered) * 1000, p95 * 1000
+
+
+class WebhookServer:
+    """
+    Receives Telegram updates by webhook and processes them with N workers.
+
+    Requests without the secret token are refused. Accepted updates are
+    answered as soon as they are queued; each worker has its own bounded
+    queue and updates are routed by chat, so a chat's updates are handled
+    one at a time and in order while different chats proceed concurrently.
+    When a worker falls behind, requests wait up to ``enqueue_timeout`` for
+    room and are then answered 503, so Telegram redelivers later instead of
+    the process buffering without limit.
+
+    The bot keeps per-process state besides these queues: search sessions,
+    the inline job index, job cards, the send queue's per-chat rate limits
+    and the cover letter queue. Several processes can therefore serve one
+    webhook only behind a load balancer that routes every chat to the same
+    process (e.g. by hashing the chat id); otherwise "Next page" buttons
+    expire and send rate limits are exceeded.
+    """
+
+    def __init__(self, application, secret_token: str, path: str = '/telegram/webhook',
+                 workers: int = WEBHOOK_WORKERS, queue_size: int = WEBHOOK_QUEUE_SIZE,
+                 enqueue_timeout: float = ENQUEUE_TIMEOUT):
+        if not secret_token:
+            raise ValueError("A webhook secret token is required")
+        self.application = application
+        self.secret_token = secret_token
+        self.path = path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+        self._waits: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        self._processing: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        self._counts = dict.fromkeys(('received', 'rejected', 'invalid', 'overflowed',
+                                      'processed', 'failed'), 0)
+        self._peak_queued = 0
+        self._busy = 0
+
+    def web_app(self) -> web.Application:
+        """aiohttp application serving the webhook and its metrics"""
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get(self.path.rstrip('/') + '/metrics', self.handle_metrics)
+        app.on_startup.append(self._start_workers)
+        app.on_cleanup.append(self._stop_workers)
+        return app
+
+    async def start(self, webhook_url: str, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> None:
+        """Serve the webhook and register it with Telegram"""
+        self._runner = web.AppRunner(self.web_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        await self.application.bot.set_webhook(
+            url=webhook_url, secret_token=self.secret_token,
+            max_connections=MAX_CONNECTIONS, allowed_updates=Update.ALL_TYPES)
+        logger.info(f"Webhook server listening on {host}:{port}{self.path} "
+                    f"with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop accepting updates and finish the queued ones"""
+        # The webhook stays registered for the next start, or for other
+        # chat-sticky processes still serving it
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def metrics(self) -> WebhookMetrics:
+        wait_avg, wait_p95 = _avg_p95(self._waits)
+        processing_avg, processing_p95 = _avg_p95(self._processing)
+        return WebhookMetrics(
+            **self._counts,
+            queued=sum(queue.qsize() for queue in self._queues),
+            peak_queued=self._peak_queued,
+            queue_capacity=sum(queue.maxsize for queue in self._queues),
+            busy_workers=self._busy,
+            workers=self.workers,
+            wait_ms_avg=wait_avg, wait_ms_p95=wait_p95,
+            processing_ms_avg=processing_avg, processing_ms_p95=processing_p95,
+        )
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), self.secret_token):
+            self._counts['rejected'] += 1
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            self._counts['invalid'] += 1
+            logger.warning(f"Invalid webhook update: {e}")
+            return web.Response(status=400)
+
+        queue = self._queues[self._shard(update)]
+        try:
+            await asyncio.wait_for(queue.put((time.monotonic(), update)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._counts['overflowed'] += 1
+            return web.Response(status=503, headers={'Retry-After': '1'})
+        self._counts['received'] += 1
+        self._peak_queued = max(self._peak_queued, sum(q.qsize() for q in self._queues))
+        return web.Response()
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(asdict(self.metrics()))
+
+    def _shard(self, update: Update) -> int:
+        chat = update.effective_chat
+        user = update.effective_user
+        key = chat.id if chat else user.id if user else update.update_id
+        return hash(key) % len(self._queues)
+
+    async def _start_workers(self, app: web.Application) -> None:
+        per_worker = max(1, math.ceil(self.queue_size / self.workers))
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+
+    async def _stop_workers(self, app: web.Application) -> None:
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)),
+                                   DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook server stopped with {self.metrics().queued} updates unprocessed")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            queued_at, update = await queue.get()
+            started = time.monotonic()
+            self._waits.append(started - queued_at)
+            self._busy += 1
+            try:
+                await self.application.process_update(update)
+                self._counts['processed'] += 1
+            except Exception as e:
+                self._counts['failed'] += 1
+                logger.error(f"Error processing update {update.update_id}: {e}")
+            finally:
+                self._busy -= 1
+                self._processing.append(time.monotonic() - started)
+                queue.task_done()
+
+
+def webhook_server(application) -> WebhookServer:
+    """Webhook server configured from the TELEGRAM_BOT_WEBHOOK_* environment"""
+    return WebhookServer(application, WEBHOOK_SECRET, path=urlsplit(WEBHOOK_URL).path or '/')
+
+
+async def serve_webhook(application) -> None:
+    """Run ``application`` in webhook mode until cancelled"""
+    server = webhook_server(application)
+    await application.initialize()
+    await application.start()
+    await server.start(WEBHOOK_URL)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        await application.stop()
+        await application.shutdown()
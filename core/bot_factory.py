@@ -2,14 +2,25 @@ import logging
 import asyncio
 from typing import Optional
 from telegram.ext import (
-    Application, CommandHandler, MessageHandler, 
-    filters, ConversationHandler
+    Application, CommandHandler, MessageHandler, CallbackQueryHandler,
+    InlineQueryHandler, filters, ConversationHandler
 )
 from services.logging_service import logging_service
+from bot.runtime import bot_runtime
+from bot.send_queue import send_queue
+from bot.persistence import SQLAlchemyPersistence
+from bot.resume_pipeline import resume_pipeline
+from bot.cover_letter_queue import cover_letter_queue
+from bot.inline import handle_inline_query
+from bot.job_cards import APPLY_PATTERN, INFO_PATTERN
+from bot.commands.jobs_command import JobsCommand
+from services.matching.job_alerts import job_alert_fanout
+from services.matching.recommendations import recommendation_builder
 from bot.handlers import (
     start, register, handle_full_name, handle_phone_number, 
-    handle_location, handle_resume, handle_job_search,
-    handle_application, cancel, unknown_command, error_handler
+    handle_location, handle_resume, handle_job_search, handle_search_page, handle_find,
+    handle_application, handle_apply_button, handle_job_info, cancel, unknown_command,
+    error_handler, SEARCH_PAGE_CALLBACK
 )
 
 # Define conversation states
@@ -34,7 +45,7 @@ class BotFactory:
             return cls._instance
             
     def _create_conversation_handler(self) -> ConversationHandler:
-        """Create and configure the conversation handler"""
+        """Create and configure the conversation handler; its state survives restarts"""
         return ConversationHandler(
             entry_points=[CommandHandler('register', register)],
             states={
@@ -43,7 +54,9 @@ class BotFactory:
                 LOCATION: [MessageHandler(filters.LOCATION, handle_location)],
                 RESUME: [MessageHandler(filters.DOCUMENT, handle_resume)]
             },
-            fallbacks=[CommandHandler('cancel', cancel)]
+            fallbacks=[CommandHandler('cancel', cancel)],
+            name='registration',
+            persistent=True
         )
         
     def _setup_command_handlers(self, application: Application):
@@ -51,11 +64,17 @@ class BotFactory:
         application.add_handler(CommandHandler('start', start))
         application.add_handler(self._create_conversation_handler())
         application.add_handler(CommandHandler('search', handle_job_search))
+        application.add_handler(CallbackQueryHandler(handle_search_page, pattern=f'^{SEARCH_PAGE_CALLBACK}:'))
+        application.add_handler(CommandHandler('find', handle_find))
         application.add_handler(CommandHandler('apply', handle_application))
+        application.add_handler(CommandHandler('jobs', JobsCommand().execute))
+        application.add_handler(CallbackQueryHandler(handle_apply_button, pattern=APPLY_PATTERN))
+        application.add_handler(CallbackQueryHandler(handle_job_info, pattern=INFO_PATTERN))
+        application.add_handler(InlineQueryHandler(handle_inline_query))
         
         # Add handler for unknown commands
         application.add_handler(MessageHandler(
-            filters.COMMAND & ~filters.Regex('^/(start|register|search|apply|cancel)$'),
+            filters.COMMAND & ~filters.Regex('^/(start|register|search|find|apply|jobs|cancel)$'),
             unknown_command
         ))
         
@@ -65,8 +84,12 @@ class BotFactory:
         # Add error handler
         application.add_error_handler(error_handler)
         
-    async def create_bot(self) -> Optional[Application]:
-        """Create and initialize a new Telegram bot instance"""
+    async def create_bot(self, app=None) -> Optional[Application]:
+        """
+        Create and initialize a new Telegram bot instance.
+
+        Handlers share ``app`` (built here if not given) through ``bot_runtime``.
+        """
         try:
             from os import getenv
             token = getenv('TELEGRAM_BOT_TOKEN')
@@ -81,11 +104,22 @@ class BotFactory:
                 self.structured_logger.error("Invalid TELEGRAM_BOT_TOKEN format")
                 return None
                 
-            # Create application
-            application = Application.builder().token(token).build()
+            # Build the Flask app once for all handlers
+            await bot_runtime.start(app)
+
+            # Create application; user_data and registrations are kept in the database
+            application = Application.builder().token(token).persistence(SQLAlchemyPersistence()).build()
             
             # Setup handlers
             self._setup_command_handlers(application)
+
+            # Announce jobs going active to matching seekers
+            send_queue.start(application.bot)
+            job_alert_fanout.start(bot_runtime.app, send_queue.enqueue_from_thread)
+            # Keep job recommendations up to date in the background
+            recommendation_builder.start(bot_runtime.app)
+            # Write the cover letters of applications left pending
+            cover_letter_queue.start(send_queue.notify)
             
             self._application = application
             self.structured_logger.info("Telegram bot created successfully")
@@ -108,8 +142,13 @@ class BotFactory:
             await self._application.drop_pending_updates()
             
             if not cleanup_only:
+                await resume_pipeline.stop()
+                await cover_letter_queue.stop()
+                await send_queue.stop()
+                await asyncio.to_thread(recommendation_builder.stop)
                 await self._application.stop()
                 self._application = None
+                bot_runtime.shutdown()
                 
             self.structured_logger.info(
                 f"Telegram bot {'cleanup' if cleanup_only else 'shutdown'} completed"
@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+logger = logging.getLogger(__name__)
+
+# op is one of 'insert', 'update' or 'delete'; values holds the column
+# values of the instance at flush time, so listeners never trigger lazy loads.
+ModelChange = namedtuple('ModelChange', ['op', 'id', 'values'])
+
+_PENDING_KEY = 'committed_change_listeners'
+
+_listeners: Dict[type, List[Tuple[Callable[[ModelChange], None], Optional[frozenset]]]] = {}
+_registered_models = set()
+_lock = threading.Lock()
+
+
+def on_commit(model: type, callback: Callable[[ModelChange], None],
+              watch: Optional[Iterable[str]] = None) -> None:
+    """
+    Call ``callback`` for every committed insert, update or delete of ``model``.
+
+    Changes are collected when the session flushes and delivered only after
+    the transaction commits, so rolled back changes are never seen by
+    in-memory indexes and caches. Updates that touch none of the ``watch``
+    attributes are skipped.
+
+    Args:
+        model: Mapped model class to listen on
+        callback: Called with a ``ModelChange`` after commit
+        watch: Attribute names whose changes are relevant for updates
+    """
+    with _lock:
+        _listeners.setdefault(model, []).append(
+            (callback, frozenset(watch) if watch else None)
+        )
+        if model in _registered_models:
+            return
+        _registered_models.add(model)
+
+    for op in ('insert', 'update', 'delete'):
+        event.listen(model, f'after_{op}', _make_mapper_listener(model, op))
+
+
+def publish(session: Session, model: type, change: ModelChange,
+            changed: Optional[Iterable[str]] = None) -> None:
+    """
+    Deliver ``change`` of ``model`` to its ``on_commit`` listeners once ``session`` commits.
+
+    For writes made with Core statements, which bypass the mapper events
+    the listeners rely on. ``changed`` names the columns an update set, for
+    the listeners' ``watch`` filter; None reaches every listener.
+    """
+    callbacks = _callbacks(model, None if changed is None else set(changed))
+    if callbacks:
+        _queue(session, callbacks, change)
+
+
+def _callbacks(model: type, changed: Optional[set]) -> List[Callable[[ModelChange], None]]:
+    return [
+        callback for callback, watch in _listeners.get(model, ())
+        if changed is None or watch is None or watch & changed
+    ]
+
+
+def _queue(session: Session, callbacks: List[Callable[[ModelChange], None]],
+           change: ModelChange) -> None:
+    session.info.setdefault(_PENDING_KEY, []).extend(
+        (callback, change) for callback in callbacks
+    )
+
+
+def _make_mapper_listener(model: type, op: str):
+    def listener(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+
+        changed = None
+        if op == 'update':
+            state = inspect(target)
+            changed = {
+                attr.key for attr in mapper.column_attrs
+                if state.attrs[attr.key].history.has_changes()
+            }
+
+        callbacks = _callbacks(model, changed)
+        if not callbacks:
+            return
+
+        values = {attr.key: getattr(target, attr.key) for attr in mapper.column_attrs}
+        _queue(session, callbacks, ModelChange(op, values.get('id'), values))
+    return listener
+
+
+@event.listens_for(Session, 'after_commit')
+def _deliver_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for callback, change in pending:
+        try:
+            callback(change)
+        except Exception as e:
+            logger.error(f"Error in commit listener {getattr(callback, '__qualname__', callback)}: {e}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -39,6 +39,16 @@ def init_app(app):
                      logger=True,
                      engineio_logger=True)
         
+        # Keep the on-disk job search index in sync with job writes made by this process
+        from services.search.job_text_index import job_text_index
+        job_text_index.listen()
+
+        # Radius searches need the spatial backend's SQL functions on every
+        # connection, so register it before any connection is handed out
+        from services.spatial.backend import attach_spatial_backend
+        with app.app_context():
+            attach_spatial_backend(db.engine)
+
         # Test database connection within app context
         with app.app_context():
             try:
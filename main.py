@@ -50,7 +50,7 @@ async def amain():
             raise RuntimeError("Failed to initialize services")
         
         # Start Telegram bot
-        bot = await start_bot()
+        bot = await start_bot(manager.app)
         if not bot:
             logger.warning("Failed to start Telegram bot - continuing without bot functionality")
         else:
@@ -4,6 +4,7 @@ from app import create_app
 from extensions import db
 import logging
 import os
+import argparse
 import asyncio
 
 # Configure logging
@@ -52,6 +53,108 @@ async def init_migrations():
         logger.error(f"Migration initialization failed: {e}")
         raise
 
+async def backfill_job_skills(batch_size: int = 500, force: bool = False):
+    """Extract and store skills, description signatures and coordinates of existing jobs"""
+    app = await create_app()
+
+    with app.app_context():
+        from models import Job
+
+        scanned = updated = 0
+        last_id = 0
+        while True:
+            # Keyset pagination keeps each batch query cheap on large tables
+            jobs = (Job.query.filter(Job.id > last_id)
+                    .order_by(Job.id).limit(batch_size).all())
+            if not jobs:
+                break
+            for job in jobs:
+                changed = [
+                    job.refresh_skill_features(force=force),
+                    job.refresh_description_signature(),
+                    job.refresh_coordinates(),
+                ]
+                if any(changed):
+                    updated += 1
+            db.session.commit()
+            scanned += len(jobs)
+            last_id = jobs[-1].id
+            db.session.expunge_all()
+            logger.info(f"Processed {scanned} jobs, {updated} updated")
+
+        logger.info(f"Job skill backfill completed: {updated} of {scanned} jobs updated")
+
+async def rebuild_search_index():
+    """Rebuild the on-disk job search index from the active jobs"""
+    app = await create_app()
+
+    with app.app_context():
+        from services.search.job_text_index import job_text_index
+
+        count = job_text_index.rebuild()
+        logger.info(f"Job search index rebuilt with {count} active jobs")
+
+async def dedup_report():
+    """Log groups of active jobs whose descriptions are near-duplicates"""
+    app = await create_app()
+
+    with app.app_context():
+        from models import Job
+        from services.search.near_duplicates import near_duplicate_index
+
+        groups = near_duplicate_index.duplicate_groups()
+        titles = dict(db.session.query(Job.id, Job.title).filter(
+            Job.id.in_([job_id for group in groups for job_id in group])
+        ))
+        for group in groups:
+            logger.info(f"{len(group)} near-duplicates: " + ", ".join(
+                f"#{job_id} {titles.get(job_id, '')!r}" for job_id in group
+            ))
+        superseded = sum(len(group) - 1 for group in groups)
+        logger.info(f"Near-duplicate report: {len(groups)} groups, {superseded} of "
+                    f"{len(near_duplicate_index)} active jobs superseded by a newer posting")
+
+async def rebuild_recommendations():
+    """Recompute the job recommendations of every job seeker"""
+    app = await create_app()
+
+    with app.app_context():
+        from services.matching.recommendations import recommendation_builder
+
+        count = recommendation_builder.rebuild_all()
+        logger.info(f"Job recommendations rebuilt for {count} job seekers")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Database management commands")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('migrate', help="Create and apply database migrations (default)")
+    backfill = subparsers.add_parser(
+        'backfill-job-skills', help="Extract and store skills, description signatures and coordinates for existing jobs"
+    )
+    backfill.add_argument('--batch-size', type=int, default=500)
+    backfill.add_argument('--force', action='store_true',
+                          help="Re-extract skills even if the stored hash is current")
+    subparsers.add_parser(
+        'rebuild-search-index', help="Rebuild the full-text job search index"
+    )
+    subparsers.add_parser(
+        'dedup-report', help="Report groups of near-duplicate active jobs"
+    )
+    subparsers.add_parser(
+        'rebuild-recommendations', help="Recompute job recommendations of all job seekers"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     # Run the async function using asyncio
-    asyncio.run(init_migrations())
+    if args.command == 'backfill-job-skills':
+        asyncio.run(backfill_job_skills(args.batch_size, args.force))
+    elif args.command == 'rebuild-search-index':
+        asyncio.run(rebuild_search_index())
+    elif args.command == 'dedup-report':
+        asyncio.run(dedup_report())
+    elif args.command == 'rebuild-recommendations':
+        asyncio.run(rebuild_recommendations())
+    else:
+        asyncio.run(init_migrations())
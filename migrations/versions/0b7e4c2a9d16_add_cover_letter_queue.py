@@ -0,0 +1,45 @@
+"""Add cover letter cache and application cover letter status
+
+Revision ID: 0b7e4c2a9d16
+Revises: f5a2d8c1e7b3
+Create Date: 2026-10-18 20:08:44.519027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e4c2a9d16'
+down_revision = 'f5a2d8c1e7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cover_letter_cache',
+    sa.Column('profile_hash', sa.String(length=64), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('job_revision', sa.Integer(), nullable=False),
+    sa.Column('cover_letter', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['job.id'], name='fk_cover_letter_cache_job', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_hash', 'job_id')
+    )
+    with op.batch_alter_table('cover_letter_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cover_letter_cache_job_id'), ['job_id'], unique=False)
+
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cover_letter_status', sa.String(length=20), nullable=False, server_default='pending'))
+    # Existing applications already have whatever cover letter they got
+    op.execute("UPDATE application SET cover_letter_status = 'ready'")
+
+
+def downgrade():
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.drop_column('cover_letter_status')
+
+    with op.batch_alter_table('cover_letter_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cover_letter_cache_job_id'))
+
+    op.drop_table('cover_letter_cache')
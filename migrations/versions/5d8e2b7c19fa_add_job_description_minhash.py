@@ -0,0 +1,26 @@
+"""Add job description MinHash signature
+
+Revision ID: 5d8e2b7c19fa
+Revises: c41f07be2d9a
+Create Date: 2026-10-17 18:02:51.530417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2b7c19fa'
+down_revision = 'c41f07be2d9a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('description_minhash', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('description_minhash')
@@ -0,0 +1,45 @@
+"""Add job recommendation table
+
+Revision ID: 7b3f90c4e1d2
+Revises: 5d8e2b7c19fa
+Create Date: 2026-10-17 18:40:12.804551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3f90c4e1d2'
+down_revision = '5d8e2b7c19fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_recommendation',
+    sa.Column('job_seeker_id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['job.id'], name='fk_job_recommendation_job', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['job_seeker_id'], ['job_seeker.id'], name='fk_job_recommendation_job_seeker', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_seeker_id', 'job_id')
+    )
+    with op.batch_alter_table('job_recommendation', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_job_recommendation_job_id'), ['job_id'], unique=False)
+        batch_op.create_index('ix_job_recommendation_seeker_score', ['job_seeker_id', 'score'], unique=False)
+
+    with op.batch_alter_table('job_seeker', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recommendations_computed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job_seeker', schema=None) as batch_op:
+        batch_op.drop_column('recommendations_computed_at')
+
+    with op.batch_alter_table('job_recommendation', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_recommendation_seeker_score')
+        batch_op.drop_index(batch_op.f('ix_job_recommendation_job_id'))
+
+    op.drop_table('job_recommendation')
@@ -0,0 +1,28 @@
+"""Add job skill features
+
+Revision ID: 9a92de5adabf
+Revises: 3070ebb6cbde
+Create Date: 2026-10-17 16:20:11.402315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a92de5adabf'
+down_revision = '3070ebb6cbde'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_ids', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('skills_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('skills_hash')
+        batch_op.drop_column('skill_ids')
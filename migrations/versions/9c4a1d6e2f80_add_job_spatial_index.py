@@ -0,0 +1,67 @@
+"""Add job spatial index
+
+Revision ID: 9c4a1d6e2f80
+Revises: 7b3f90c4e1d2
+Create Date: 2026-10-17 21:05:37.219846
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4a1d6e2f80'
+down_revision = '7b3f90c4e1d2'
+branch_labels = None
+depends_on = None
+
+
+def _has_postgis(bind):
+    return bind.exec_driver_sql("SELECT 1 FROM pg_extension WHERE extname = 'postgis'").first() is not None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS job_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS job_rtree_insert AFTER INSERT ON job "
+            "WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL "
+            "BEGIN INSERT OR REPLACE INTO job_rtree "
+            "VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS job_rtree_update AFTER UPDATE OF id, latitude, longitude ON job "
+            "BEGIN DELETE FROM job_rtree WHERE id = OLD.id; "
+            "INSERT INTO job_rtree SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude "
+            "WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL; END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS job_rtree_delete AFTER DELETE ON job "
+            "BEGIN DELETE FROM job_rtree WHERE id = OLD.id; END"
+        )
+        op.execute(
+            "INSERT INTO job_rtree SELECT id, latitude, latitude, longitude, longitude "
+            "FROM job WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    elif bind.dialect.name == 'postgresql':
+        if _has_postgis(bind):
+            op.execute(
+                "CREATE INDEX IF NOT EXISTS ix_job_geography ON job "
+                "USING gist (geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)))"
+            )
+        else:
+            op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+            op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+            op.execute("CREATE INDEX IF NOT EXISTS ix_job_earth ON job USING gist (ll_to_earth(latitude, longitude))")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS job_rtree_insert")
+        op.execute("DROP TRIGGER IF EXISTS job_rtree_update")
+        op.execute("DROP TRIGGER IF EXISTS job_rtree_delete")
+        op.execute("DROP TABLE IF EXISTS job_rtree")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_job_geography")
+        op.execute("DROP INDEX IF EXISTS ix_job_earth")
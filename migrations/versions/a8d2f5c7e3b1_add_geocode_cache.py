@@ -0,0 +1,35 @@
+"""Add geocode cache and job geocoded location
+
+Revision ID: a8d2f5c7e3b1
+Revises: 9c4a1d6e2f80
+Create Date: 2026-10-17 22:14:51.630482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d2f5c7e3b1'
+down_revision = '9c4a1d6e2f80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('geocode_cache',
+    sa.Column('query', sa.String(length=255), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('place_name', sa.String(length=128), nullable=True),
+    sa.Column('source', sa.String(length=32), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('query')
+    )
+    # Plain ALTER TABLE both ways; a batch table rebuild would drop the job_rtree triggers on SQLite
+    op.add_column('job', sa.Column('geocoded_location', sa.String(length=128), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job', 'geocoded_location')
+    op.drop_table('geocode_cache')
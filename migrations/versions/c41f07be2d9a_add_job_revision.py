@@ -0,0 +1,26 @@
+"""Add job revision counter
+
+Revision ID: c41f07be2d9a
+Revises: 9a92de5adabf
+Create Date: 2026-10-17 16:41:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f07be2d9a'
+down_revision = '9a92de5adabf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('revision', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,40 @@
+"""Add job alerts and job seeker location index
+
+Revision ID: d7e1b4a9c2f5
+Revises: a8d2f5c7e3b1
+Create Date: 2026-10-18 09:41:27.204918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e1b4a9c2f5'
+down_revision = 'a8d2f5c7e3b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_alert',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('job_seeker_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['job.id'], name='fk_job_alert_job', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['job_seeker_id'], ['job_seeker.id'], name='fk_job_alert_job_seeker', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'job_seeker_id')
+    )
+    with op.batch_alter_table('job_alert', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_job_alert_job_seeker_id'), ['job_seeker_id'], unique=False)
+
+    op.create_index('ix_job_seeker_lat_lon', 'job_seeker', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_job_seeker_lat_lon', table_name='job_seeker')
+
+    with op.batch_alter_table('job_alert', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_alert_job_seeker_id'))
+
+    op.drop_table('job_alert')
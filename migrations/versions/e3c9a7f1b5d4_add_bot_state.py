@@ -0,0 +1,30 @@
+"""Add bot state for conversation persistence
+
+Revision ID: e3c9a7f1b5d4
+Revises: d7e1b4a9c2f5
+Create Date: 2026-10-18 14:12:05.318442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c9a7f1b5d4'
+down_revision = 'd7e1b4a9c2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bot_state',
+    sa.Column('kind', sa.String(length=64), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('data', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'key')
+    )
+
+
+def downgrade():
+    op.drop_table('bot_state')
@@ -0,0 +1,40 @@
+"""Add resume ingestion stage timings
+
+Revision ID: f5a2d8c1e7b3
+Revises: e3c9a7f1b5d4
+Create Date: 2026-10-18 17:36:52.740193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a2d8c1e7b3'
+down_revision = 'e3c9a7f1b5d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_ingestion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('telegram_user_id', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('failed_stage', sa.String(length=32), nullable=True),
+    sa.Column('resume_path', sa.String(length=255), nullable=True),
+    sa.Column('stage_timings', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resume_ingestion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resume_ingestion_telegram_user_id'), ['telegram_user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_ingestion', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resume_ingestion_telegram_user_id'))
+
+    op.drop_table('resume_ingestion')
@@ -4,6 +4,12 @@ from .job import Job
 from .job_seeker import JobSeeker
 from .application import Application
 from .message import Message
+from .job_recommendation import JobRecommendation
+from .geocode_cache import GeocodeCache
+from .job_alert import JobAlert
+from .bot_state import BotState
+from .resume_ingestion import ResumeIngestion
+from .cover_letter_cache import CoverLetterCache
 
 __all__ = [
     'Base',
@@ -11,7 +17,13 @@ __all__ = [
     'Job',
     'JobSeeker',
     'Application',
-    'Message'
+    'Message',
+    'JobRecommendation',
+    'GeocodeCache',
+    'JobAlert',
+    'BotState',
+    'ResumeIngestion',
+    'CoverLetterCache'
 ]
 from .base import Base
 from .employer import Employer
@@ -11,6 +11,8 @@ class Application(Base):
     job_id = db.Column(db.Integer, db.ForeignKey('job.id', name='fk_application_job'), nullable=False)
     telegram_user_id = db.Column(db.String(50), nullable=False)
     cover_letter = db.Column(db.Text)
+    # Filled in by bot.cover_letter_queue after the application is created
+    cover_letter_status = db.Column(db.String(20), nullable=False, default='pending', server_default='pending')
     status = db.Column(db.String(20), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -27,6 +29,10 @@ class Application(Base):
     STATUS_REJECTED = 'rejected'
     STATUS_WITHDRAWN = 'withdrawn'
     
+    COVER_LETTER_PENDING = 'pending'
+    COVER_LETTER_READY = 'ready'
+    COVER_LETTER_FALLBACK = 'fallback'  # the AI backend failed; a template was used
+
     VALID_STATUSES = [
         STATUS_PENDING,
         STATUS_REVIEWING,
@@ -0,0 +1,25 @@
+from extensions import db
+from datetime import datetime
+from .base import Base
+
+class BotState(Base):
+    """Persisted bot state: user_data, chat_data, bot_data and conversation states.
+
+    Rows are written only by ``bot.persistence.SQLAlchemyPersistence``;
+    ``data`` holds the JSON of one entry, e.g. one user's ``user_data`` or the
+    state of one ``/register`` conversation.
+    """
+    __tablename__ = 'bot_state'
+
+    KIND_USER = 'user'
+    KIND_CHAT = 'chat'
+    KIND_BOT = 'bot'
+    KIND_CONVERSATION = 'conversation'
+
+    kind = db.Column(db.String(64), primary_key=True)  # KIND_*, or 'conversation:<handler name>'
+    key = db.Column(db.String(255), primary_key=True)  # user/chat id, or JSON of a conversation key
+    data = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BotState {self.kind} {self.key}>'
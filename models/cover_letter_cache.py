@@ -0,0 +1,24 @@
+from extensions import db
+from datetime import datetime
+from .base import Base
+
+class CoverLetterCache(Base):
+    """An AI cover letter for a job seeker profile and a job.
+
+    Rows are written by ``bot.cover_letter_queue``; ``profile_hash`` is the
+    SHA-256 of the candidate details the letter was written from, so a
+    changed profile misses the cache, and a row only serves the
+    ``job_revision`` it was written for.
+    """
+    __tablename__ = 'cover_letter_cache'
+
+    profile_hash = db.Column(db.String(64), primary_key=True)
+    job_id = db.Column(db.Integer,
+                       db.ForeignKey('job.id', name='fk_cover_letter_cache_job', ondelete='CASCADE'),
+                       primary_key=True, index=True)
+    job_revision = db.Column(db.Integer, nullable=False)
+    cover_letter = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CoverLetterCache job={self.job_id} profile={self.profile_hash[:8]}>'
@@ -0,0 +1,25 @@
+from extensions import db
+from datetime import datetime
+from .base import Base
+
+class GeocodeCache(Base):
+    """Resolved coordinates of a normalized free-text location.
+
+    Rows are written by ``services.geocoding.Geocoder``; rows with another
+    ``source`` than the gazetteer (e.g. manual corrections) take precedence
+    over the bundled gazetteer.
+    """
+    __tablename__ = 'geocode_cache'
+
+    SOURCE_GAZETTEER = 'gazetteer'
+    SOURCE_MANUAL = 'manual'
+
+    query = db.Column(db.String(255), primary_key=True)  # normalize_place() of the location
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    place_name = db.Column(db.String(128))
+    source = db.Column(db.String(32), nullable=False, default=SOURCE_GAZETTEER)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GeocodeCache {self.query!r}>'
@@ -1,8 +1,8 @@
 from extensions import db
 from datetime import datetime
-from sqlalchemy import JSON, Text, func
+from sqlalchemy import JSON, Text, event
+from sqlalchemy.orm import object_session
 from .base import Base
-from math import radians, cos, sin, asin, sqrt
 
 class Job(Base):
     __tablename__ = 'job'
@@ -14,6 +14,7 @@ class Job(Base):
     location = db.Column(db.String(128), nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    geocoded_location = db.Column(db.String(128))  # location text latitude/longitude were geocoded from
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='active')
     job_type = db.Column(db.String(50))  # full-time, part-time, contract, etc
@@ -23,6 +24,10 @@ class Job(Base):
     required_skills = db.Column(JSON)
     preferred_skills = db.Column(JSON)
     experience_level = db.Column(db.String(50))  # entry, mid, senior
+    skill_ids = db.Column(JSON)  # canonical skills extracted at write time
+    skills_hash = db.Column(db.String(64))  # hash of the content skill_ids were extracted from
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bumped on every update
+    description_minhash = db.Column(db.JSON)  # MinHash signature for near-duplicate detection
     
     # Relationships
     employer = db.relationship('Employer', back_populates='jobs')
@@ -78,29 +83,94 @@ class Job(Base):
             raise ValueError(f"Invalid status. Must be one of: {', '.join(self.VALID_STATUSES)}")
         self.status = new_status
 
+    def refresh_skill_features(self, force: bool = False) -> bool:
+        """
+        Extract and store the job's canonical skills if its content changed.
+
+        Skills come from ``required_skills`` when set, otherwise from the
+        description. Extraction is skipped when the stored content hash is
+        still current, unless ``force`` is set.
+
+        Returns:
+            bool: True if ``skill_ids`` was recomputed
+        """
+        from services.matching.features import extract_job_skills, skill_content_hash
+
+        content_hash = skill_content_hash(self.required_skills, self.description)
+        if not force and self.skill_ids is not None and self.skills_hash == content_hash:
+            return False
+        self.skill_ids = extract_job_skills(self.required_skills, self.description)
+        self.skills_hash = content_hash
+        return True
+
+    def refresh_coordinates(self, force: bool = False) -> bool:
+        """
+        Geocode ``location`` into ``latitude``/``longitude`` if it changed.
+
+        Coordinates set explicitly (without a geocoded location) are kept
+        unless ``force`` is set and the location resolves. When a previously
+        geocoded location changes to one that cannot be resolved, the stale
+        coordinates are cleared.
+
+        Returns:
+            bool: True if the coordinates changed
+        """
+        from services.geocoding import geocoder
+
+        has_coordinates = self.latitude is not None and self.longitude is not None
+        if not force and has_coordinates and self.geocoded_location in (None, self.location):
+            return False
+
+        coordinates = geocoder.geocode(self.location)
+        if coordinates is None:
+            if self.geocoded_location is None:
+                return False
+            coordinates = (None, None)
+        changed = (self.latitude, self.longitude) != coordinates
+        self.latitude, self.longitude = coordinates
+        self.geocoded_location = self.location if coordinates[0] is not None else None
+        return changed
+
+    def refresh_description_signature(self) -> bool:
+        """
+        Compute and store the MinHash signature of the description.
+
+        Returns:
+            bool: True if ``description_minhash`` changed
+        """
+        from services.search.near_duplicates import minhash_signature
+
+        signature = minhash_signature(self.description)
+        if signature == self.description_minhash:
+            return False
+        self.description_minhash = signature
+        return True
+
+    @classmethod
+    def spatial_backend(cls):
+        """Spatial query backend for the job table on the current database"""
+        from services.spatial.backend import get_spatial_backend
+
+        return get_spatial_backend(db.engine, cls.__table__)
+
     @staticmethod
     def calculate_distance(lat1: float, lon1: float, lat2: float = None, lon2: float = None):
         """
         Calculate the great circle distance between two points 
         on the earth (specified in decimal degrees)
+
+        With both points given, ``lat1`` ... ``lon2`` may also be arrays;
+        see ``services.geo_distance.haversine_km``.
         """
         if lat2 is None:
-            # If lat2/lon2 not provided, reference to job's location
-            return func.ST_Distance_Sphere(
-                func.ST_MakePoint(Job.longitude, Job.latitude),
-                func.ST_MakePoint(lon1, lat1)
-            ) / 1000  # Convert meters to kilometers
+            # If lat2/lon2 not provided, a SQL expression of the distance
+            # from the job's location, in km
+            return Job.spatial_backend().distance_km(lat1, lon1)
         
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+        from services.geo_distance import haversine_km
 
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
+        distance = haversine_km(lat1, lon1, lat2, lon2)
+        return float(distance) if distance.ndim == 0 else distance
 
     @classmethod
     def search(cls, filters: dict = None, location: tuple = None, radius_km: float = None, 
@@ -127,9 +197,9 @@ class Job(Base):
 
         if location and radius_km:
             lat, lon = location
-            distance = cls.calculate_distance(lat, lon)
-            query = query.having(distance <= radius_km)
-            query = query.order_by(distance)
+            spatial = cls.spatial_backend()
+            query = query.filter(spatial.within_radius(lat, lon, radius_km))
+            query = query.order_by(spatial.distance_km(lat, lon), cls.id)
 
         if skills:
             # Match any of the provided skills
@@ -140,7 +210,8 @@ class Job(Base):
     def matches_job_seeker(self, job_seeker) -> bool:
         """Check if job matches a job seeker's preferences"""
         # Check location preference if set
-        if job_seeker.latitude and job_seeker.longitude:
+        if (job_seeker.latitude and job_seeker.longitude
+                and self.latitude is not None and self.longitude is not None):
             distance = self.calculate_distance(
                 job_seeker.latitude,
                 job_seeker.longitude,
@@ -170,3 +241,15 @@ class Job(Base):
 
     def __repr__(self):
         return f'<Job {self.title}>'
+
+
+@event.listens_for(Job, 'before_update')
+def _bump_revision(mapper, connection, target):
+    """
+    Count the changes of a job, which key its cached scores, cards and cover letters.
+
+    A plain counter rather than a mapper ``version_id_col``, which would also
+    make concurrent edits of a job fail with ``StaleDataError``.
+    """
+    if object_session(target).is_modified(target, include_collections=False):
+        target.revision = (target.revision or 1) + 1
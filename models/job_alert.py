@@ -0,0 +1,24 @@
+from extensions import db
+from datetime import datetime
+from .base import Base
+
+class JobAlert(Base):
+    """A job seeker was notified about a job.
+
+    Rows are written only by ``services.matching.job_alerts`` before the
+    notification is queued, so a job going active again never alerts the
+    same seeker twice.
+    """
+    __tablename__ = 'job_alert'
+
+    job_id = db.Column(db.Integer,
+                       db.ForeignKey('job.id', name='fk_job_alert_job', ondelete='CASCADE'),
+                       primary_key=True)
+    job_seeker_id = db.Column(db.Integer,
+                              db.ForeignKey('job_seeker.id', name='fk_job_alert_job_seeker',
+                                            ondelete='CASCADE'),
+                              primary_key=True, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<JobAlert job={self.job_id} seeker={self.job_seeker_id}>'
@@ -0,0 +1,46 @@
+from extensions import db
+from datetime import datetime
+from typing import Dict
+from .base import Base
+
+class JobRecommendation(Base):
+    """Precomputed match score of an active job for a job seeker.
+
+    Rows are written only by ``services.matching.recommendations`` and hold
+    each seeker's best matches above the recommendation threshold.
+    """
+    __tablename__ = 'job_recommendation'
+
+    job_seeker_id = db.Column(db.Integer,
+                              db.ForeignKey('job_seeker.id', name='fk_job_recommendation_job_seeker',
+                                            ondelete='CASCADE'),
+                              primary_key=True)
+    job_id = db.Column(db.Integer,
+                       db.ForeignKey('job.id', name='fk_job_recommendation_job', ondelete='CASCADE'),
+                       primary_key=True, index=True)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_recommendation_seeker_score', 'job_seeker_id', 'score'),
+    )
+
+    @classmethod
+    def scores_for_seeker(cls, job_seeker_id: int, min_score: float = 0.0) -> Dict[int, float]:
+        """Return the seeker's scores of active jobs by job id, unordered"""
+        from .job import Job
+
+        recommendations = cls.__table__
+        jobs = Job.__table__
+        rows = db.session.execute(
+            recommendations.select()
+            .with_only_columns(recommendations.c.job_id, recommendations.c.score)
+            .join_from(recommendations, jobs, jobs.c.id == recommendations.c.job_id)
+            .where(recommendations.c.job_seeker_id == job_seeker_id,
+                   recommendations.c.score >= min_score,
+                   jobs.c.status == Job.STATUS_ACTIVE)
+        )
+        return {job_id: score for job_id, score in rows}
+
+    def __repr__(self):
+        return f'<JobRecommendation seeker={self.job_seeker_id} job={self.job_id} score={self.score}>'
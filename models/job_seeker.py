@@ -22,6 +22,22 @@ class JobSeeker(Base):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_active = db.Column(db.DateTime, default=datetime.utcnow)
+    recommendations_computed_at = db.Column(db.DateTime)  # set by the recommendation builder
+
+    @staticmethod
+    def default_job_preferences() -> dict:
+        """Job preferences of a new seeker; a new dict each time, as seekers change theirs"""
+        return {
+            'max_distance': 50,  # km
+            'job_types': [],
+            'salary_min': None,
+            'remote_only': False
+        }
+
+    __table_args__ = (
+        # Bounding box prefilter of job alerts
+        db.Index('ix_job_seeker_lat_lon', 'latitude', 'longitude'),
+    )
     
     # Relationships
     applications = db.relationship('Application',
@@ -33,12 +49,7 @@ class JobSeeker(Base):
     def __init__(self, telegram_user_id, **kwargs):
         super(JobSeeker, self).__init__(**kwargs)
         self.telegram_user_id = telegram_user_id
-        self.job_preferences = kwargs.get('job_preferences', {
-            'max_distance': 50,  # km
-            'job_types': [],
-            'salary_min': None,
-            'remote_only': False
-        })
+        self.job_preferences = kwargs.get('job_preferences', self.default_job_preferences())
         self.skills = kwargs.get('skills', [])
 
     def update_location(self, latitude: float, longitude: float, location_name: str = None):
@@ -64,19 +75,28 @@ class JobSeeker(Base):
         self.last_active = datetime.utcnow()
 
     def get_matching_jobs(self, limit: int = 10):
-        """Get matching jobs based on seeker's preferences and location"""
+        """
+        Get matching jobs based on seeker's preferences and location.
+
+        Jobs come from the precomputed ``job_recommendation`` rows, best match
+        first; nothing is scored here.
+        """
         from .job import Job
-        from sqlalchemy import and_
-        
-        query = Job.query.filter(Job.status == Job.STATUS_ACTIVE)
+        from .job_recommendation import JobRecommendation
+
+        query = Job.query.join(JobRecommendation, JobRecommendation.job_id == Job.id).filter(
+            JobRecommendation.job_seeker_id == self.id,
+            Job.status == Job.STATUS_ACTIVE
+        )
 
         # Apply location filter if coordinates are available
         if self.latitude and self.longitude and self.job_preferences.get('max_distance'):
             max_distance = self.job_preferences['max_distance']
-            query = query.filter(Job.calculate_distance(
+            query = query.filter(Job.spatial_backend().within_radius(
                 self.latitude,
-                self.longitude
-            ) <= max_distance)
+                self.longitude,
+                max_distance
+            ))
 
         # Apply remote filter
         if self.job_preferences.get('remote_only'):
@@ -90,7 +110,7 @@ class JobSeeker(Base):
         if self.job_preferences.get('salary_min'):
             query = query.filter(Job.salary_min >= self.job_preferences['salary_min'])
 
-        return query.limit(limit).all()
+        return query.order_by(JobRecommendation.score.desc(), Job.id).limit(limit).all()
 
     def __repr__(self):
         return f'<JobSeeker {self.telegram_user_id}>'
@@ -0,0 +1,28 @@
+from extensions import db
+from datetime import datetime
+from .base import Base
+
+class ResumeIngestion(Base):
+    """One resume run through the ingestion pipeline and how long each stage took.
+
+    Rows are written only by ``bot.resume_pipeline`` when a resume is done or
+    failed; ``stage_timings`` maps stage names (``queued``, ``download``,
+    ``text``, ``ocr``, ``skills``, ``save``) to seconds.
+    """
+    __tablename__ = 'resume_ingestion'
+
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    telegram_user_id = db.Column(db.String(64), nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False)
+    failed_stage = db.Column(db.String(32))
+    resume_path = db.Column(db.String(255))
+    stage_timings = db.Column(db.JSON, nullable=False, default=dict)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ResumeIngestion {self.id} {self.status}>'
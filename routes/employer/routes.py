@@ -7,6 +7,7 @@ from extensions import db
 from datetime import datetime
 from core.db_utils import session_scope, safe_get, cleanup_session
 from services.logging_service import logging_service
+from services.search.near_duplicates import near_duplicate_index
 from jinja2.exceptions import TemplateError
 
 logger = logging_service.get_structured_logger(__name__)
@@ -54,9 +55,16 @@ def new_job():
                 employer_id=current_user.id,
                 created_at=datetime.utcnow()
             )
+            job.refresh_skill_features()
+            job.refresh_description_signature()
+            job.refresh_coordinates()
+            duplicates = near_duplicate_index.find_duplicates(job.description_minhash)
             session.add(job)
             logger.info(f'New job created by employer {current_user.id}')
             flash('Your job posting has been successfully created', 'success')
+            if duplicates:
+                flash('This posting looks very similar to active job(s) '
+                      f'{", ".join(f"#{job_id}" for job_id, _ in duplicates)}', 'warning')
             
         return redirect(url_for('employer.jobs'))
     except Exception as e:
@@ -82,6 +90,9 @@ def edit_job(job_id):
             job.title = request.form.get('title')
             job.description = request.form.get('description')
             job.location = request.form.get('location')
+            job.refresh_skill_features()
+            job.refresh_description_signature()
+            job.refresh_coordinates()
             logger.info(f'Job {job_id} updated by employer {current_user.id}')
             flash('Your job posting has been successfully updated', 'success')
             
@@ -6,10 +6,47 @@ from http import HTTPStatus
 from sqlalchemy.exc import SQLAlchemyError
 from core.db_utils import session_scope, safe_get, safe_add, safe_delete
 from services.logging_service import logging_service
+from services.search.job_text_index import job_text_index
+from services.search.near_duplicates import near_duplicate_index
 
 logger = logging_service.get_structured_logger(__name__)
 job_bp = Blueprint('job', __name__)
 
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'description': job.description,
+        'location': job.location,
+        'latitude': job.latitude,
+        'longitude': job.longitude,
+        'status': job.status,
+        'created_at': job.created_at.isoformat(),
+        'employer_id': job.employer_id
+    }
+
+def search_jobs(query):
+    """Active jobs matching a keyword query, ranked by BM25 relevance"""
+    limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'Please provide a valid limit and offset'}), HTTPStatus.BAD_REQUEST
+
+    ranked = job_text_index.search(query, limit=min(limit, SEARCH_MAX_LIMIT), offset=offset,
+                                   exclude=near_duplicate_index.superseded_ids())
+    with session_scope() as session:
+        jobs = {job.id: job for job in session.query(Job).filter(
+            Job.id.in_([job_id for job_id, _ in ranked]),
+            Job.status == Job.STATUS_ACTIVE
+        )}
+        return jsonify([
+            dict(job_to_dict(jobs[job_id]), score=round(score, 4))
+            for job_id, score in ranked if job_id in jobs
+        ]), HTTPStatus.OK
+
 @job_bp.route('/jobs', methods=['GET'])
 def list_jobs():
     try:
@@ -18,19 +55,13 @@ def list_jobs():
             logger.warning(f'Invalid job status requested: {status}')
             return jsonify({'error': 'Please select a valid job status'}), HTTPStatus.BAD_REQUEST
             
+        query = request.args.get('q', '').strip()
+        if query:
+            return search_jobs(query)
+
         with session_scope() as session:
             jobs = session.query(Job).filter_by(status=status).all()
-            return jsonify([{
-                'id': job.id,
-                'title': job.title,
-                'description': job.description,
-                'location': job.location,
-                'latitude': job.latitude,
-                'longitude': job.longitude,
-                'status': job.status,
-                'created_at': job.created_at.isoformat(),
-                'employer_id': job.employer_id
-            } for job in jobs]), HTTPStatus.OK
+            return jsonify([job_to_dict(job) for job in jobs]), HTTPStatus.OK
     except SQLAlchemyError as e:
         logger.error(f'Database error while listing jobs: {str(e)}')
         return render_template('errors/500.html'), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -63,22 +94,24 @@ def create_job():
                 longitude=data.get('longitude'),
                 status=data.get('status', Job.STATUS_DRAFT)
             )
+            job.refresh_skill_features()
+            job.refresh_description_signature()
+            job.refresh_coordinates()
+            duplicates = near_duplicate_index.find_duplicates(job.description_minhash)
 
             if not safe_add(job):
                 logger.error('Failed to add new job to database')
                 return render_template('errors/500.html'), HTTPStatus.INTERNAL_SERVER_ERROR
 
-            return jsonify({
-                'id': job.id,
-                'title': job.title,
-                'description': job.description,
-                'location': job.location,
-                'latitude': job.latitude,
-                'longitude': job.longitude,
-                'status': job.status,
-                'created_at': job.created_at.isoformat(),
-                'employer_id': job.employer_id
-            }), HTTPStatus.CREATED
+            if duplicates:
+                logger.info(f'Job {job.id} is a near-duplicate of active jobs {[job_id for job_id, _ in duplicates]}')
+            return jsonify(dict(
+                job_to_dict(job),
+                possible_duplicates=[
+                    {'id': job_id, 'similarity': round(similarity, 2)}
+                    for job_id, similarity in duplicates
+                ]
+            )), HTTPStatus.CREATED
     except SQLAlchemyError as e:
         logger.error(f'Database error while creating job: {str(e)}')
         return render_template('errors/500.html'), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -141,6 +174,9 @@ def update_job(job_id):
                     logger.warning(f'Invalid status update attempt: {data["status"]}')
                     return jsonify({'error': 'Please select a valid job status'}), HTTPStatus.BAD_REQUEST
                 job.status = data['status']
+            job.refresh_skill_features()
+            job.refresh_description_signature()
+            job.refresh_coordinates()
 
             return jsonify({
                 'id': job.id,
@@ -59,7 +59,7 @@ class Runner:
 
             # Initialize bot
             self.bot_factory = await BotFactory.get_instance()
-            bot_app = await self.bot_factory.create_bot()
+            bot_app = await self.bot_factory.create_bot(self.app)
             if not bot_app:
                 logger.error("Failed to create Telegram bot")
                 return False
@@ -84,13 +84,17 @@ class Runner:
                 )
             )
 
-            # Start bot polling
-            bot_task = asyncio.create_task(
-                self.bot_factory._application.run_polling(
-                    drop_pending_updates=True,
-                    close_loop=False
+            # Receive bot updates by webhook when one is configured, else poll
+            from bot.webhook import WEBHOOK_URL, serve_webhook
+            if WEBHOOK_URL:
+                bot_task = asyncio.create_task(serve_webhook(self.bot_factory._application))
+            else:
+                bot_task = asyncio.create_task(
+                    self.bot_factory._application.run_polling(
+                        drop_pending_updates=True,
+                        close_loop=False
+                    )
                 )
-            )
 
             # Wait for shutdown signal
             await self.shutdown_event.wait()
@@ -16,7 +16,8 @@ ABACUS_API_BASE_URL = "https://api.abacus.ai/v0"
 
 async def generate_cover_letter(
     candidate_info: Dict[str, Union[List[str], int, str]], 
-    job_info: Dict[str, str]
+    job_info: Dict[str, str],
+    client: Optional[httpx.AsyncClient] = None
 ) -> str:
     """
     Generate a personalized cover letter using AI based on candidate and job information.
@@ -34,6 +35,8 @@ async def generate_cover_letter(
             - title (str): Job title
             - company (str): Company name
             - description (str): Job description/requirements
+
+        client: HTTP client to reuse; a new one is opened for the call if not given
             
     Returns:
         str: Generated cover letter text
@@ -44,54 +47,16 @@ async def generate_cover_letter(
         Exception: For any other unexpected errors
     """
     try:
-        # Validate required fields
-        required_job_fields = ['title', 'company', 'description']
-        if not all(field in job_info for field in required_job_fields):
-            raise KeyError("Missing required job information fields")
-
-        # Prepare skills list safely
-        technical_skills = candidate_info.get('technical_skills', [])
-        soft_skills = candidate_info.get('soft_skills', [])
-        all_skills = ', '.join(technical_skills + soft_skills)
-        
-        # Prepare experience and education safely
-        experience = '; '.join(candidate_info.get('experience', []))
-        education = '; '.join(candidate_info.get('education', []))
-
-        prompt = f"""
-        Generate a professional cover letter based on:
-
-        Candidate Background:
-        - Skills: {all_skills}
-        - Experience: {experience}
-        - Education: {education}
-
-        Job Details:
-        - Title: {job_info['title']}
-        - Company: {job_info['company']}
-        - Requirements: {job_info['description']}
-        """
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{ABACUS_API_BASE_URL}/generate",
-                headers={"Authorization": f"Bearer {ABACUS_API_KEY}"},
-                json={"prompt": prompt},
-                timeout=30.0
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            if 'text' in result:
-                return result['text']
+        cover_letter = await request_cover_letter(candidate_info, job_info, client)
+        if cover_letter is not None:
+            return cover_letter
 
         logger.warning("API response missing 'text' field, falling back to template")
-        return _generate_fallback_cover_letter(candidate_info, job_info)
+        return fallback_cover_letter(candidate_info, job_info)
 
     except httpx.HTTPError as e:
         logger.error(f"HTTP error occurred while generating cover letter: {e}")
-        return _generate_fallback_cover_letter(candidate_info, job_info)
+        return fallback_cover_letter(candidate_info, job_info)
     except KeyError as e:
         logger.error(f"Missing required field in input data: {e}")
         return "Error: Missing required information for cover letter generation."
@@ -99,7 +64,71 @@ async def generate_cover_letter(
         logger.error(f"Unexpected error generating cover letter: {e}")
         return "Error generating cover letter. Please try again later."
 
-def _generate_fallback_cover_letter(
+async def request_cover_letter(
+    candidate_info: Dict[str, Union[List[str], int, str]],
+    job_info: Dict[str, str],
+    client: Optional[httpx.AsyncClient] = None
+) -> Optional[str]:
+    """
+    Ask the AI backend for a cover letter, without any fallback.
+
+    Args:
+        candidate_info: Candidate details, as for ``generate_cover_letter``
+        job_info: Job details, as for ``generate_cover_letter``
+        client: HTTP client to reuse; a new one is opened for the call if not given
+
+    Returns:
+        Optional[str]: The cover letter, or None if the response has no text
+
+    Raises:
+        httpx.HTTPError: If there's an error in the API request
+        KeyError: If required fields are missing in the input dictionaries
+    """
+    # Validate required fields
+    required_job_fields = ['title', 'company', 'description']
+    if not all(field in job_info for field in required_job_fields):
+        raise KeyError("Missing required job information fields")
+
+    # Prepare skills list safely
+    technical_skills = candidate_info.get('technical_skills', [])
+    soft_skills = candidate_info.get('soft_skills', [])
+    all_skills = ', '.join(technical_skills + soft_skills)
+
+    # Prepare experience and education safely
+    experience = '; '.join(candidate_info.get('experience', []))
+    education = '; '.join(candidate_info.get('education', []))
+
+    prompt = f"""
+    Generate a professional cover letter based on:
+
+    Candidate Background:
+    - Skills: {all_skills}
+    - Experience: {experience}
+    - Education: {education}
+
+    Job Details:
+    - Title: {job_info['title']}
+    - Company: {job_info['company']}
+    - Requirements: {job_info['description']}
+    """
+
+    if client is None:
+        async with httpx.AsyncClient() as client:
+            return await _post_prompt(client, prompt)
+    return await _post_prompt(client, prompt)
+
+async def _post_prompt(client: httpx.AsyncClient, prompt: str) -> Optional[str]:
+    response = await client.post(
+        f"{ABACUS_API_BASE_URL}/generate",
+        headers={"Authorization": f"Bearer {ABACUS_API_KEY}"},
+        json={"prompt": prompt},
+        timeout=30.0
+    )
+
+    response.raise_for_status()
+    return response.json().get('text')
+
+def fallback_cover_letter(
     candidate_info: Dict[str, Union[List[str], int, str]], 
     job_info: Dict[str, str]
 ) -> str:
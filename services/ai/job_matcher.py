@@ -1,6 +1,6 @@
 # Standard library imports
 import logging
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -31,53 +31,50 @@ def calculate_job_match(
             }
     
     Returns:
-        int: Match percentage between 0 and 100
+        int: Match percentage between 0 and 100, see ``services.matching.engine.MatchEngine``
         
     Raises:
-        KeyError: If required keys are missing from input dictionaries
         ValueError: If input data types are invalid
-        Exception: For other unexpected errors
     """
-    try:
-        # Validate input types
-        if not isinstance(candidate_skills, dict) or not isinstance(job_requirements, dict):
-            raise ValueError("Both candidate_skills and job_requirements must be dictionaries")
+    from services.matching.engine import match_engine
 
-        # Calculate technical skills match
-        candidate_tech_skills = set(candidate_skills.get('technical_skills', []))
-        required_skills = set(job_requirements.get('required_skills', []))
-        
-        if not required_skills:
-            logger.warning("No required skills specified in job requirements")
-            tech_match = 1.0
-        else:
-            matching_skills = candidate_tech_skills & required_skills
-            tech_match = len(matching_skills) / len(required_skills)
-        
-        # Calculate experience match
-        exp_years = candidate_skills.get('total_years', 0)
-        required_years = job_requirements.get('required_years', 0)
-        
-        if not isinstance(exp_years, (int, float)) or not isinstance(required_years, (int, float)):
-            raise ValueError("Years of experience must be numeric")
-            
-        exp_match = min(exp_years / max(required_years, 1), 1.0) if required_years > 0 else 1.0
-        
-        # Weight the scores (60% skills, 40% experience)
-        total_score = (tech_match * 0.6) + (exp_match * 0.4)
-        
-        # Convert to percentage and ensure it's between 0 and 100
-        match_percentage = max(0, min(100, int(total_score * 100)))
-        
-        logger.debug(f"Match calculation - Tech: {tech_match:.2f}, Exp: {exp_match:.2f}, Total: {match_percentage}%")
-        return match_percentage
-        
-    except KeyError as e:
-        logger.error(f"Missing required key in input data: {e}")
-        raise
-    except ValueError as e:
-        logger.error(f"Invalid input data: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error calculating job match: {e}")
-        return 50  # Return default match percentage on unexpected errors
\ No newline at end of file
+    # Validate input types
+    if not isinstance(candidate_skills, dict) or not isinstance(job_requirements, dict):
+        raise ValueError("Both candidate_skills and job_requirements must be dictionaries")
+
+    exp_years = candidate_skills.get('total_years', 0)
+    required_years = job_requirements.get('required_years', 0)
+    if not isinstance(exp_years, (int, float)) or not isinstance(required_years, (int, float)):
+        raise ValueError("Years of experience must be numeric")
+
+    match_percentage = int(match_engine.score(candidate_skills, job_requirements))
+    logger.debug(f"Match calculation - Total: {match_percentage}%")
+    return match_percentage
+
+def find_job_matches(candidate_skills: CandidateSkills, limit: int = 10) -> List[Tuple[int, int]]:
+    """
+    Score the active jobs that share at least one technical skill with the candidate.
+
+    Candidate jobs are retrieved from the in-process inverted skill index and
+    scored in one batch, so only relevant jobs are scored and no ORM objects
+    are built.
+
+    Args:
+        candidate_skills: Candidate's skills, see ``calculate_job_match``
+        limit: Maximum number of results
+
+    Returns:
+        List[Tuple[int, int]]: ``(job_id, match_percentage)`` pairs, best first
+    """
+    from services.matching.engine import match_engine
+    from services.matching.skill_index import skill_index
+    from services.search.near_duplicates import near_duplicate_index
+
+    features = skill_index.candidate_features(
+        candidate_skills.get('technical_skills', []),
+        exclude=near_duplicate_index.superseded_ids()
+    )
+    return [
+        (job_id, int(score))
+        for job_id, score in match_engine.top(candidate_skills, features, limit)
+    ]
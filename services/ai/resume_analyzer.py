@@ -142,22 +142,7 @@ def calculate_job_match(
         job_requirements (Dict[str, Union[List[str], int]]): Job requirements
         
     Returns:
-        int: Match percentage (0-100)
+        int: Match percentage (0-100), see ``services.matching.engine.MatchEngine``
     """
-    try:
-        # Calculate technical skills match
-        tech_match = len(set(candidate_skills.get('technical_skills', [])) & 
-                        set(job_requirements.get('required_skills', [])))
-        
-        # Calculate experience match
-        exp_years = candidate_skills.get('total_years', 0)
-        required_years = job_requirements.get('required_years', 0)
-        exp_match = min(exp_years / max(required_years, 1), 1.0) if required_years > 0 else 1.0
-        
-        # Weight the scores (60% skills, 40% experience)
-        total_score = (tech_match * 0.6) + (exp_match * 0.4)
-        return int(total_score * 100)
-        
-    except Exception as e:
-        logger.error(f"Error calculating job match: {e}")
-        return 50
\ No newline at end of file
+    from services.matching.engine import match_engine
+    return int(match_engine.score(candidate_skills, job_requirements))
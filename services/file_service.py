@@ -7,7 +7,7 @@ import docx2txt
 from PIL import Image
 import io
 from pathlib import Path
-from typing import Optional, Dict, List, Union
+from typing import Optional, Dict, List, Tuple, Union
 from werkzeug.utils import secure_filename
 from telegram import File
 from models.employer import Employer
@@ -49,6 +49,20 @@ async def extract_resume_data(resume_path: str) -> Dict[str, Any]:
             logger.error(f"Unsupported file format: {file_ext}")
             return get_default_resume_data()
 
+        extracted_data = analyze_resume_text(text_content)
+        logger.info(f"Extracted resume data for {resume_path}")
+        return extracted_data
+
+    except Exception as e:
+        logger.error(f"Error extracting resume data: {str(e)}")
+        return get_default_resume_data()
+
+def analyze_resume_text(text_content: str) -> Dict[str, Any]:
+    """Skills, experience, education, certifications and languages of a resume's text, by AI
+
+    Blocks on the remote call; async callers run it in a thread.
+    """
+    try:
         # Check for Abacus API key
         api_key = os.getenv('ABACUS_API_KEY')
         if not api_key:
@@ -96,22 +110,38 @@ skills, experience, education, certifications, languages"""
         # Parse API response
         api_response = response.json()
         extracted_data = json.loads(api_response['choices'][0]['message']['content'])
-        logger.info(f"Successfully extracted resume data using AI for {resume_path}")
         return extracted_data
 
     except Exception as e:
-        logger.error(f"Error extracting resume data: {str(e)}")
+        logger.error(f"Error analyzing resume text: {str(e)}")
         return get_default_resume_data()
 
 def extract_from_pdf(pdf_path: str) -> str:
     """Extract text from PDF including images"""
+    text_content, image_count = extract_pdf_text(pdf_path)
+    if image_count:
+        text_content += ocr_pdf_images(pdf_path)
+    return text_content
+
+def extract_pdf_text(pdf_path: str) -> Tuple[str, int]:
+    """Text layer of a PDF and the number of images embedded in it"""
     text_content = ""
-    
+    image_count = 0
+
     # Extract regular text using PyMuPDF (more reliable than PyPDF2)
     doc = fitz.open(pdf_path)
     for page in doc:
         text_content += page.get_text()
-        
+        image_count += len(page.get_images())
+    doc.close()
+    return text_content, image_count
+
+def ocr_pdf_images(pdf_path: str) -> str:
+    """Text of the images embedded in a PDF, by OCR"""
+    text_content = ""
+
+    doc = fitz.open(pdf_path)
+    for page in doc:
         # Extract images and process them with OCR
         images = page.get_images()
         for img_index, img in enumerate(images):
@@ -0,0 +1,125 @@
+import csv
+import logging
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_FILE = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+_APOSTROPHES_RE = re.compile(r"['’`´]")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_place(text: Optional[str]) -> str:
+    """
+    Lowercase a place name, strip accents and punctuation and collapse spaces.
+
+    Apostrophes are dropped rather than split on, so "Ra'anana" and
+    "Raanana" normalize alike; hyphens separate words ("Tel-Aviv").
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = _APOSTROPHES_RE.sub('', text.lower())
+    return _NON_WORD_RE.sub(' ', text).strip()
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    region: str
+    latitude: float
+    longitude: float
+
+    @property
+    def coordinates(self) -> Tuple[float, float]:
+        return self.latitude, self.longitude
+
+
+class Gazetteer:
+    """
+    Offline place name index resolving free-text locations to coordinates.
+
+    Names and aliases from the bundled CSV are compiled into a token trie,
+    like the skill automaton of ``SkillMatcher``. A lookup walks the trie
+    from every token of the text and keeps the longest match (leftmost on
+    ties), so "Senior dev, Tel Aviv-Yafo (hybrid)" resolves to Tel Aviv
+    without scanning the place list. Earlier CSV rows win for names that
+    appear twice.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DEFAULT_GAZETTEER_FILE
+        self._root: Optional[Dict] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return self._size
+
+    def lookup(self, text: Optional[str]) -> Optional[Place]:
+        """Return the place mentioned in ``text``, None if none is known"""
+        tokens = normalize_place(text).split()
+        if not tokens:
+            return None
+        root = self._ensure_loaded()
+        best: Optional[Place] = None
+        best_length = 0
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            pos = start + 1
+            while node is not None:
+                place = node.get(None)
+                if place is not None and pos - start > best_length:
+                    best, best_length = place, pos - start
+                if pos >= len(tokens):
+                    break
+                node = node.get(tokens[pos])
+                pos += 1
+        return best
+
+    def coordinates(self, text: Optional[str]) -> Optional[Tuple[float, float]]:
+        """Return ``(latitude, longitude)`` of the place mentioned in ``text``"""
+        place = self.lookup(text)
+        return place.coordinates if place else None
+
+    def _ensure_loaded(self) -> Dict:
+        if self._root is None:
+            with self._lock:
+                if self._root is None:
+                    self._root = self._load()
+        return self._root
+
+    def _load(self) -> Dict:
+        root: Dict = {}
+        size = 0
+        try:
+            with open(self.path, encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    place = Place(row['name'], row['country'], row['region'],
+                                  float(row['latitude']), float(row['longitude']))
+                    size += 1
+                    names = [row['name']] + [alias for alias in row['aliases'].split('|') if alias]
+                    for name in names:
+                        node = root
+                        for token in normalize_place(name).split():
+                            node = node.setdefault(token, {})
+                        if node is not root:
+                            node.setdefault(None, place)
+        except OSError as e:
+            logger.error(f"Could not load gazetteer {self.path}: {e}")
+        self._size = size
+        logger.info(f"Gazetteer loaded with {size} places")
+        return root
+
+
+# Global instance
+gazetteer = Gazetteer()
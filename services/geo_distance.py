@@ -0,0 +1,112 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Distances are haversine distances on a sphere of this radius, within
+# about 0.5% of the WGS-84 geodesic
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Haversine distance in km between points given in degrees.
+
+    Arguments broadcast like NumPy arrays, so one point can be measured
+    against arrays of points, or a column of query points (shape ``(q, 1)``)
+    against a row of jobs (shape ``(n,)``) to get a ``(q, n)`` matrix.
+    Scalar arguments return a NumPy scalar.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64))
+                              for value in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def longitude_span(latitude: float, radius_km: float) -> Optional[float]:
+    """
+    Half-width in degrees of longitude of the bounding box of a circle.
+
+    Returns None when the circle reaches a pole and its box spans every longitude.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    cos_lat = math.cos(math.radians(latitude))
+    if (abs(latitude) + radius_km / KM_PER_DEGREE >= 90 or angular >= math.pi / 2
+            or math.sin(angular) >= cos_lat):
+        return None
+    return math.degrees(math.asin(math.sin(angular) / cos_lat))
+
+
+def bounding_box_mask(latitudes: np.ndarray, longitudes: np.ndarray,
+                      latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+    """
+    Points that may lie within ``radius_km`` of a query point.
+
+    The box never excludes a point inside the circle. It wraps around the
+    antimeridian and spans every longitude when the circle reaches a pole.
+    """
+    mask = np.abs(latitudes - latitude) <= radius_km / KM_PER_DEGREE
+    lon_span = longitude_span(latitude, radius_km)
+    if lon_span is None:
+        return mask
+    # Smallest angle between the longitudes, in [0, 180]
+    lon_delta = np.abs((longitudes - longitude + 180) % 360 - 180)
+    return mask & (lon_delta <= lon_span)
+
+
+def within_radius(latitudes: np.ndarray, longitudes: np.ndarray,
+                  latitude: float, longitude: float,
+                  radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points within ``radius_km`` of one query point.
+
+    Points outside a cheap bounding box are dropped first; haversine is
+    computed for the survivors only, in one vectorized call.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indices of the points inside the radius
+        and their distances, closest first (ties by index)
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    candidates = np.flatnonzero(bounding_box_mask(latitudes, longitudes, latitude, longitude, radius_km))
+    distances = haversine_km(latitude, longitude, latitudes[candidates], longitudes[candidates])
+    inside = distances <= radius_km
+    candidates, distances = candidates[inside], distances[inside]
+    order = np.lexsort((candidates, distances))
+    return candidates[order], distances[order]
+
+
+def within_radius_matrix(query_latitudes: np.ndarray, query_longitudes: np.ndarray,
+                         latitudes: np.ndarray, longitudes: np.ndarray,
+                         radii_km) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distances from many query points to many points, NaN outside each query's radius.
+
+    ``radii_km`` is one radius or one per query point. Only the columns
+    that fall in at least one query's bounding box are measured.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: ``(q, n)`` boolean matrix of points
+        within each query's radius and the ``(q, n)`` distance matrix
+    """
+    query_latitudes = np.asarray(query_latitudes, dtype=np.float64)
+    query_longitudes = np.asarray(query_longitudes, dtype=np.float64)
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    radii = np.broadcast_to(np.asarray(radii_km, dtype=np.float64), query_latitudes.shape)
+
+    q, n = len(query_latitudes), len(latitudes)
+    near = np.zeros((q, n), dtype=bool)
+    for i in range(q):
+        near[i] = bounding_box_mask(latitudes, longitudes, query_latitudes[i],
+                                    query_longitudes[i], radii[i])
+    columns = np.flatnonzero(near.any(axis=0))
+    distances = np.full((q, n), np.nan)
+    distances[:, columns] = haversine_km(query_latitudes[:, None], query_longitudes[:, None],
+                                         latitudes[columns], longitudes[columns])
+    within = near & (distances <= radii[:, None])
+    distances[~within] = np.nan
+    return within, distances
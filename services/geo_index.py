@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.geo_distance import within_radius
+
+logger = logging.getLogger(__name__)
+
+# Job columns whose changes affect the index
+INDEXED_FIELDS = ('latitude', 'longitude', 'status')
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+# Grid cells are CELL_DEGREES x CELL_DEGREES, about 11 km high
+CELL_DEGREES = 0.1
+
+# A degree of latitude is at least this long on the WGS-84 ellipsoid, so the
+# latitude difference alone gives a cheap lower bound on geodesic distance
+MIN_KM_PER_LAT_DEGREE = 110.57
+# Polar radius; angular distances computed with it are upper bounds
+MIN_EARTH_RADIUS_KM = 6356.752
+
+Point = Tuple[int, float, float]  # (job_id, latitude, longitude)
+
+
+class JobGeoIndex:
+    """
+    Uniform latitude/longitude grid of active jobs' coordinates.
+
+    A radius query visits only the grid cells covering the circle's bounding
+    box (one cell of padding absorbs bounding box approximations) and returns
+    the jobs in them; exact distances are then only needed for those
+    candidates. Longitudes wrap around the antimeridian and boxes reaching a
+    pole cover every longitude.
+
+    Like ``SkillIndex``, it is built from the database on first use and then
+    maintained from committed ``Job`` inserts, updates and deletes.
+    """
+
+    def __init__(self, cell_degrees: float = CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._lon_cells = int(round(360 / cell_degrees))
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def ensure_loaded(self) -> None:
+        """Build the index from active jobs and start listening for job changes"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from core.db_events import on_commit
+            from extensions import db
+            from models import Job
+
+            # Listen before loading so changes committed during the load are not lost
+            if not self._listening:
+                on_commit(Job, self.apply_change, watch=INDEXED_FIELDS)
+                self._listening = True
+            rows = db.session.query(Job.id, Job.latitude, Job.longitude).filter(
+                Job.status == Job.STATUS_ACTIVE,
+                Job.latitude.isnot(None),
+                Job.longitude.isnot(None)
+            )
+            for job_id, latitude, longitude in rows:
+                self.index_job(job_id, latitude, longitude)
+            self._loaded = True
+            logger.info(f"Geo index built with {len(self._points)} active jobs")
+
+    def index_job(self, job_id: int, latitude: float, longitude: float) -> None:
+        """Add or move a job in the index"""
+        with self._lock:
+            self.remove_job(job_id)
+            self._cells.setdefault(self._cell(latitude, longitude), set()).add(job_id)
+            self._points[job_id] = (latitude, longitude)
+
+    def remove_job(self, job_id: int) -> None:
+        """Remove a job from the index if present"""
+        with self._lock:
+            point = self._points.pop(job_id, None)
+            if point is None:
+                return
+            key = self._cell(*point)
+            cell = self._cells.get(key)
+            if cell is not None:
+                cell.discard(job_id)
+                if not cell:
+                    del self._cells[key]
+
+    def apply_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        latitude, longitude = values.get('latitude'), values.get('longitude')
+        if (change.op == 'delete' or values.get('status') != ACTIVE_STATUS
+                or latitude is None or longitude is None):
+            self.remove_job(change.id)
+        else:
+            self.index_job(change.id, latitude, longitude)
+
+    def candidates(self, latitude: float, longitude: float, radius_km: float) -> List[Point]:
+        """Jobs in the cells covering a circle; a superset of the jobs inside it"""
+        self.ensure_loaded()
+        with self._lock:
+            points = self._points
+            return [
+                (job_id, *points[job_id])
+                for key in self._covering_cells(latitude, longitude, radius_km)
+                for job_id in self._cells.get(key, ())
+            ]
+
+    def nearby(self, latitude: float, longitude: float, radius_km: float,
+               limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return ``(job_id, distance_km)`` pairs within the radius, closest first"""
+        points = self.candidates(latitude, longitude, radius_km)
+        if not points:
+            return []
+        job_ids, latitudes, longitudes = (np.asarray(column) for column in zip(*points))
+        indices, distances = within_radius(latitudes, longitudes, latitude, longitude, radius_km)
+        job_ids = job_ids[indices]
+        # Equal distances are ordered by job id
+        order = np.lexsort((job_ids, distances))
+        within = list(zip(job_ids[order].tolist(), distances[order].tolist()))
+        return within if limit is None else within[:limit]
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self.cell_degrees),
+                math.floor(longitude / self.cell_degrees) % self._lon_cells)
+
+    def _covering_cells(self, latitude: float, longitude: float,
+                        radius_km: float) -> Iterator[Tuple[int, int]]:
+        lat_span = radius_km / MIN_KM_PER_LAT_DEGREE
+        min_lat, max_lat = latitude - lat_span, latitude + lat_span
+        row_min = math.floor(max(min_lat, -90.0) / self.cell_degrees) - 1
+        row_max = math.floor(min(max_lat, 90.0) / self.cell_degrees) + 1
+
+        angular = radius_km / MIN_EARTH_RADIUS_KM
+        cos_lat = math.cos(math.radians(latitude))
+        if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2 or math.sin(angular) >= cos_lat:
+            columns = range(self._lon_cells)
+        else:
+            lon_span = math.degrees(math.asin(math.sin(angular) / cos_lat))
+            col_min = math.floor((longitude - lon_span) / self.cell_degrees) - 1
+            col_max = math.floor((longitude + lon_span) / self.cell_degrees) + 1
+            if col_max - col_min + 1 >= self._lon_cells:
+                columns = range(self._lon_cells)
+            else:
+                columns = [col % self._lon_cells for col in range(col_min, col_max + 1)]
+
+        # Very large circles cover more cells than exist; scan the occupied ones
+        if (row_max - row_min + 1) * len(columns) > len(self._cells):
+            column_set = set(columns)
+            for key in list(self._cells):
+                if row_min <= key[0] <= row_max and key[1] in column_set:
+                    yield key
+            return
+        for row in range(row_min, row_max + 1):
+            for column in columns:
+                yield row, column
+
+
+# Global instance
+job_geo_index = JobGeoIndex()
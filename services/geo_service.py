@@ -1,19 +1,57 @@
-from geopy.distance import geodesic
+import numpy as np
+
 from models import Job
+from services.geo_distance import within_radius
+from services.geo_index import job_geo_index
+from services.matching.ranking import RankingCursor
+from services.search.near_duplicates import near_duplicate_index
+
+
+def rank_nearby_jobs(latitude, longitude, radius_km=15) -> RankingCursor:
+    """
+    Rank active jobs within a radius by distance, closest first.
+
+    Returns a cursor of job ids and their distance in km, equal distances
+    in job id order. Candidates come from the grid cells covering the radius
+    (see ``JobGeoIndex``) and their distances are computed in one vectorized
+    call; later pages resume from the cursor without recomputation, and
+    search sessions (``services.search.search_sessions``) page it by key.
+    Jobs superseded by a newer near-duplicate posting are left out.
+    """
+    candidates = near_duplicate_index.collapse(
+        job_geo_index.candidates(latitude, longitude, radius_km), key=lambda row: row[0]
+    )
+    distances = {}
+    if candidates:
+        latitudes = np.fromiter((row[1] for row in candidates), dtype=np.float64, count=len(candidates))
+        longitudes = np.fromiter((row[2] for row in candidates), dtype=np.float64, count=len(candidates))
+        indices, within = within_radius(latitudes, longitudes, latitude, longitude, radius_km)
+        distances = {candidates[i][0]: distance
+                     for i, distance in zip(indices.tolist(), within.tolist())}
 
-def get_nearby_jobs(latitude, longitude, radius_km=15):
-    """Get jobs within specified radius"""
-    all_jobs = Job.query.filter_by(status='active').all()
-    nearby_jobs = []
-    
-    for job in all_jobs:
-        distance = geodesic(
-            (latitude, longitude),
-            (job.latitude, job.longitude)
-        ).kilometers
-        
-        if distance <= radius_km:
+    # Exact distances are already known, so the cursor only heapifies them
+    return RankingCursor(distances, score=distances.__getitem__, descending=False, tiebreak=int)
+
+
+def load_jobs_with_distances(pairs):
+    """Load active Job objects for ``(job_id, distance)`` pairs, keeping their order"""
+    job_ids = [job_id for job_id, _ in pairs]
+    if not job_ids:
+        return []
+    jobs_by_id = {job.id: job for job in Job.query.filter(
+        Job.id.in_(job_ids), Job.status == Job.STATUS_ACTIVE
+    )}
+    jobs = []
+    for job_id, distance in pairs:
+        job = jobs_by_id.get(job_id)
+        if job is not None:
             job.distance = round(distance, 1)
-            nearby_jobs.append(job)
-    
-    return sorted(nearby_jobs, key=lambda x: x.distance)
+            jobs.append(job)
+    return jobs
+
+
+def get_nearby_jobs(latitude, longitude, radius_km=15, limit=None):
+    """Get jobs within specified radius, closest first"""
+    cursor = rank_nearby_jobs(latitude, longitude, radius_km)
+    ranked = list(cursor) if limit is None else cursor.next_page(limit)
+    return load_jobs_with_distances(ranked)
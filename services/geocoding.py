@@ -0,0 +1,73 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from services.gazetteer import Gazetteer, gazetteer, normalize_place
+
+logger = logging.getLogger(__name__)
+
+# Resolved locations kept in process memory, least recently used dropped first
+MEMO_SIZE = 4096
+
+Coordinates = Tuple[float, float]
+
+
+class Geocoder:
+    """
+    Resolves free-text locations to coordinates at write time.
+
+    Lookups go through an in-process LRU memo, then the persistent
+    ``geocode_cache`` table, then the offline gazetteer; gazetteer hits are
+    written to the table in the caller's transaction. Unresolvable locations
+    (e.g. "Remote") are not cached since the gazetteer answers them from
+    memory anyway.
+    """
+
+    def __init__(self, places: Gazetteer = gazetteer, memo_size: int = MEMO_SIZE):
+        self.places = places
+        self.memo_size = memo_size
+        self._memo: 'OrderedDict[str, Optional[Coordinates]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def geocode(self, location: Optional[str]) -> Optional[Coordinates]:
+        """Return ``(latitude, longitude)`` of a free-text location, None if unknown"""
+        key = normalize_place(location)[:255]
+        if not key:
+            return None
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        coordinates = self._lookup(key)
+        with self._lock:
+            self._memo[key] = coordinates
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return coordinates
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    def _lookup(self, key: str) -> Optional[Coordinates]:
+        from extensions import db
+        from models import GeocodeCache
+
+        cached = db.session.get(GeocodeCache, key)
+        if cached is not None:
+            return cached.latitude, cached.longitude
+
+        place = self.places.lookup(key)
+        if place is None:
+            return None
+        db.session.merge(GeocodeCache(
+            query=key, latitude=place.latitude, longitude=place.longitude,
+            place_name=place.name, source=GeocodeCache.SOURCE_GAZETTEER
+        ))
+        return place.coordinates
+
+
+# Global instance
+geocoder = Geocoder()
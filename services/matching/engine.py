@@ -0,0 +1,341 @@
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.gazetteer import gazetteer
+from services.geo_distance import within_radius
+from services.matching.features import (
+    JobAttributes, JobFeatureMatrix, JobFeatureRow, job_attributes, job_skill_names
+)
+from services.matching.ranking import RankingCursor, rank_matches, top_matches
+from services.matching.score_cache import MatchScoreCache, match_score_cache
+from services.matching.skill_vocabulary import SkillVocabulary, flatten_skills, skill_vocabulary
+
+logger = logging.getLogger(__name__)
+
+MAX_SCORE = 100.0
+
+# Locations resolved to coordinates match within this distance
+LOCATION_MATCH_RADIUS_KM = 30.0
+
+# Gazetteer lookups of location texts, shared across scoring calls
+place_coordinates = functools.lru_cache(maxsize=8192)(gazetteer.coordinates)
+
+
+def locations_match(seeker_location: str, job_location: str) -> bool:
+    """Check if job seeker location matches job location by text, for places the gazetteer doesn't know"""
+    seeker_location = seeker_location.strip().lower()
+    job_location = job_location.strip().lower()
+    return seeker_location in job_location or job_location in seeker_location
+
+
+@dataclass
+class SeekerProfile:
+    """Matching inputs of a job seeker, independent of where they come from.
+
+    Attributes:
+        skills: Skill names
+        total_years: Years of experience, None if unknown
+        location: Free-text location, None if unknown
+        salary_min: Lowest acceptable salary, None for no preference
+        remote_only: Only remote jobs are acceptable
+        latitude: Latitude of the seeker, None if unknown
+        longitude: Longitude of the seeker, None if unknown
+        max_distance_km: Farthest acceptable job, None for no preference
+    """
+    skills: List[str] = field(default_factory=list)
+    total_years: Optional[float] = None
+    location: Optional[str] = None
+    salary_min: Optional[float] = None
+    remote_only: bool = False
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    max_distance_km: Optional[float] = None
+
+    @classmethod
+    def from_job_seeker(cls, job_seeker) -> 'SeekerProfile':
+        """Profile of a ``JobSeeker`` or any object with the same attributes"""
+        skills = getattr(job_seeker, 'skills', None)
+        preferences = getattr(job_seeker, 'job_preferences', None) or {}
+        total_years = skills.get('total_years') if isinstance(skills, dict) else None
+        return cls(
+            skills=flatten_skills(skills),
+            total_years=total_years if isinstance(total_years, (int, float)) else None,
+            location=getattr(job_seeker, 'location', None) or getattr(job_seeker, 'preferred_location', None),
+            salary_min=preferences.get('salary_min'),
+            remote_only=bool(preferences.get('remote_only')),
+            latitude=getattr(job_seeker, 'latitude', None),
+            longitude=getattr(job_seeker, 'longitude', None),
+            max_distance_km=preferences.get('max_distance'),
+        )
+
+    @classmethod
+    def from_candidate(cls, candidate_skills: Mapping[str, Any]) -> 'SeekerProfile':
+        """Profile of a resume analysis result (``technical_skills``, ``total_years``)"""
+        return cls(
+            skills=flatten_skills(candidate_skills.get('technical_skills')),
+            total_years=candidate_skills.get('total_years'),
+            location=candidate_skills.get('location'),
+        )
+
+    @classmethod
+    def of(cls, seeker) -> 'SeekerProfile':
+        if isinstance(seeker, cls):
+            return seeker
+        if isinstance(seeker, Mapping):
+            return cls.from_candidate(seeker)
+        return cls.from_job_seeker(seeker)
+
+
+def job_feature_row_of(job) -> JobFeatureRow:
+    """
+    Feature row of a single job.
+
+    ``job`` is either a ``Job``-like object or a requirements mapping with
+    ``required_skills``, ``required_years`` and optionally ``location``,
+    ``salary_max`` and ``is_remote``.
+    """
+    if isinstance(job, Mapping):
+        return (
+            job.get('id', 0),
+            flatten_skills(job.get('required_skills')),
+            job.get('location'),
+            JobAttributes(job.get('required_years'), job.get('salary_max'), job.get('is_remote'),
+                          job.get('latitude'), job.get('longitude')),
+        )
+    return (
+        job.id,
+        job_skill_names(getattr(job, 'skill_ids', None), getattr(job, 'required_skills', None)),
+        getattr(job, 'location', None),
+        job_attributes(getattr(job, 'experience_level', None), getattr(job, 'salary_min', None),
+                       getattr(job, 'salary_max', None), getattr(job, 'is_remote', None),
+                       getattr(job, 'latitude', None), getattr(job, 'longitude', None)),
+    )
+
+
+class FeatureScorer:
+    """
+    One component of the match score.
+
+    ``score_batch`` returns one value in ``[0, 1]`` per job row, or NaN where
+    the component does not apply (e.g. the job has no salary). The engine
+    averages the applicable components by ``weight``.
+    """
+    name = 'feature'
+
+    def __init__(self, weight: float):
+        self.weight = weight
+
+    def score_batch(self, profile: SeekerProfile, features: JobFeatureMatrix,
+                    vocabulary: SkillVocabulary) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SkillsScorer(FeatureScorer):
+    """Share of the job's skills the seeker has; jobs without skills score 0"""
+    name = 'skills'
+
+    def score_batch(self, profile, features, vocabulary):
+        n = len(features)
+        scores = np.zeros(n, dtype=np.float64)
+        seeker_ids = vocabulary.lookup_all(profile.skills)
+        if not seeker_ids or not features.skill_indices.size:
+            return scores
+        # Overlap count per job: gather seeker membership for every (job, skill)
+        # entry of the sparse matrix and sum it per row.
+        membership = vocabulary.mask(seeker_ids)[features.skill_indices]
+        matches = np.bincount(features.skill_rows, weights=membership, minlength=n)
+        np.divide(matches, features.skill_counts, out=scores, where=features.skill_counts > 0)
+        return scores
+
+
+class ExperienceScorer(FeatureScorer):
+    """
+    Seeker's years of experience relative to the job's requirement.
+
+    Does not apply to seekers whose experience is unknown, rather than
+    treating them as having none.
+    """
+    name = 'experience'
+
+    def score_batch(self, profile, features, vocabulary):
+        required = features.required_years
+        scores = np.full(len(features), np.nan)
+        if profile.total_years is None:
+            return scores
+        years = float(profile.total_years)
+        known = ~np.isnan(required)
+        scores[known] = 1.0
+        demanding = known & (required > 0)
+        scores[demanding] = np.minimum(years / required[demanding], 1.0)
+        return scores
+
+
+class LocationScorer(FeatureScorer):
+    """
+    1 if the seeker's and job's locations match.
+
+    When the gazetteer resolves the seeker's location and the job has
+    coordinates (stored, or from its location text), they match within
+    ``LOCATION_MATCH_RADIUS_KM``. Other jobs fall back to text matching.
+    Location texts are resolved and compared once per distinct location.
+    """
+    name = 'location'
+
+    def score_batch(self, profile, features, vocabulary):
+        scores = np.full(len(features), np.nan)
+        if not profile.location:
+            return scores
+        known_text = features.location_ids >= 0
+
+        seeker_point = place_coordinates(profile.location)
+        if seeker_point is not None:
+            latitudes, longitudes = features.latitudes.copy(), features.longitudes.copy()
+            missing = np.isnan(latitudes) & known_text
+            if missing.any():
+                points = np.array([place_coordinates(location) or (np.nan, np.nan)
+                                   for location in features.locations], dtype=np.float64)
+                latitudes[missing] = points[features.location_ids[missing], 0]
+                longitudes[missing] = points[features.location_ids[missing], 1]
+            located = np.flatnonzero(~np.isnan(latitudes))
+            scores[located] = 0.0
+            inside, _ = within_radius(latitudes[located], longitudes[located],
+                                      *seeker_point, LOCATION_MATCH_RADIUS_KM)
+            scores[located[inside]] = 1.0
+
+        text_rows = known_text & np.isnan(scores)
+        if text_rows.any():
+            per_location = np.fromiter(
+                (locations_match(profile.location, location) for location in features.locations),
+                dtype=np.float64, count=len(features.locations)
+            )
+            scores[text_rows] = per_location[features.location_ids[text_rows]]
+        return scores
+
+
+class SalaryScorer(FeatureScorer):
+    """1 if the job pays at least the seeker's minimum salary"""
+    name = 'salary'
+
+    def score_batch(self, profile, features, vocabulary):
+        scores = np.full(len(features), np.nan)
+        if profile.salary_min is None:
+            return scores
+        known = ~np.isnan(features.salary_max)
+        scores[known] = features.salary_max[known] >= profile.salary_min
+        return scores
+
+
+class RemoteScorer(FeatureScorer):
+    """1 if the job is remote, for seekers who only want remote jobs"""
+    name = 'remote'
+
+    def score_batch(self, profile, features, vocabulary):
+        if not profile.remote_only:
+            return np.full(len(features), np.nan)
+        return features.is_remote.astype(np.float64)
+
+
+class DistanceScorer(FeatureScorer):
+    """1 if the job is within the seeker's maximum distance; jobs without coordinates don't apply"""
+    name = 'distance'
+
+    def score_batch(self, profile, features, vocabulary):
+        scores = np.full(len(features), np.nan)
+        if profile.latitude is None or profile.longitude is None or not profile.max_distance_km:
+            return scores
+        known = np.flatnonzero(~np.isnan(features.latitudes) & ~np.isnan(features.longitudes))
+        scores[known] = 0.0
+        inside, _ = within_radius(features.latitudes[known], features.longitudes[known],
+                                  profile.latitude, profile.longitude, profile.max_distance_km)
+        scores[known[inside]] = 1.0
+        return scores
+
+
+def default_scorers() -> List[FeatureScorer]:
+    return [
+        SkillsScorer(0.6),
+        ExperienceScorer(0.4),
+        LocationScorer(0.1),
+        SalaryScorer(0.1),
+        RemoteScorer(0.1),
+        DistanceScorer(0.1),
+    ]
+
+
+class MatchEngine:
+    """
+    Computes match scores between job seekers and jobs.
+
+    The score is the weighted average of the applicable feature scorers,
+    scaled to 0-100 and rounded to one decimal; seekers without skills score
+    0 everywhere. Every scorer is vectorized
+    over a ``JobFeatureMatrix``; the scalar entry point scores a one-row
+    matrix, so scalar and batch results always agree. A failing scorer is
+    logged and left out of the average rather than replaced by a default.
+
+    Seekers can be ``JobSeeker``-like objects, resume analysis dicts or
+    ``SeekerProfile`` instances.
+    """
+
+    def __init__(self, scorers: Optional[Sequence[FeatureScorer]] = None,
+                 vocabulary: SkillVocabulary = skill_vocabulary,
+                 cache: Optional[MatchScoreCache] = match_score_cache):
+        self.scorers = list(scorers) if scorers is not None else default_scorers()
+        self.vocabulary = vocabulary
+        self.cache = cache
+
+    def score_batch(self, seeker, features: JobFeatureMatrix) -> np.ndarray:
+        """Score one seeker against every row of ``features``"""
+        n = len(features)
+        if n == 0:
+            return np.zeros(0, dtype=np.float64)
+        profile = SeekerProfile.of(seeker)
+        if not profile.skills:
+            # Nothing to match on; other components alone would rank every
+            # entry-level job as a partial match
+            logger.warning(f"No skills found for job seeker {getattr(seeker, 'id', None)}")
+            return np.zeros(n, dtype=np.float64)
+
+        weighted = np.zeros(n, dtype=np.float64)
+        total_weight = np.zeros(n, dtype=np.float64)
+        for scorer in self.scorers:
+            try:
+                scores = scorer.score_batch(profile, features, self.vocabulary)
+            except Exception as e:
+                logger.error(f"Error in {scorer.name} scorer: {e}")
+                continue
+            applicable = ~np.isnan(scores)
+            weighted += np.where(applicable, scores, 0.0) * scorer.weight
+            total_weight += applicable * scorer.weight
+
+        result = np.zeros(n, dtype=np.float64)
+        np.divide(weighted * MAX_SCORE, total_weight, out=result, where=total_weight > 0)
+        np.clip(result, 0.0, MAX_SCORE, out=result)
+        return np.round(result, 1)
+
+    def score(self, seeker, job) -> float:
+        """Score one seeker against one job, cached per seeker and job revision"""
+        if self.cache is None:
+            return self._score_one(seeker, job)
+        return self.cache.get_or_compute(seeker, job, self._score_one)
+
+    def rank(self, seeker, features: JobFeatureMatrix, threshold: float = 0.0) -> RankingCursor:
+        """Return a resumable cursor of ``(job_id, score)`` pairs, best first"""
+        return rank_matches(self.score_batch(seeker, features), features.job_ids, threshold)
+
+    def top(self, seeker, features: JobFeatureMatrix, k: int,
+            threshold: float = 0.0) -> List[Tuple[int, float]]:
+        """Return the ``k`` best ``(job_id, score)`` pairs with ``score >= threshold``"""
+        return top_matches(self.score_batch(seeker, features), features.job_ids, k, threshold)
+
+    def _score_one(self, seeker, job) -> float:
+        features = JobFeatureMatrix.from_rows([job_feature_row_of(job)], vocabulary=self.vocabulary)
+        return float(self.score_batch(seeker, features)[0])
+
+
+# Global instance
+match_engine = MatchEngine()
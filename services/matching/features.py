@@ -0,0 +1,208 @@
+import hashlib
+import json
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from services.matching.skill_vocabulary import (
+    SkillVocabulary, canonical_skill, flatten_skills, skill_vocabulary
+)
+
+# Job attributes used by the non-skill scorers; None when unknown
+JobAttributes = namedtuple('JobAttributes',
+                           ['required_years', 'salary_max', 'is_remote', 'latitude', 'longitude'],
+                           defaults=(None, None))
+NO_ATTRIBUTES = JobAttributes(None, None, None)
+
+# (job_id, skills, location) with optional JobAttributes as a fourth item
+JobFeatureRow = Tuple[Any, ...]
+
+# Years of experience implied by Job.experience_level
+EXPERIENCE_LEVEL_YEARS = {'entry': 0, 'junior': 1, 'mid': 3, 'senior': 5, 'lead': 8}
+
+
+class JobFeatureMatrix:
+    """
+    Compact, column-oriented job features used for batch scoring.
+
+    Job skills are stored as a sparse 0/1 matrix in CSR form over the interned
+    skill vocabulary: the skill ids of job ``i`` are
+    ``skill_indices[indptr[i]:indptr[i + 1]]``. Locations are interned too, so
+    per-location checks only need to run once per distinct location string.
+
+    Attributes:
+        job_ids: Job primary keys, one per row
+        indptr: CSR row pointer, ``len(job_ids) + 1`` entries
+        skill_indices: Concatenated skill ids of all jobs
+        skill_rows: Row number of every entry in ``skill_indices``
+        skill_counts: Number of distinct skills per job
+        location_ids: Index into ``locations`` per job, -1 if unknown
+        locations: Distinct location strings
+        required_years: Years of experience required per job, NaN if unknown
+        salary_max: Highest salary offered per job, NaN if unknown
+        is_remote: Whether each job can be done remotely
+        latitudes: Latitude per job, NaN if unknown
+        longitudes: Longitude per job, NaN if unknown
+    """
+
+    def __init__(self, job_ids: np.ndarray, indptr: np.ndarray, skill_indices: np.ndarray,
+                 location_ids: np.ndarray, locations: List[str],
+                 required_years: Optional[np.ndarray] = None,
+                 salary_max: Optional[np.ndarray] = None,
+                 is_remote: Optional[np.ndarray] = None,
+                 latitudes: Optional[np.ndarray] = None,
+                 longitudes: Optional[np.ndarray] = None):
+        n = len(job_ids)
+        self.job_ids = job_ids
+        self.indptr = indptr
+        self.skill_indices = skill_indices
+        self.skill_counts = np.diff(indptr).astype(np.int32)
+        self.skill_rows = np.repeat(np.arange(n, dtype=np.int64), self.skill_counts)
+        self.location_ids = location_ids
+        self.locations = locations
+        self.required_years = required_years if required_years is not None else np.full(n, np.nan)
+        self.salary_max = salary_max if salary_max is not None else np.full(n, np.nan)
+        self.is_remote = is_remote if is_remote is not None else np.zeros(n, dtype=bool)
+        self.latitudes = latitudes if latitudes is not None else np.full(n, np.nan)
+        self.longitudes = longitudes if longitudes is not None else np.full(n, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[JobFeatureRow],
+                  vocabulary: SkillVocabulary = skill_vocabulary) -> 'JobFeatureMatrix':
+        """Build a matrix from ``(job_id, skills, location[, attributes])`` tuples"""
+        return cls.from_skill_id_rows(
+            (row[0], vocabulary.intern_all(row[1] or ()), *row[2:])
+            for row in rows
+        )
+
+    @classmethod
+    def from_skill_id_rows(cls, rows: Iterable[JobFeatureRow]) -> 'JobFeatureMatrix':
+        """Build a matrix from ``(job_id, skill_ids, location[, attributes])`` tuples of interned skills"""
+        job_ids: List[int] = []
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        location_ids: List[int] = []
+        location_index: Dict[str, int] = {}
+        locations: List[str] = []
+        required_years: List[float] = []
+        salary_max: List[float] = []
+        is_remote: List[bool] = []
+        latitudes: List[float] = []
+        longitudes: List[float] = []
+
+        for row in rows:
+            job_id, skill_ids, location = row[:3]
+            attributes = row[3] if len(row) > 3 and row[3] is not None else NO_ATTRIBUTES
+            required_years.append(_number(attributes.required_years))
+            salary_max.append(_number(attributes.salary_max))
+            is_remote.append(bool(attributes.is_remote))
+            latitudes.append(_number(attributes.latitude))
+            longitudes.append(_number(attributes.longitude))
+            job_ids.append(job_id)
+            indices.extend(skill_ids)
+            indptr.append(len(indices))
+            if location:
+                key = location.strip().lower()
+                loc_id = location_index.get(key)
+                if loc_id is None:
+                    loc_id = location_index[key] = len(locations)
+                    locations.append(key)
+                location_ids.append(loc_id)
+            else:
+                location_ids.append(-1)
+
+        return cls(
+            job_ids=np.asarray(job_ids, dtype=np.int64),
+            indptr=np.asarray(indptr, dtype=np.int64),
+            skill_indices=np.asarray(indices, dtype=np.int64),
+            location_ids=np.asarray(location_ids, dtype=np.int32),
+            locations=locations,
+            required_years=np.asarray(required_years, dtype=np.float64),
+            salary_max=np.asarray(salary_max, dtype=np.float64),
+            is_remote=np.asarray(is_remote, dtype=bool),
+            latitudes=np.asarray(latitudes, dtype=np.float64),
+            longitudes=np.asarray(longitudes, dtype=np.float64),
+        )
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def job_attributes(experience_level: Optional[str] = None, salary_min=None, salary_max=None,
+                   is_remote=None, latitude=None, longitude=None) -> JobAttributes:
+    """Attributes of a job from its ``Job`` columns"""
+    level = experience_level.strip().lower() if isinstance(experience_level, str) else None
+    return JobAttributes(
+        EXPERIENCE_LEVEL_YEARS.get(level),
+        salary_max if salary_max is not None else salary_min,
+        is_remote,
+        latitude,
+        longitude,
+    )
+
+
+def skill_content_hash(required_skills, description: Optional[str]) -> str:
+    """Hash of the job content that skills are extracted from"""
+    content = json.dumps([required_skills, description or ''], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def extract_job_skills(required_skills, description: Optional[str]) -> List[str]:
+    """
+    Canonical skills of a job, computed when the job is written.
+
+    Structured ``required_skills`` win; otherwise skills are extracted from
+    the description with the compiled skills dictionary.
+    """
+    skills = flatten_skills(required_skills)
+    if not skills:
+        from services.matching.skill_matcher import skill_matcher
+        skills = skill_matcher.extract(description)
+    return sorted({canonical for canonical in map(canonical_skill, skills) if canonical})
+
+
+def job_skill_names(skill_ids, required_skills=None) -> List[str]:
+    """
+    Precomputed skills of a job as read at match time.
+
+    Rows that have not been backfilled yet fall back to their structured
+    ``required_skills``; descriptions are never parsed at match time.
+    """
+    if skill_ids is not None:
+        return skill_ids
+    return flatten_skills(required_skills)
+
+
+def job_feature_row(values: Mapping[str, Any]) -> JobFeatureRow:
+    """Feature row of a job from its column values, e.g. a query row mapping"""
+    return (
+        values['id'],
+        job_skill_names(values.get('skill_ids'), values.get('required_skills')),
+        values.get('location'),
+        job_attributes(values.get('experience_level'), values.get('salary_min'),
+                       values.get('salary_max'), values.get('is_remote'),
+                       values.get('latitude'), values.get('longitude')),
+    )
+
+
+def query_active_job_features():
+    """Column query of the ``Job`` fields that make up feature rows, active jobs only"""
+    from extensions import db
+    from models import Job
+
+    return db.session.query(
+        Job.id, Job.skill_ids, Job.required_skills, Job.location, Job.experience_level,
+        Job.salary_min, Job.salary_max, Job.is_remote, Job.latitude, Job.longitude
+    ).filter(Job.status == Job.STATUS_ACTIVE)
+
+
+def load_active_job_features() -> JobFeatureMatrix:
+    """Load features of all active jobs with a column query, without building ORM objects"""
+    return JobFeatureMatrix.from_rows(
+        job_feature_row(row._mapping) for row in query_active_job_features()
+    )
@@ -0,0 +1,258 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Callable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+
+from services.geo_distance import KM_PER_DEGREE, haversine_km, longitude_span
+from services.matching.features import job_skill_names
+from services.matching.skill_vocabulary import canonical_skill, flatten_skills
+
+logger = logging.getLogger(__name__)
+
+# Seekers read per query while fanning out one job
+ALERT_BATCH_SIZE = 5000
+
+# Alert radius of seekers without job_preferences['max_distance'], and the
+# largest one honoured, which bounds the SQL prefilter box
+DEFAULT_ALERT_RADIUS_KM = 50.0
+MAX_ALERT_RADIUS_KM = 200.0
+
+# (chat id, text) of one notification
+Notification = Tuple[str, str]
+
+SEEKER_COLUMNS = ('id', 'telegram_user_id', 'latitude', 'longitude', 'skills', 'job_preferences')
+
+
+def job_skills(job: Mapping) -> Set[str]:
+    """Canonical skill names of a job row"""
+    skills = {canonical_skill(name) for name in job_skill_names(job.get('skill_ids'), job.get('required_skills'))}
+    skills.discard(None)
+    return skills
+
+
+def matching_seekers(job: Mapping, skills: Set[str], seekers: Sequence) -> List[Tuple[int, str]]:
+    """
+    ``(seeker id, telegram user id)`` of the seekers a job should be announced to.
+
+    A seeker matches when the job lies within their ``max_distance`` (or is
+    remote), passes their job type, salary and remote-only preferences and
+    shares at least one skill with them. Distances of a whole batch of
+    ``seekers`` rows are computed at once.
+    """
+    remote = bool(job.get('is_remote'))
+    if not remote:
+        if job.get('latitude') is None or job.get('longitude') is None:
+            return []
+        distances = haversine_km(
+            job['latitude'], job['longitude'],
+            np.array([np.nan if s.latitude is None else s.latitude for s in seekers], dtype=float),
+            np.array([np.nan if s.longitude is None else s.longitude for s in seekers], dtype=float),
+        )
+
+    matched = []
+    for i, seeker in enumerate(seekers):
+        preferences = seeker.job_preferences or {}
+        if not remote:
+            if preferences.get('remote_only'):
+                continue
+            radius = min(float(preferences.get('max_distance') or DEFAULT_ALERT_RADIUS_KM),
+                         MAX_ALERT_RADIUS_KM)
+            # NaN for seekers without a location never compares true
+            if not distances[i] <= radius:
+                continue
+        job_types = preferences.get('job_types')
+        if job_types and job.get('job_type') and job['job_type'] not in job_types:
+            continue
+        salary_min = preferences.get('salary_min')
+        if salary_min and job.get('salary_max') and job['salary_max'] < salary_min:
+            continue
+        if skills.isdisjoint(canonical_skill(name) for name in flatten_skills(seeker.skills)):
+            continue
+        matched.append((seeker.id, seeker.telegram_user_id))
+    return matched
+
+
+def alert_text(job: Mapping, company_name: Optional[str]) -> str:
+    location = 'Remote' if job.get('is_remote') else job.get('location')
+    return (f"🔔 New job matching your profile\n"
+            f"🏢 {job['title']}\n"
+            f"🏗 {company_name or 'Unknown company'}\n"
+            f"📍 {location}\n\n"
+            f"📝 To apply, use /apply {job['id']}")
+
+
+class JobAlertFanout:
+    """
+    Notifies matching job seekers when a job goes active, in a background thread.
+
+    Committed inserts of active jobs and status changes to active queue the
+    job once. The worker scans job seekers in id order, ``batch_size`` at a
+    time, prefiltered in SQL by the bounding box of the largest alert radius
+    (skipped for remote jobs), and matches each batch with
+    ``matching_seekers``. New matches are recorded in ``job_alert`` before
+    they are handed to ``notify``, so each seeker hears of a job at most once.
+
+    ``notify`` receives a list of notifications from the worker thread and
+    may block to apply backpressure; the bot passes the send queue's
+    ``enqueue_from_thread``, which keeps alerts within Telegram's limits.
+    """
+
+    def __init__(self, batch_size: int = ALERT_BATCH_SIZE,
+                 notify: Optional[Callable[[List[Notification]], None]] = None):
+        self.batch_size = batch_size
+        self.notify = notify
+        self._queue: 'queue.Queue[int]' = queue.Queue()
+        self._pending: Set[int] = set()
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._app = None
+        self._listening = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app, notify: Callable[[List[Notification]], None]) -> None:
+        """Listen for jobs going active and start the worker thread"""
+        self.notify = notify
+        if self.is_running:
+            return
+        self._app = app
+        self.listen()
+        self._thread = threading.Thread(target=self._run, name='job-alert-fanout', daemon=True)
+        self._thread.start()
+        logger.info("Job alert fan-out started")
+
+    def listen(self) -> None:
+        if self._listening:
+            return
+        from core.db_events import on_commit
+        from models import Job
+
+        on_commit(Job, self._on_job_change, watch=('status',))
+        self._listening = True
+
+    def request(self, job_id: int) -> None:
+        """Queue alerts for a job unless they are already pending"""
+        with self._pending_lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+        self._queue.put(job_id)
+
+    def join(self) -> None:
+        """Block until every queued job has been fanned out"""
+        self._queue.join()
+
+    def process(self, job_id: int) -> int:
+        """Alert the seekers matching a job not alerted yet, returns their number"""
+        from extensions import db
+        from models import Employer, Job, JobAlert
+
+        jobs = Job.__table__
+        job = db.session.execute(select(jobs).where(jobs.c.id == job_id)).mappings().first()
+        if job is None or job['status'] != Job.STATUS_ACTIVE:
+            return 0
+        skills = job_skills(job)
+        if not skills:
+            return 0
+
+        employers = Employer.__table__
+        company_name = db.session.execute(
+            select(employers.c.company_name).where(employers.c.id == job['employer_id'])
+        ).scalar()
+        text = alert_text(job, company_name)
+
+        alerts = JobAlert.__table__
+        alerted = set(db.session.execute(
+            select(alerts.c.job_seeker_id).where(alerts.c.job_id == job_id)
+        ).scalars())
+        notified = 0
+        for seekers in self._seeker_batches(job):
+            new = [(seeker_id, chat_id) for seeker_id, chat_id in matching_seekers(job, skills, seekers)
+                   if seeker_id not in alerted]
+            if not new:
+                continue
+            now = datetime.utcnow()
+            db.session.execute(alerts.insert(), [
+                {'job_id': job_id, 'job_seeker_id': seeker_id, 'created_at': now}
+                for seeker_id, _ in new
+            ])
+            db.session.commit()
+            self.notify([(chat_id, text) for _, chat_id in new])
+            notified += len(new)
+        logger.info(f"Job {job_id} announced to {notified} job seekers")
+        return notified
+
+    def _seeker_batches(self, job: Mapping) -> Iterator[Sequence]:
+        """Candidate seeker rows for a job, ``batch_size`` per query"""
+        from extensions import db
+        from models import JobSeeker
+
+        seekers = JobSeeker.__table__
+        query = select(*(seekers.c[name] for name in SEEKER_COLUMNS))
+        if not job.get('is_remote'):
+            if job.get('latitude') is None or job.get('longitude') is None:
+                return
+            query = query.where(*self._bounding_box(seekers, job['latitude'], job['longitude']))
+
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                query.where(seekers.c.id > last_id).order_by(seekers.c.id).limit(self.batch_size)
+            ).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    @staticmethod
+    def _bounding_box(seekers, latitude: float, longitude: float) -> list:
+        """Conditions of the box around a job no seeker's alert radius reaches beyond"""
+        delta = MAX_ALERT_RADIUS_KM / KM_PER_DEGREE
+        conditions = [seekers.c.latitude.between(latitude - delta, latitude + delta)]
+        span = longitude_span(latitude, MAX_ALERT_RADIUS_KM)
+        if span is not None:
+            west, east = longitude - span, longitude + span
+            if west < -180:
+                conditions.append(or_(seekers.c.longitude >= west + 360, seekers.c.longitude <= east))
+            elif east > 180:
+                conditions.append(or_(seekers.c.longitude >= west, seekers.c.longitude <= east - 360))
+            else:
+                conditions.append(seekers.c.longitude.between(west, east))
+        return conditions
+
+    def _on_job_change(self, change) -> None:
+        # Updates are only delivered when the status changed, so an active
+        # status here means the job just went active
+        from models import Job
+
+        if change.op != 'delete' and change.values.get('status') == Job.STATUS_ACTIVE:
+            self.request(change.id)
+
+    def _run(self) -> None:
+        from extensions import db
+
+        while True:
+            job_id = self._queue.get()
+            with self._pending_lock:
+                self._pending.discard(job_id)
+            try:
+                with self._app.app_context():
+                    try:
+                        self.process(job_id)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Error sending alerts for job {job_id}: {e}")
+                    finally:
+                        db.session.remove()
+            finally:
+                self._queue.task_done()
+
+
+# Global instance
+job_alert_fanout = JobAlertFanout()
@@ -0,0 +1,149 @@
+import heapq
+import itertools
+from typing import Any, Callable, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+Scorer = Callable[[T], Optional[float]]
+Bound = Callable[[T], float]
+
+
+class RankingCursor(Generic[T]):
+    """
+    Resumable best-first ranking of candidates.
+
+    With an ``upper_bound`` function candidates are ordered by their cheap
+    bound and only scored when they reach the front. A scored candidate is
+    returned as soon as no unscored candidate can beat it, so taking the top
+    k stops once the k-th best score is at least the next candidate's bound.
+    Without a bound every candidate is scored up front and heapified, which
+    still avoids sorting the whole list for a short page.
+
+    The cursor keeps its heaps between calls, so ``next_page`` resumes the
+    ranking where the previous page ended instead of recomputing it. With a
+    ``tiebreak`` the order is total, so pages can also be resumed by the
+    ``sort_key`` of their last pair (see ``services.search.search_sessions``).
+
+    Args:
+        candidates: Items to rank
+        score: Exact score of an item, ``None`` to drop it
+        upper_bound: Best score an item can possibly reach; for ascending
+            rankings this is a lower bound (e.g. a minimum distance)
+        threshold: Items scoring worse than this are dropped
+        descending: Rank highest scores first, otherwise lowest first
+        tiebreak: Orders items with equal scores, e.g. by job id; insertion
+            order if None
+    """
+
+    def __init__(self, candidates: Iterable[T], score: Scorer,
+                 upper_bound: Optional[Bound] = None, threshold: Optional[float] = None,
+                 descending: bool = True, tiebreak: Optional[Callable[[T], Any]] = None):
+        self._score = score
+        self._sign = -1.0 if descending else 1.0
+        # Internally lower keys rank first
+        self._max_key = None if threshold is None else self._sign * threshold
+        seq = itertools.count()
+        self._tiebreak = tiebreak or (lambda item: next(seq))
+        self._scored: List[Tuple[float, Any, float, T]] = []
+        self._pending: List[Tuple[float, Any, T]] = []
+        self.scored_count = 0
+
+        if upper_bound is None:
+            for item in candidates:
+                self._push_scored(item)
+            heapq.heapify(self._scored)
+        else:
+            self._pending = [
+                (self._sign * upper_bound(item), self._tiebreak(item), item) for item in candidates
+            ]
+            heapq.heapify(self._pending)
+
+    def __iter__(self) -> Iterator[Tuple[T, float]]:
+        return self
+
+    def __next__(self) -> Tuple[T, float]:
+        if not self._advance():
+            raise StopIteration
+        _, _, value, item = heapq.heappop(self._scored)
+        return item, value
+
+    def __len__(self) -> int:
+        """Items not returned yet; pending ones a threshold may still drop are counted"""
+        return len(self._scored) + len(self._pending)
+
+    @property
+    def has_more(self) -> bool:
+        """True if at least one more item will be returned"""
+        return self._advance()
+
+    def sort_key(self, item: T, score: float) -> Tuple[float, Any]:
+        """Ascending key of a returned pair; keys of later pairs are greater"""
+        return self._sign * score, self._tiebreak(item)
+
+    def next_page(self, size: int) -> List[Tuple[T, float]]:
+        """Return the next ``size`` ``(item, score)`` pairs, best first"""
+        return list(itertools.islice(self, max(size, 0)))
+
+    def _advance(self) -> bool:
+        """Score pending candidates until the best scored one is final"""
+        pending = self._pending
+        # A candidate bound to tie the best score is scored too, so the
+        # tiebreak decides between them
+        while pending and (not self._scored or pending[0][0] <= self._scored[0][0]):
+            bound_key, _, item = heapq.heappop(pending)
+            if self._max_key is not None and bound_key > self._max_key:
+                # No remaining candidate can pass the threshold
+                pending.clear()
+                break
+            self._push_scored(item, heap=True)
+        return bool(self._scored)
+
+    def _push_scored(self, item: T, heap: bool = False) -> None:
+        value = self._score(item)
+        self.scored_count += 1
+        if value is None:
+            return
+        key = self._sign * value
+        if self._max_key is not None and key > self._max_key:
+            return
+        entry = (key, self._tiebreak(item), value, item)
+        if heap:
+            heapq.heappush(self._scored, entry)
+        else:
+            self._scored.append(entry)
+
+
+def top_k(candidates: Iterable[T], k: int, score: Scorer,
+          upper_bound: Optional[Bound] = None, threshold: Optional[float] = None,
+          descending: bool = True, tiebreak: Optional[Callable[[T], Any]] = None
+          ) -> List[Tuple[T, float]]:
+    """Return the ``k`` best ``(item, score)`` pairs, see ``RankingCursor``"""
+    return RankingCursor(candidates, score, upper_bound, threshold, descending,
+                         tiebreak).next_page(k)
+
+
+def top_matches(scores: np.ndarray, job_ids: np.ndarray, k: int,
+                threshold: float = 0.0) -> List[Tuple[int, float]]:
+    """Return the ``k`` best ``(job_id, score)`` pairs with ``score >= threshold``"""
+    qualifying = np.flatnonzero(scores >= threshold)
+    if qualifying.size == 0 or k <= 0:
+        return []
+    if qualifying.size > k:
+        best = np.argpartition(-scores[qualifying], k - 1)[:k]
+        qualifying = qualifying[best]
+    # Highest score first, ties broken by job id for stable output
+    order = np.lexsort((job_ids[qualifying], -scores[qualifying]))
+    qualifying = qualifying[order]
+    return [(int(job_ids[i]), float(scores[i])) for i in qualifying]
+
+
+def rank_matches(scores: np.ndarray, job_ids: np.ndarray,
+                 threshold: float = 0.0) -> RankingCursor:
+    """Return a resumable cursor of ``(job_id, score)`` pairs with ``score >= threshold``"""
+    qualifying = np.flatnonzero(scores >= threshold)
+    # Exact scores are already known, so the cursor only heapifies them; ties
+    # come out in job id order, like ``top_matches``
+    scores_by_id = dict(zip(job_ids[qualifying].tolist(), scores[qualifying].tolist()))
+    return RankingCursor(scores_by_id, score=scores_by_id.__getitem__, tiebreak=int)
@@ -0,0 +1,335 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from services.matching.engine import MatchEngine, job_feature_row_of, match_engine
+from services.matching.features import JobFeatureMatrix
+from services.matching.skill_index import INDEXED_FIELDS as JOB_FIELDS, SkillIndex, skill_index
+from services.matching.skill_vocabulary import SkillVocabulary, flatten_skills
+from services.search.near_duplicates import NearDuplicateIndex, near_duplicate_index
+
+logger = logging.getLogger(__name__)
+
+# JobSeeker columns whose changes affect the seeker's scores
+SEEKER_FIELDS = ('skills', 'job_preferences', 'preferred_location', 'latitude', 'longitude')
+
+# Only matches scoring at least this much are stored, at most this many per seeker
+MIN_RECOMMENDATION_SCORE = 50.0
+RECOMMENDATIONS_PER_SEEKER = 100
+
+# Seekers loaded per query when a job change affects many of them
+SEEKER_BATCH_SIZE = 500
+
+# Seconds the worker gets to finish queued requests when the builder stops
+STOP_TIMEOUT = 30.0
+
+SEEKER = 'seeker'
+JOB = 'job'
+
+
+class SeekerSkillIndex:
+    """Inverted index from interned skill id to job seeker ids"""
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.vocabulary = vocabulary
+        self._postings: Dict[int, Set[int]] = {}
+        self._seekers: Dict[int, FrozenSet[int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._seekers)
+
+    def index_seeker(self, seeker_id: int, skills) -> None:
+        """Add or replace a seeker in the index"""
+        skill_ids = frozenset(self.vocabulary.intern_all(flatten_skills(skills)))
+        with self._lock:
+            self.remove_seeker(seeker_id)
+            for skill_id in skill_ids:
+                self._postings.setdefault(skill_id, set()).add(seeker_id)
+            self._seekers[seeker_id] = skill_ids
+
+    def remove_seeker(self, seeker_id: int) -> None:
+        """Remove a seeker from the index if present"""
+        with self._lock:
+            for skill_id in self._seekers.pop(seeker_id, ()):
+                posting = self._postings.get(skill_id)
+                if posting is not None:
+                    posting.discard(seeker_id)
+                    if not posting:
+                        del self._postings[skill_id]
+
+    def seekers_with_any(self, skill_ids: Iterable[int]) -> Set[int]:
+        """Return ids of seekers having at least one of ``skill_ids``"""
+        result: Set[int] = set()
+        with self._lock:
+            for skill_id in skill_ids:
+                result |= self._postings.get(skill_id, set())
+        return result
+
+
+class RecommendationBuilder:
+    """
+    Keeps the ``job_recommendation`` table up to date in a background thread.
+
+    Committed ``JobSeeker`` changes rescore that seeker against the candidate
+    jobs from the skill index. Committed ``Job`` changes rescore that one job
+    for the seekers it can affect: those sharing a skill with it and those
+    already recommended it. Requests are queued and deduplicated, so a burst
+    of edits to the same job or seeker is processed once.
+
+    Bot handlers and ``JobSeeker.get_matching_jobs`` only read the table.
+    """
+
+    def __init__(self, engine: MatchEngine = match_engine, jobs: SkillIndex = skill_index,
+                 duplicates: NearDuplicateIndex = near_duplicate_index,
+                 min_score: float = MIN_RECOMMENDATION_SCORE,
+                 per_seeker: int = RECOMMENDATIONS_PER_SEEKER):
+        self.engine = engine
+        self.jobs = jobs
+        self.duplicates = duplicates
+        self.min_score = min_score
+        self.per_seeker = per_seeker
+        self.seekers = SeekerSkillIndex(engine.vocabulary)
+        # None asks the worker to stop after the requests queued before it
+        self._queue: 'queue.Queue[Optional[Tuple[str, int]]]' = queue.Queue()
+        self._pending: Set[Tuple[str, int]] = set()
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._app = None
+        self._listening = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app) -> None:
+        """Load the seeker index, listen for changes and start the worker thread"""
+        if self.is_running:
+            return
+        self._app = app
+        self.listen()
+        with app.app_context():
+            self.load_seekers()
+        self._thread = threading.Thread(target=self._run, name='recommendation-builder', daemon=True)
+        self._thread.start()
+        logger.info(f"Recommendation builder started with {len(self.seekers)} job seekers")
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """Process the requests queued so far, then stop the worker thread"""
+        if not self.is_running:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Recommendation builder did not finish its queue in time")
+        self._thread = None
+
+    def listen(self) -> None:
+        """Queue rescoring for committed job and job seeker changes"""
+        if self._listening:
+            return
+        from core.db_events import on_commit
+        from models import Job, JobSeeker
+
+        on_commit(Job, lambda change: self.request(JOB, change.id), watch=JOB_FIELDS)
+        on_commit(JobSeeker, self._on_seeker_change, watch=SEEKER_FIELDS)
+        self._listening = True
+
+    def load_seekers(self) -> None:
+        from extensions import db
+        from models import JobSeeker
+
+        for seeker_id, skills in db.session.query(JobSeeker.id, JobSeeker.skills):
+            self.seekers.index_seeker(seeker_id, skills)
+
+    def request(self, kind: str, entity_id: int) -> None:
+        """Queue a rescore of a seeker or job unless one is already pending"""
+        task = (kind, entity_id)
+        with self._pending_lock:
+            if task in self._pending:
+                return
+            self._pending.add(task)
+        self._queue.put(task)
+
+    def join(self) -> None:
+        """Block until every queued request has been processed"""
+        self._queue.join()
+
+    def process(self, kind: str, entity_id: int) -> None:
+        if kind == SEEKER:
+            self.rescore_seeker(entity_id)
+        else:
+            self.rescore_job(entity_id)
+
+    def rescore_seeker(self, seeker_id: int) -> int:
+        """Replace a seeker's recommendations, returns the number stored"""
+        from extensions import db
+        from models import JobRecommendation, JobSeeker
+
+        JobRecommendation.query.filter_by(job_seeker_id=seeker_id).delete(synchronize_session=False)
+        seeker = db.session.get(JobSeeker, seeker_id)
+        if seeker is None:
+            self.seekers.remove_seeker(seeker_id)
+            db.session.commit()
+            return 0
+
+        self.seekers.index_seeker(seeker_id, seeker.skills)
+        features = self.jobs.candidate_features(
+            flatten_skills(seeker.skills), exclude=self.duplicates.superseded_ids()
+        )
+        top = self.engine.top(seeker, features, self.per_seeker, self.min_score)
+        now = datetime.utcnow()
+        db.session.add_all([
+            JobRecommendation(job_seeker_id=seeker_id, job_id=job_id, score=score, computed_at=now)
+            for job_id, score in top
+        ])
+        self._mark_computed(seeker_id, now)
+        db.session.commit()
+        return len(top)
+
+    def rescore_job(self, job_id: int) -> int:
+        """Rescore one job for the seekers it affects, returns the number of rows written"""
+        from extensions import db
+        from models import Job, JobRecommendation, JobSeeker
+
+        recommended_to = {
+            seeker_id for seeker_id, in db.session.query(JobRecommendation.job_seeker_id)
+            .filter(JobRecommendation.job_id == job_id)
+        }
+        job = db.session.get(Job, job_id)
+        if job is None or not job.is_active or job_id in self.duplicates.superseded_ids():
+            JobRecommendation.query.filter_by(job_id=job_id).delete(synchronize_session=False)
+            db.session.commit()
+            return 0
+
+        features = JobFeatureMatrix.from_rows([job_feature_row_of(job)], vocabulary=self.engine.vocabulary)
+        affected = self.affected_seekers(features, recommended_to)
+        written = 0
+        now = datetime.utcnow()
+        affected_ids = sorted(affected)
+        for start in range(0, len(affected_ids), SEEKER_BATCH_SIZE):
+            batch = affected_ids[start:start + SEEKER_BATCH_SIZE]
+            seekers = JobSeeker.query.filter(JobSeeker.id.in_(batch)).all()
+            stored, dropped = self.score_job_for(features, seekers)
+            # Rows of seekers the job no longer qualifies for or who were deleted
+            missing = set(batch) - {seeker.id for seeker in seekers}
+            stale = (dropped | missing) & recommended_to
+            if stale:
+                JobRecommendation.query.filter(
+                    JobRecommendation.job_id == job_id,
+                    JobRecommendation.job_seeker_id.in_(stale)
+                ).delete(synchronize_session=False)
+            for seeker_id, score in stored.items():
+                db.session.merge(JobRecommendation(
+                    job_seeker_id=seeker_id, job_id=job_id, score=score, computed_at=now
+                ))
+                if seeker_id not in recommended_to:
+                    self._trim(seeker_id)
+            written += len(stored)
+            db.session.commit()
+        return written
+
+    def affected_seekers(self, features: JobFeatureMatrix, recommended_to: Set[int]) -> Set[int]:
+        """Seekers sharing a skill with the one-row ``features`` plus those already recommended it"""
+        return self.seekers.seekers_with_any(features.skill_indices.tolist()) | recommended_to
+
+    def score_job_for(self, features: JobFeatureMatrix, seekers) -> Tuple[Dict[int, float], Set[int]]:
+        """
+        Score a one-row ``features`` matrix for each seeker.
+
+        Returns:
+            Tuple[Dict[int, float], Set[int]]: Scores to store by seeker id and
+            ids of seekers for whom the job no longer qualifies
+        """
+        stored: Dict[int, float] = {}
+        dropped: Set[int] = set()
+        for seeker in seekers:
+            score = float(self.engine.score_batch(seeker, features)[0])
+            if score >= self.min_score:
+                stored[seeker.id] = score
+            else:
+                dropped.add(seeker.id)
+        return stored, dropped
+
+    def rebuild_all(self, batch_size: int = SEEKER_BATCH_SIZE) -> int:
+        """Recompute recommendations of every seeker, returns the number of seekers"""
+        from extensions import db
+        from models import JobSeeker
+
+        self.load_seekers()
+        seeker_ids = [seeker_id for seeker_id, in db.session.query(JobSeeker.id).order_by(JobSeeker.id)]
+        for count, seeker_id in enumerate(seeker_ids, 1):
+            self.rescore_seeker(seeker_id)
+            if count % batch_size == 0:
+                db.session.expunge_all()
+                logger.info(f"Rebuilt recommendations for {count} job seekers")
+        return len(seeker_ids)
+
+    def _mark_computed(self, seeker_id: int, when: datetime) -> None:
+        """
+        Record when the seeker's recommendations were computed.
+
+        A Core update that keeps ``updated_at``, which keys the seeker's cached
+        scores; the ORM would bump it and so invalidate them on every refresh.
+        """
+        from extensions import db
+        from models import JobSeeker
+
+        table = JobSeeker.__table__
+        db.session.execute(
+            table.update().where(table.c.id == seeker_id)
+            .values(recommendations_computed_at=when, updated_at=table.c.updated_at)
+        )
+
+    def _trim(self, seeker_id: int) -> None:
+        """Keep only the seeker's ``per_seeker`` best rows"""
+        from extensions import db
+        from models import JobRecommendation
+
+        db.session.flush()
+        overflow = [
+            job_id for job_id, in db.session.query(JobRecommendation.job_id)
+            .filter(JobRecommendation.job_seeker_id == seeker_id)
+            .order_by(JobRecommendation.score.desc(), JobRecommendation.job_id)
+            .offset(self.per_seeker)
+        ]
+        if overflow:
+            JobRecommendation.query.filter(
+                JobRecommendation.job_seeker_id == seeker_id,
+                JobRecommendation.job_id.in_(overflow)
+            ).delete(synchronize_session=False)
+
+    def _on_seeker_change(self, change) -> None:
+        if change.op == 'delete':
+            self.seekers.remove_seeker(change.id)
+        else:
+            self.seekers.index_seeker(change.id, change.values.get('skills'))
+        self.request(SEEKER, change.id)
+
+    def _run(self) -> None:
+        from extensions import db
+
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            with self._pending_lock:
+                self._pending.discard(task)
+            try:
+                with self._app.app_context():
+                    try:
+                        self.process(*task)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Error rescoring {task[0]} {task[1]}: {e}")
+                    finally:
+                        db.session.remove()
+            finally:
+                self._queue.task_done()
+
+
+# Global instance
+recommendation_builder = RecommendationBuilder()
@@ -0,0 +1,158 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (job_seeker_id, seeker_revision, job_id, job_revision)
+CacheKey = Tuple[int, Hashable, int, int]
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def seeker_revision(job_seeker) -> Optional[Hashable]:
+    """Revision of a job seeker, taken from ``JobSeeker.updated_at``"""
+    return getattr(job_seeker, 'updated_at', None)
+
+
+def job_revision(job) -> Optional[int]:
+    """Revision of a job, taken from the ``Job.revision`` counter"""
+    return getattr(job, 'revision', None)
+
+
+class MatchScoreCache:
+    """
+    Size-bounded LRU cache of match scores.
+
+    Entries are keyed by ``(job_seeker.id, seeker_revision, job.id,
+    job_revision)``, so an edited seeker or job can never be served a stale
+    score. Committed ``Job`` and ``JobSeeker`` updates and deletes also evict
+    the entries of that job or seeker right away, so outdated revisions do
+    not hold on to cache space until they age out.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[CacheKey, float]' = OrderedDict()
+        self._by_seeker: Dict[int, Set[CacheKey]] = {}
+        self._by_job: Dict[int, Set[CacheKey]] = {}
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def key(self, job_seeker, job) -> Optional[CacheKey]:
+        """Cache key of a seeker and job, ``None`` if either has no id or revision"""
+        seeker_rev = seeker_revision(job_seeker)
+        job_rev = job_revision(job)
+        seeker_id = getattr(job_seeker, 'id', None)
+        job_id = getattr(job, 'id', None)
+        if None in (seeker_id, seeker_rev, job_id, job_rev):
+            return None
+        return (seeker_id, seeker_rev, job_id, job_rev)
+
+    def get(self, key: CacheKey) -> Optional[float]:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: CacheKey, score: float) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._by_seeker.setdefault(key[0], set()).add(key)
+                self._by_job.setdefault(key[2], set()).add(key)
+            self._entries[key] = score
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._unlink(oldest)
+
+    def get_or_compute(self, job_seeker, job, compute: Callable[[Any, Any], float]) -> float:
+        """Return the cached score of a seeker and job, computing and storing it on a miss"""
+        key = self.key(job_seeker, job)
+        if key is None:
+            return compute(job_seeker, job)
+        self.listen()
+        score = self.get(key)
+        if score is None:
+            score = compute(job_seeker, job)
+            self.put(key, score)
+        return score
+
+    def invalidate_seeker(self, job_seeker_id: int) -> None:
+        with self._lock:
+            for key in self._by_seeker.pop(job_seeker_id, ()):
+                self._entries.pop(key, None)
+                self._discard(self._by_job, key[2], key)
+
+    def invalidate_job(self, job_id: int) -> None:
+        with self._lock:
+            for key in self._by_job.pop(job_id, ()):
+                self._entries.pop(key, None)
+                self._discard(self._by_seeker, key[0], key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_seeker.clear()
+            self._by_job.clear()
+            self.hits = self.misses = 0
+
+    def listen(self) -> None:
+        """Evict entries when jobs or job seekers are updated or deleted"""
+        if self._listening:
+            return
+        with self._lock:
+            if self._listening:
+                return
+            from core.db_events import on_commit
+            from models import Job, JobSeeker
+
+            on_commit(Job, self._on_job_change)
+            on_commit(JobSeeker, self._on_seeker_change)
+            self._listening = True
+
+    def _on_job_change(self, change) -> None:
+        if change.op != 'insert':
+            self.invalidate_job(change.id)
+
+    def _on_seeker_change(self, change) -> None:
+        if change.op != 'insert':
+            self.invalidate_seeker(change.id)
+
+    def _unlink(self, key: CacheKey) -> None:
+        self._discard(self._by_seeker, key[0], key)
+        self._discard(self._by_job, key[2], key)
+
+    @staticmethod
+    def _discard(index: Dict[int, Set[CacheKey]], owner: int, key: CacheKey) -> None:
+        keys = index.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[owner]
+
+
+# Global instance
+match_score_cache = MatchScoreCache()
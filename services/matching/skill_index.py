@@ -0,0 +1,130 @@
+import logging
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from services.matching.features import (
+    NO_ATTRIBUTES, JobAttributes, JobFeatureMatrix, job_feature_row, query_active_job_features
+)
+from services.matching.skill_vocabulary import SkillVocabulary, skill_vocabulary
+
+logger = logging.getLogger(__name__)
+
+# Job columns whose changes affect the index
+INDEXED_FIELDS = (
+    'skill_ids', 'required_skills', 'status', 'location',
+    'experience_level', 'salary_min', 'salary_max', 'is_remote',
+    'latitude', 'longitude',
+)
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+
+class SkillIndex:
+    """
+    In-process inverted index from interned skill id to active job ids.
+
+    The index is built from the database on first use and then maintained
+    incrementally from committed ``Job`` inserts, updates and deletes. It keeps
+    the skill ids, location and attributes of every indexed job too, so the
+    feature matrix for a seeker's candidate jobs can be built without a database
+    round trip.
+    """
+
+    def __init__(self, vocabulary: SkillVocabulary = skill_vocabulary):
+        self.vocabulary = vocabulary
+        self._postings: Dict[int, Set[int]] = {}
+        self._jobs: Dict[int, Tuple[FrozenSet[int], Optional[str], JobAttributes]] = {}
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self) -> None:
+        """Build the index from active jobs and start listening for job changes"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from core.db_events import on_commit
+            from models import Job
+
+            # Listen before loading so changes committed during the load are not lost
+            if not self._listening:
+                on_commit(Job, self.apply_change, watch=INDEXED_FIELDS)
+                self._listening = True
+            for row in query_active_job_features():
+                self.index_job(*job_feature_row(row._mapping))
+            self._loaded = True
+            logger.info(f"Skill index built with {len(self._jobs)} active jobs")
+
+    def index_job(self, job_id: int, skills: Iterable[str], location: Optional[str],
+                  attributes: JobAttributes = NO_ATTRIBUTES) -> None:
+        """Add or replace a job in the index"""
+        skill_ids = frozenset(self.vocabulary.intern_all(skills))
+        with self._lock:
+            previous = self._jobs.get(job_id)
+            if previous is not None:
+                for skill_id in previous[0] - skill_ids:
+                    self._discard_posting(skill_id, job_id)
+            for skill_id in skill_ids:
+                self._postings.setdefault(skill_id, set()).add(job_id)
+            self._jobs[job_id] = (skill_ids, location, attributes)
+
+    def remove_job(self, job_id: int) -> None:
+        """Remove a job from the index if present"""
+        with self._lock:
+            previous = self._jobs.pop(job_id, None)
+            if previous is not None:
+                for skill_id in previous[0]:
+                    self._discard_posting(skill_id, job_id)
+
+    def apply_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        if change.op == 'delete' or values.get('status') != ACTIVE_STATUS:
+            self.remove_job(change.id)
+        else:
+            self.index_job(*job_feature_row(values))
+
+    def candidates(self, skill_ids: Iterable[int]) -> Set[int]:
+        """Return ids of active jobs sharing at least one of ``skill_ids``"""
+        result: Set[int] = set()
+        with self._lock:
+            for skill_id in skill_ids:
+                posting = self._postings.get(skill_id)
+                if posting:
+                    result |= posting
+        return result
+
+    def candidate_features(self, skills: Iterable[str],
+                           exclude: Optional[Set[int]] = None) -> JobFeatureMatrix:
+        """
+        Return the feature matrix of jobs sharing at least one skill with ``skills``.
+
+        Jobs in ``exclude``, e.g. superseded near-duplicates, are left out.
+        """
+        self.ensure_loaded()
+        skill_ids = self.vocabulary.lookup_all(skills)
+        with self._lock:
+            job_ids = sorted(self.candidates(skill_ids) - (exclude or set()))
+            rows: List[Tuple[int, FrozenSet[int], Optional[str], JobAttributes]] = [
+                (job_id, *self._jobs[job_id]) for job_id in job_ids
+            ]
+        return JobFeatureMatrix.from_skill_id_rows(rows)
+
+    def _discard_posting(self, skill_id: int, job_id: int) -> None:
+        posting = self._postings.get(skill_id)
+        if posting is not None:
+            posting.discard(job_id)
+            if not posting:
+                del self._postings[skill_id]
+
+
+# Global instance
+skill_index = SkillIndex()
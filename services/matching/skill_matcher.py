@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILLS_FILE = Path(__file__).resolve().parent.parent / 'data' / 'skills.json'
+
+# Tokens keep the characters that are part of common skill names
+# ("c++", "c#", "node.js", "objective-c", and a leading dot as in ".net")
+# and drop surrounding punctuation, so token equality gives us word-boundary
+# aware matching for free.
+_TOKEN_RE = re.compile(r"(?:(?<![\w.])\.)?\w[\w+#]*(?:[.\-]\w[\w+#]*)*")
+
+# Skills that are also everyday English words only match when written as a
+# name ("Rust", "REST"), not in lowercase prose ("rust", "the rest of") or
+# capitalized only because they start a sentence ("Swift delivery is ...")
+COMMON_WORD_SKILLS = frozenset({
+    'angular', 'bash', 'bootstrap', 'dart', 'excel', 'express', 'flask', 'helm',
+    'jest', 'oracle', 'react', 'rest', 'ruby', 'rust', 'snowflake', 'spark',
+    'spring', 'swift',
+})
+
+# Trie key of the names that must be written capitalized to match
+_NAMED = 'named'
+
+# Punctuation that ends a sentence, and that separates the items of a list
+_SENTENCE_END = '.!?'
+_LIST_SEPARATORS = ',;/|'
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase skill tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _written_as_names(text: str, spans: List[re.Match]) -> List[bool]:
+    """
+    Whether each token of ``text`` is written as a name.
+
+    Lowercase words never are and all-caps words always are. A capitalized
+    word only counts when it does not start a sentence, or when it stands in
+    a list, i.e. is followed by a list separator or the end of its line.
+    """
+    named = []
+    for i, span in enumerate(spans):
+        word = span.group()
+        if word.islower():
+            named.append(False)
+        elif len(word) > 1 and word.isupper():
+            named.append(True)
+        else:
+            before = text[spans[i - 1].end() if i else 0:span.start()].strip().rstrip('"\')]')
+            last = i + 1 == len(spans)
+            after = text[span.end():len(text) if last else spans[i + 1].start()].lstrip(' \t')
+            sentence_start = (i == 0 and not before) or before.endswith(tuple(_SENTENCE_END))
+            in_list = (last and not after) or after[:1] in ('\r', '\n', *_LIST_SEPARATORS)
+            named.append(not sentence_start or in_list)
+    return named
+
+
+class _SkillAutomaton:
+    """
+    Immutable token trie compiled from the skills dictionary.
+
+    Every skill name is tokenized with the same tokenizer used for the text,
+    and inserted as a path of tokens. Matching walks the trie from every token
+    position, so one pass over the text finds all skills (including
+    multi-word ones such as "machine learning") without re-scanning it once
+    per skill.
+    """
+
+    __slots__ = ('root', 'size')
+
+    def __init__(self, skills: Iterable[str]):
+        self.root: Dict = {}
+        self.size = 0
+        for skill in skills:
+            tokens = tokenize(skill)
+            if not tokens:
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            key = _NAMED if len(tokens) == 1 and tokens[0] in COMMON_WORD_SKILLS else None
+            node.setdefault(key, []).append(skill)
+            self.size += 1
+
+    def match(self, tokens: List[str], named: List[bool]) -> Set[str]:
+        """Skills among lowercase ``tokens``; ``named`` flags the tokens written as names"""
+        found: Set[str] = set()
+        root = self.root
+        n = len(tokens)
+        for start in range(n):
+            node = root.get(tokens[start])
+            if node is not None and _NAMED in node and named[start]:
+                found.update(node[_NAMED])
+            pos = start + 1
+            while node is not None:
+                names = node.get(None)
+                if names:
+                    found.update(names)
+                if pos >= n:
+                    break
+                node = node.get(tokens[pos])
+                pos += 1
+        return found
+
+
+class SkillMatcher:
+    """
+    Extracts known skills from free text using a compiled skills dictionary.
+
+    The dictionary is loaded once and compiled into a token automaton. The
+    source file is checked for changes at most every ``check_interval``
+    seconds and recompiled when its modification time changes, so edits to
+    ``skills.json`` are picked up without a restart.
+    """
+
+    def __init__(self, skills_file: Optional[Path] = None, check_interval: float = 2.0):
+        self.skills_file = Path(skills_file) if skills_file else DEFAULT_SKILLS_FILE
+        self.check_interval = check_interval
+        self._automaton: Optional[_SkillAutomaton] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def extract(self, text: Optional[str]) -> Set[str]:
+        """Return the set of dictionary skills mentioned in ``text``"""
+        if not text:
+            return set()
+        automaton = self._get_automaton()
+        if not automaton.size:
+            return set()
+        spans = list(_TOKEN_RE.finditer(text))
+        return automaton.match([span.group().lower() for span in spans],
+                               _written_as_names(text, spans))
+
+    def reload(self) -> bool:
+        """Force the skills dictionary to be re-read and recompiled"""
+        with self._lock:
+            return self._load()
+
+    @property
+    def skill_count(self) -> int:
+        return self._get_automaton().size
+
+    def _get_automaton(self) -> _SkillAutomaton:
+        now = time.monotonic()
+        if self._automaton is None or now - self._last_check >= self.check_interval:
+            with self._lock:
+                if self._automaton is None or now - self._last_check >= self.check_interval:
+                    self._last_check = now
+                    if self._automaton is None or self._current_mtime() != self._mtime:
+                        self._load()
+        return self._automaton
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.skills_file).st_mtime
+        except OSError:
+            return None
+
+    def _load(self) -> bool:
+        """Compile the skills file, keeping the previous automaton on failure"""
+        mtime = self._current_mtime()
+        try:
+            with open(self.skills_file) as f:
+                skills_dict = json.load(f)
+            automaton = _SkillAutomaton(_iter_skills(skills_dict))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading skills dictionary {self.skills_file}: {e}")
+            if self._automaton is None:
+                self._automaton = _SkillAutomaton([])
+            self._mtime = mtime
+            return False
+
+        self._automaton = automaton
+        self._mtime = mtime
+        logger.info(f"Loaded {automaton.size} skills from {self.skills_file}")
+        return True
+
+
+def _iter_skills(skills_dict) -> Iterable[str]:
+    """Yield skill names from a ``{category: [skill, ...]}`` mapping or a flat list"""
+    if isinstance(skills_dict, dict):
+        for category in skills_dict.values():
+            for skill in category:
+                yield skill
+    else:
+        for skill in skills_dict:
+            yield skill
+
+
+# Global instance
+skill_matcher = SkillMatcher()
@@ -0,0 +1,103 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def canonical_skill(name: Any) -> Optional[str]:
+    """Normalize a skill name to its canonical form used for matching"""
+    if not isinstance(name, str):
+        return None
+    canonical = ' '.join(name.lower().split())
+    return canonical or None
+
+
+def flatten_skills(skills: Any) -> List[str]:
+    """
+    Flatten the different shapes skills are stored in to a list of names.
+
+    Job seekers' ``skills`` may be a plain list, a single string, or a dict of
+    lists such as ``{"extracted_skills": [...]}`` or
+    ``{"technical_skills": [...], "total_years": 5}`` depending on which
+    resume parser produced it. Non-list values in dicts are ignored.
+    """
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        return [skills]
+    if isinstance(skills, dict):
+        flattened = []
+        for value in skills.values():
+            if isinstance(value, (list, tuple, set)):
+                flattened.extend(v for v in value if isinstance(v, str))
+        return flattened
+    return [s for s in skills if isinstance(s, str)]
+
+
+class SkillVocabulary:
+    """
+    Interns canonical skill names to dense integer ids.
+
+    Ids are process-local and only grow, so arrays indexed by skill id stay
+    valid for the life of the process.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: Any) -> Optional[int]:
+        """Return the id for a skill name, assigning a new one if needed"""
+        canonical = canonical_skill(name)
+        if canonical is None:
+            return None
+        skill_id = self._ids.get(canonical)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(canonical)
+                if skill_id is None:
+                    skill_id = len(self._names)
+                    self._names.append(canonical)
+                    self._ids[canonical] = skill_id
+        return skill_id
+
+    def lookup(self, name: Any) -> Optional[int]:
+        """Return the id for a skill name without interning it"""
+        canonical = canonical_skill(name)
+        return self._ids.get(canonical) if canonical is not None else None
+
+    def intern_all(self, names: Iterable[Any]) -> List[int]:
+        """Intern several names, returning the distinct ids in first-seen order"""
+        ids = []
+        seen = set()
+        for name in names:
+            skill_id = self.intern(name)
+            if skill_id is not None and skill_id not in seen:
+                seen.add(skill_id)
+                ids.append(skill_id)
+        return ids
+
+    def lookup_all(self, names: Iterable[Any]) -> List[int]:
+        """Return ids of the names already in the vocabulary"""
+        ids = {self.lookup(name) for name in names}
+        ids.discard(None)
+        return sorted(ids)
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def mask(self, skill_ids: Iterable[int]) -> np.ndarray:
+        """Return a boolean membership array over the whole vocabulary"""
+        mask = np.zeros(len(self._names), dtype=bool)
+        ids = np.fromiter(skill_ids, dtype=np.int64)
+        if ids.size:
+            mask[ids] = True
+        return mask
+
+
+# Global instance
+skill_vocabulary = SkillVocabulary()
@@ -0,0 +1,265 @@
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from services.matching.skill_matcher import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Job columns whose changes affect the index
+INDEXED_FIELDS = ('title', 'location', 'required_skills', 'status', 'is_remote')
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+# Prefixes up to this length have their job ids kept ready; they match the
+# most jobs and are what users type first
+PREFIX_LENGTH = 3
+
+# Terms matching at least this many jobs keep their jobs ranked, so a
+# one-word query on them needs no sorting; computed for every popular
+# prefix when the index is built and again after a change touches them
+RANKED_MIN_JOBS = 1000
+
+# Ranked results kept per query, and queries kept in the result cache
+MAX_RESULTS = 500
+RESULT_CACHE_SIZE = 10_000
+
+
+class InlineJob(NamedTuple):
+    """What an inline result shows of an active job"""
+    id: int
+    title: str
+    location: str
+    skills: Tuple[str, ...]
+    is_remote: bool
+
+
+def _skill_names(skills) -> Tuple[str, ...]:
+    if isinstance(skills, dict):
+        skills = [skill for values in skills.values() if isinstance(values, list) for skill in values]
+    if not isinstance(skills, list):
+        return ()
+    return tuple(str(skill) for skill in skills if skill)
+
+
+def inline_job(values) -> InlineJob:
+    """``InlineJob`` of a job row or ``ModelChange.values`` mapping"""
+    return InlineJob(values['id'], values.get('title') or '', values.get('location') or '',
+                     _skill_names(values.get('required_skills')), bool(values.get('is_remote')))
+
+
+class InlineJobIndex:
+    """
+    In-memory prefix and keyword index over active jobs for inline queries.
+
+    Every token of a job's title, location and required skills is indexed,
+    and each query term matches the tokens it is a prefix of, so results
+    follow the user's typing ("pyth berl" finds Python jobs in Berlin).
+    Job ids of prefixes up to ``PREFIX_LENGTH`` characters are precomputed,
+    as those match the most jobs; longer prefixes are resolved on a sorted
+    token list. Jobs matching every term are ranked newest first; popular
+    terms keep their ranking between changes, and the ranked ids of recent
+    queries are cached until the next job change.
+
+    The index is built from the database on first use and then maintained
+    incrementally from committed ``Job`` inserts, updates and deletes.
+    """
+
+    def __init__(self, prefix_length: int = PREFIX_LENGTH, max_results: int = MAX_RESULTS,
+                 cache_size: int = RESULT_CACHE_SIZE):
+        self.prefix_length = prefix_length
+        self.max_results = max_results
+        self.cache_size = cache_size
+        self._jobs: Dict[int, InlineJob] = {}
+        self._tokens: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []  # sorted tokens
+        self._ranked: Dict[str, List[int]] = {}  # term -> its jobs, newest first
+        self._results: 'OrderedDict[Tuple[str, ...], List[int]]' = OrderedDict()
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self) -> None:
+        """Build the index from active jobs and start listening for job changes"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from core.db_events import on_commit
+            from extensions import db
+            from models import Job
+
+            # Listen before loading so changes committed during the load are not lost
+            if not self._listening:
+                on_commit(Job, self.apply_change, watch=INDEXED_FIELDS)
+                self._listening = True
+            table = Job.__table__
+            rows = db.session.execute(
+                table.select().with_only_columns(
+                    table.c.id, table.c.title, table.c.location, table.c.required_skills,
+                    table.c.is_remote
+                ).where(table.c.status == Job.STATUS_ACTIVE)
+            )
+            self.bulk_load(inline_job(row._mapping) for row in rows)
+            self._loaded = True
+            logger.info(f"Inline job index built with {len(self._jobs)} active jobs")
+
+    def bulk_load(self, jobs: Iterable[InlineJob]) -> int:
+        """Index ``jobs`` at once; returns the number of jobs indexed"""
+        with self._lock:
+            for job in jobs:
+                tokens = self._job_tokens(job)
+                self._jobs[job.id] = job
+                self._tokens[job.id] = tokens
+                for token in tokens:
+                    self._postings.setdefault(token, set()).add(job.id)
+                    for prefix in self._short_prefixes(token):
+                        self._prefixes.setdefault(prefix, set()).add(job.id)
+            self._vocabulary = sorted(self._postings)
+            self._results.clear()
+            self._ranked.clear()
+            for prefix, ids in self._prefixes.items():
+                if len(ids) >= RANKED_MIN_JOBS:
+                    self._ranked[prefix] = sorted(ids, reverse=True)
+            return len(self._jobs)
+
+    def index_job(self, job: InlineJob) -> None:
+        """Add or replace a job in the index"""
+        tokens = self._job_tokens(job)
+        with self._lock:
+            previous = self._tokens.get(job.id, set())
+            for token in previous ^ tokens:
+                self._invalidate(token)
+            for token in previous - tokens:
+                self._discard(token, job.id, kept=tokens)
+            for token in tokens - previous:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._vocabulary, token)
+                postings.add(job.id)
+                for prefix in self._short_prefixes(token):
+                    self._prefixes.setdefault(prefix, set()).add(job.id)
+            if job.id not in self._jobs:
+                self._ranked.pop('', None)
+            self._jobs[job.id] = job
+            self._tokens[job.id] = tokens
+            self._results.clear()
+
+    def remove_job(self, job_id: int) -> None:
+        """Remove a job from the index if present"""
+        with self._lock:
+            tokens = self._tokens.pop(job_id, None)
+            if tokens is None:
+                return
+            for token in tokens:
+                self._invalidate(token)
+                self._discard(token, job_id, kept=())
+            self._ranked.pop('', None)
+            del self._jobs[job_id]
+            self._results.clear()
+
+    def apply_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        if change.op == 'delete' or values.get('status') != ACTIVE_STATUS:
+            self.remove_job(change.id)
+        else:
+            self.index_job(inline_job(values))
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[InlineJob]:
+        """Active jobs matching every term of ``query`` as a prefix, newest first"""
+        terms = tuple(sorted(set(tokenize(query or ''))))
+        with self._lock:
+            ranked = self._results.get(terms)
+            if ranked is None:
+                ranked = self._rank(terms)
+                self._results[terms] = ranked
+                if len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(terms)
+            return [self._jobs[job_id] for job_id in ranked[offset:offset + limit]]
+
+    def _rank(self, terms: Tuple[str, ...]) -> List[int]:
+        if len(terms) <= 1:
+            term = terms[0] if terms else ''
+            return self._ranked_jobs(term)[:self.max_results]
+        # Set intersection runs in C; only the jobs matching every term are sorted
+        matches = sorted((self._matching(term) for term in terms), key=len)
+        found = matches[0].intersection(*matches[1:])
+        return sorted(found, reverse=True)[:self.max_results]
+
+    def _ranked_jobs(self, term: str) -> List[int]:
+        """Jobs matching ``term`` (all jobs for ``''``), newest first"""
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ids = self._matching(term) if term else self._jobs.keys()
+            ranked = sorted(ids, reverse=True)
+            if len(ranked) >= RANKED_MIN_JOBS:
+                self._ranked[term] = ranked
+        return ranked
+
+    def _invalidate(self, token: str) -> None:
+        """Drop the rankings of the terms matching ``token``, which gained or lost a job"""
+        for length in range(1, len(token) + 1):
+            self._ranked.pop(token[:length], None)
+
+    def _matching(self, term: str) -> Set[int]:
+        """Jobs with a token starting with ``term``"""
+        if len(term) <= self.prefix_length:
+            return self._prefixes.get(term, set())
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + '\uffff', start)
+        if end - start == 1:
+            return self._postings[self._vocabulary[start]]
+        matched: Set[int] = set()
+        for token in self._vocabulary[start:end]:
+            matched |= self._postings[token]
+        return matched
+
+    def _discard(self, token: str, job_id: int, kept: Iterable[str]) -> None:
+        """Unindex ``token`` of a job that keeps the ``kept`` tokens"""
+        postings = self._postings.get(token)
+        if postings is None:
+            return
+        postings.discard(job_id)
+        if not postings:
+            del self._postings[token]
+            index = bisect.bisect_left(self._vocabulary, token)
+            if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                del self._vocabulary[index]
+        for prefix in self._short_prefixes(token):
+            # A token the job keeps may share the prefix
+            if not any(other.startswith(prefix) for other in kept):
+                ids = self._prefixes.get(prefix)
+                if ids is not None:
+                    ids.discard(job_id)
+                    if not ids:
+                        del self._prefixes[prefix]
+
+    def _short_prefixes(self, token: str) -> List[str]:
+        return [token[:length] for length in range(1, min(len(token), self.prefix_length) + 1)]
+
+    @staticmethod
+    def _job_tokens(job: InlineJob) -> Set[str]:
+        text = ' '.join((job.title, job.location) + job.skills)
+        tokens = set(tokenize(text))
+        if job.is_remote:
+            tokens.add('remote')
+        return tokens
+
+
+# Global instance
+inline_job_index = InlineJobIndex()
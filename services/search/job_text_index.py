@@ -0,0 +1,282 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.search.text_analysis import analyze, term_frequencies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    'JOB_SEARCH_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 'instance', 'job_search.db')
+)
+
+# Job columns whose changes affect the index
+INDEXED_FIELDS = ('title', 'description', 'status')
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+# Title terms count this many times as much as description terms
+TITLE_WEIGHT = 2.0
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS docs (job_id INTEGER PRIMARY KEY, length REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    tf REAL NOT NULL,
+    doc_length REAL NOT NULL,
+    PRIMARY KEY (term, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_job_id ON postings (job_id);
+"""
+
+
+class JobTextIndex:
+    """
+    BM25 full-text index over active jobs' titles and descriptions.
+
+    Posting lists are stored on disk in a SQLite file, clustered by term, so
+    a query reads only the posting lists of its terms and BM25 is summed in
+    SQLite. Document length is stored with every posting to avoid a join.
+
+    The index is built from the database on first use if the file is empty,
+    and then maintained incrementally from committed ``Job`` inserts,
+    updates and deletes.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return int(self._meta('doc_count'))
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    if self.path != ':memory:':
+                        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                    conn.executescript(_SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    def listen(self) -> None:
+        """Keep the index up to date with committed job changes"""
+        if self._listening:
+            return
+        with self._lock:
+            if self._listening:
+                return
+            from core.db_events import on_commit
+            from models import Job
+
+            on_commit(Job, self.apply_change, watch=INDEXED_FIELDS)
+            self._listening = True
+
+    def ensure_loaded(self) -> None:
+        """Start listening for job changes and build the index if it was never built"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # Listen before loading so changes committed during the load are not lost
+            self.listen()
+            if not self._meta('built'):
+                self.rebuild()
+            self._loaded = True
+
+    def rebuild(self) -> int:
+        """Rebuild the index from all active jobs, returns the number indexed"""
+        from extensions import db
+        from models import Job
+
+        rows = db.session.query(Job.id, Job.title, Job.description).filter(
+            Job.status == Job.STATUS_ACTIVE
+        )
+        with self._lock:
+            count = self.bulk_load(rows)
+        logger.info(f"Job search index built with {count} active jobs")
+        return count
+
+    def bulk_load(self, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> int:
+        """Replace the whole index with ``(job_id, title, description)`` rows"""
+        conn = self.connection
+        with self._lock, conn:
+            conn.execute('DELETE FROM postings')
+            conn.execute('DELETE FROM terms')
+            conn.execute('DELETE FROM docs')
+            df: Dict[str, int] = {}
+            doc_count = 0
+            total_length = 0.0
+            batch: List[Tuple[str, int, float, float]] = []
+            docs: List[Tuple[int, float]] = []
+            for job_id, title, description in rows:
+                frequencies = self._frequencies(title, description)
+                length = sum(frequencies.values())
+                docs.append((job_id, length))
+                doc_count += 1
+                total_length += length
+                for term, tf in frequencies.items():
+                    batch.append((term, job_id, tf, length))
+                    df[term] = df.get(term, 0) + 1
+                if len(batch) >= 50_000:
+                    conn.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)', batch)
+                    batch.clear()
+            conn.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)', batch)
+            conn.executemany('INSERT INTO docs VALUES (?, ?)', docs)
+            conn.executemany('INSERT INTO terms VALUES (?, ?)', df.items())
+            self._set_meta(doc_count=doc_count, total_length=total_length, built=1)
+        return doc_count
+
+    def index_job(self, job_id: int, title: Optional[str], description: Optional[str]) -> None:
+        """Add or replace a job in the index"""
+        frequencies = self._frequencies(title, description)
+        length = sum(frequencies.values())
+        conn = self.connection
+        with self._lock, conn:
+            self._delete(job_id)
+            conn.execute('INSERT INTO docs VALUES (?, ?)', (job_id, length))
+            conn.executemany(
+                'INSERT INTO postings VALUES (?, ?, ?, ?)',
+                [(term, job_id, tf, length) for term, tf in frequencies.items()]
+            )
+            conn.executemany(
+                'INSERT INTO terms VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1',
+                [(term,) for term in frequencies]
+            )
+            self._add_meta(doc_count=1, total_length=length)
+
+    def remove_job(self, job_id: int) -> None:
+        """Remove a job from the index if present"""
+        with self._lock, self.connection:
+            self._delete(job_id)
+
+    def apply_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        if change.op == 'delete' or values.get('status') != ACTIVE_STATUS:
+            self.remove_job(change.id)
+        else:
+            self.index_job(change.id, values.get('title'), values.get('description'))
+
+    def search(self, query: str, limit: int = 20, offset: int = 0,
+               exclude: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Rank indexed jobs against a keyword query with BM25.
+
+        Args:
+            query: Keywords
+            limit: Page size
+            offset: Number of ranked jobs to skip
+            exclude: Job ids left out of the ranking, e.g. superseded duplicates
+
+        Returns:
+            List[Tuple[int, float]]: ``(job_id, score)`` pairs, best first
+        """
+        self.ensure_loaded()
+        terms = sorted(set(analyze(query)))
+        if not terms or limit <= 0:
+            return []
+
+        conn = self.connection
+        with self._lock:
+            doc_count = self._meta('doc_count')
+            if not doc_count:
+                return []
+            avg_length = self._meta('total_length') / doc_count or 1.0
+            placeholders = ', '.join('?' * len(terms))
+            idf = [
+                (term, math.log(1 + (doc_count - df + 0.5) / (df + 0.5)))
+                for term, df in conn.execute(
+                    f'SELECT term, df FROM terms WHERE term IN ({placeholders})', terms
+                )
+            ]
+            if not idf:
+                return []
+            # Per-query constants go first, then one (term, idf) pair per term
+            values = ', '.join('(?, ?)' for _ in idf)
+            params = [K1 + 1, K1, 1 - B, B / avg_length]
+            params += [item for pair in idf for item in pair]
+            # Excluded jobs are dropped after ranking; fetching one extra row
+            # per excluded job keeps pages exact
+            exclude = exclude or set()
+            params += [int(limit) + int(offset) + len(exclude)]
+            rows = conn.execute(
+                f"""
+                WITH c(k1_plus_1, k1, one_minus_b, b_per_avg) AS (VALUES (?, ?, ?, ?)),
+                     q(term, idf) AS (VALUES {values})
+                SELECT p.job_id,
+                       SUM(q.idf * p.tf * c.k1_plus_1
+                           / (p.tf + c.k1 * (c.one_minus_b + c.b_per_avg * p.doc_length))) AS score
+                FROM q JOIN postings p ON p.term = q.term, c
+                GROUP BY p.job_id
+                ORDER BY score DESC, p.job_id
+                LIMIT ?
+                """,
+                params
+            ).fetchall()
+        ranked = [(job_id, score) for job_id, score in rows if job_id not in exclude]
+        return ranked[offset:offset + limit]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _delete(self, job_id: int) -> None:
+        conn = self.connection
+        row = conn.execute('SELECT length FROM docs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return
+        terms = [(term,) for term, in conn.execute(
+            'SELECT term FROM postings WHERE job_id = ?', (job_id,)
+        )]
+        conn.executemany('UPDATE terms SET df = df - 1 WHERE term = ?', terms)
+        conn.execute('DELETE FROM terms WHERE df <= 0')
+        conn.execute('DELETE FROM postings WHERE job_id = ?', (job_id,))
+        conn.execute('DELETE FROM docs WHERE job_id = ?', (job_id,))
+        self._add_meta(doc_count=-1, total_length=-row[0])
+
+    @staticmethod
+    def _frequencies(title: Optional[str], description: Optional[str]) -> Dict[str, float]:
+        return term_frequencies(title, description, weights=[TITLE_WEIGHT, 1.0])
+
+    def _meta(self, key: str) -> float:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def _set_meta(self, **values: float) -> None:
+        self.connection.executemany(
+            'INSERT INTO meta VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            values.items()
+        )
+
+    def _add_meta(self, **deltas: float) -> None:
+        self.connection.executemany(
+            'INSERT INTO meta VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+            deltas.items()
+        )
+
+
+# Global instance
+job_text_index = JobTextIndex()
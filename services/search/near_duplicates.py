@@ -0,0 +1,250 @@
+import hashlib
+import logging
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+
+from services.search.text_analysis import analyze
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Job columns whose changes affect the index
+INDEXED_FIELDS = ('description_minhash', 'status')
+ACTIVE_STATUS = 'active'  # Job.STATUS_ACTIVE
+
+# Signatures have BANDS * ROWS MinHash values; two descriptions become LSH
+# candidates when all values of at least one band agree. With 20 bands of 5
+# rows a pair with Jaccard similarity 0.8 is a candidate with probability
+# 0.9996, a pair at 0.5 with probability 0.47; candidates are then verified
+# against DUPLICATE_THRESHOLD.
+BANDS = 20
+ROWS = 5
+NUM_PERM = BANDS * ROWS
+DUPLICATE_THRESHOLD = 0.8
+
+SHINGLE_SIZE = 3
+_PRIME = (1 << 31) - 1
+
+
+def _permutation_coefficients(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Derived from a fixed digest rather than a random generator so stored
+    # signatures stay comparable across processes and library versions
+    def coefficient(label: str) -> int:
+        return int.from_bytes(hashlib.blake2b(label.encode(), digest_size=8).digest(), 'big')
+
+    a = np.array([coefficient(f'a{i}') % (_PRIME - 1) + 1 for i in range(count)], dtype=np.uint64)
+    b = np.array([coefficient(f'b{i}') % _PRIME for i in range(count)], dtype=np.uint64)
+    return a, b
+
+
+_A, _B = _permutation_coefficients(NUM_PERM)
+
+
+def shingles(text: Optional[str], size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word ``size``-grams of the analyzed text, or the whole text if shorter"""
+    terms = analyze(text)
+    if len(terms) <= size:
+        return {' '.join(terms)} if terms else set()
+    return {' '.join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+def minhash_signature(text: Optional[str]) -> Optional[List[int]]:
+    """MinHash signature of a text's shingles, None for empty text"""
+    shingle_set = shingles(text)
+    if not shingle_set:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) % _PRIME for shingle in shingle_set),
+        dtype=np.uint64, count=len(shingle_set)
+    )
+    # (a * x + b) mod p stays below 2**63 for 31-bit a, b and x
+    values = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return values.min(axis=1).tolist()
+
+
+def signature_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(np.asarray(a) == np.asarray(b))) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of active jobs' description MinHash signatures.
+
+    Finding the near-duplicates of a posting only looks at jobs sharing an
+    LSH bucket with it, so it does not scan the catalogue. For every job the
+    index also keeps its newer near-duplicates (by job id, i.e. reposts), so
+    superseded postings can be collapsed before ranking without any
+    similarity computation at query time.
+
+    Like ``SkillIndex``, it is built from the database on first use and then
+    maintained from committed ``Job`` changes.
+    """
+
+    def __init__(self, bands: int = BANDS, rows: int = ROWS,
+                 threshold: float = DUPLICATE_THRESHOLD):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self._newer_duplicates: Dict[int, Set[int]] = {}
+        self._loaded = False
+        self._listening = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def ensure_loaded(self) -> None:
+        """Build the index from active jobs and start listening for job changes"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from core.db_events import on_commit
+            from extensions import db
+            from models import Job
+
+            # Listen before loading so changes committed during the load are not lost
+            if not self._listening:
+                on_commit(Job, self.apply_change, watch=INDEXED_FIELDS)
+                self._listening = True
+            rows = db.session.query(Job.id, Job.description_minhash, Job.description).filter(
+                Job.status == Job.STATUS_ACTIVE
+            )
+            for job_id, signature, description in rows:
+                # Jobs saved before signatures existed are hashed on the fly
+                signature = signature or minhash_signature(description)
+                if signature:
+                    self.index_job(job_id, signature)
+            self._loaded = True
+            logger.info(f"Near-duplicate index built with {len(self._signatures)} active jobs")
+
+    def index_job(self, job_id: int, signature: Sequence[int]) -> None:
+        """Add or replace a job in the index"""
+        signature = np.asarray(signature, dtype=np.uint32)
+        with self._lock:
+            self.remove_job(job_id)
+            for other_id, _ in self._similar(signature):
+                older, newer = sorted((job_id, other_id))
+                self._newer_duplicates.setdefault(older, set()).add(newer)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(job_id)
+            self._signatures[job_id] = signature
+
+    def remove_job(self, job_id: int) -> None:
+        """Remove a job from the index if present"""
+        with self._lock:
+            signature = self._signatures.pop(job_id, None)
+            if signature is None:
+                return
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(job_id)
+                    if not bucket:
+                        del self._buckets[key]
+            self._newer_duplicates.pop(job_id, None)
+            for other_id, _ in self._similar(signature):
+                newer = self._newer_duplicates.get(other_id)
+                if newer is not None:
+                    newer.discard(job_id)
+                    if not newer:
+                        del self._newer_duplicates[other_id]
+
+    def apply_change(self, change) -> None:
+        """Apply a committed ``Job`` change (see ``core.db_events.on_commit``)"""
+        values = change.values
+        signature = values.get('description_minhash')
+        if change.op == 'delete' or values.get('status') != ACTIVE_STATUS or not signature:
+            self.remove_job(change.id)
+        else:
+            self.index_job(change.id, signature)
+
+    def find_duplicates(self, signature: Optional[Sequence[int]],
+                        exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Active jobs whose descriptions are near-duplicates of ``signature``.
+
+        Returns:
+            List[Tuple[int, float]]: ``(job_id, similarity)`` pairs, most similar first
+        """
+        if not signature:
+            return []
+        self.ensure_loaded()
+        with self._lock:
+            matches = [
+                (job_id, similarity)
+                for job_id, similarity in self._similar(np.asarray(signature, dtype=np.uint32))
+                if job_id != exclude
+            ]
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def superseded_ids(self) -> Set[int]:
+        """Ids of active jobs that have a newer near-duplicate"""
+        self.ensure_loaded()
+        with self._lock:
+            return set(self._newer_duplicates)
+
+    def collapse(self, items: Iterable[T], key: Callable[[T], int] = None) -> List[T]:
+        """Drop items whose job has a newer near-duplicate, keeping the order"""
+        superseded = self.superseded_ids()
+        if key is None:
+            return [item for item in items if item not in superseded]
+        return [item for item in items if key(item) not in superseded]
+
+    def duplicate_groups(self) -> List[List[int]]:
+        """
+        Groups of active jobs connected by near-duplicate pairs.
+
+        Returns:
+            List[List[int]]: Job ids per group, sorted; largest groups first
+        """
+        self.ensure_loaded()
+        parent: Dict[int, int] = {}
+
+        def find(job_id: int) -> int:
+            parent.setdefault(job_id, job_id)
+            while parent[job_id] != job_id:
+                parent[job_id] = parent[parent[job_id]]
+                job_id = parent[job_id]
+            return job_id
+
+        with self._lock:
+            for older, newer_ids in self._newer_duplicates.items():
+                for newer in newer_ids:
+                    parent[find(older)] = find(newer)
+
+        groups: Dict[int, List[int]] = {}
+        for job_id in parent:
+            groups.setdefault(find(job_id), []).append(job_id)
+        return sorted((sorted(group) for group in groups.values()),
+                      key=lambda group: (-len(group), group[0]))
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _similar(self, signature: np.ndarray) -> List[Tuple[int, float]]:
+        """Indexed jobs sharing a bucket with ``signature`` and similar enough"""
+        candidates: Set[int] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        similar = []
+        for job_id in candidates:
+            similarity = signature_similarity(signature, self._signatures[job_id])
+            if similarity >= self.threshold:
+                similar.append((job_id, similarity))
+        return similar
+
+
+# Global instance
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,118 @@
+import bisect
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional, Tuple
+
+from services.matching.ranking import RankingCursor
+
+# Sessions expire this many seconds after they were last paged
+SESSION_TTL_SECONDS = 30 * 60
+
+# Least recently used sessions are dropped beyond this many
+MAX_SESSIONS = 10_000
+
+# Sort key of a ranked job: ``(distance_km, job_id)`` for searches by
+# distance, ``(-score, job_id)`` for rankings by match score
+Key = Tuple[float, int]
+
+
+@dataclass
+class SearchSession:
+    """
+    Ranked results of one search, paged by keyset.
+
+    ``ranking`` is a cursor of job ids that is only advanced as far as the
+    pages asked for so far; the jobs it returned are kept in ``results`` by
+    their ascending ``sort_key``, so the page after a key starts at its
+    bisection point. A key rather than an offset is carried by "Next page"
+    buttons, so pressing an old button again shows the same page instead
+    of skipping one.
+    """
+
+    ranking: RankingCursor
+    radius_km: Optional[float] = None
+    results: List[Key] = field(default_factory=list)
+    total: int = 0
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(6))
+    expires_at: float = 0.0
+
+    def __post_init__(self):
+        self.total = len(self.results) + len(self.ranking)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def page_after(self, key: Optional[Key], size: int) -> Tuple[List[Key], bool]:
+        """
+        Return the ``size`` results after ``key`` (from the start if None)
+        and whether more results follow them.
+        """
+        while True:
+            start = 0 if key is None else bisect.bisect_right(self.results, key)
+            # One extra result tells whether there is another page
+            missing = start + size + 1 - len(self.results)
+            if missing <= 0 or not self.ranking.has_more:
+                break
+            self.results.extend(self.ranking.sort_key(job_id, score)
+                                for job_id, score in self.ranking.next_page(missing))
+        page = self.results[start:start + size]
+        return page, start + size < len(self.results)
+
+
+class SearchSessionStore:
+    """
+    Search sessions by owner (e.g. Telegram user id) with a sliding TTL.
+
+    Each owner has at most one session; starting a new search replaces it
+    and invalidates the old session's buttons through its token.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[Hashable, SearchSession]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def start(self, owner: Hashable, ranking: RankingCursor,
+              radius_km: Optional[float] = None) -> SearchSession:
+        """Store a new session for ``owner`` paging ``ranking``, a cursor with a tiebreak"""
+        session = SearchSession(ranking=ranking, radius_km=radius_km)
+        with self._lock:
+            self._sessions.pop(owner, None)
+            self._sessions[owner] = session
+            self._touch(owner, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, owner: Hashable, token: Optional[str] = None) -> Optional[SearchSession]:
+        """Return the owner's live session, optionally only if it has ``token``"""
+        with self._lock:
+            session = self._sessions.get(owner)
+            if session is None:
+                return None
+            if session.expires_at <= time.monotonic():
+                del self._sessions[owner]
+                return None
+            if token is not None and session.token != token:
+                return None
+            self._touch(owner, session)
+            return session
+
+    def end(self, owner: Hashable) -> None:
+        with self._lock:
+            self._sessions.pop(owner, None)
+
+    def _touch(self, owner: Hashable, session: SearchSession) -> None:
+        session.expires_at = time.monotonic() + self.ttl
+        self._sessions.move_to_end(owner)
+
+
+# Global instance
+search_sessions = SearchSessionStore()
@@ -0,0 +1,63 @@
+from collections import Counter
+from typing import Dict, List, Optional
+
+from services.matching.skill_matcher import tokenize
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or our that
+the their this to was we were will with you your
+""".split())
+
+# Suffixes stripped by ``stem``, longest first; each maps to its replacement
+_SUFFIXES = (
+    ('ational', 'ate'), ('ization', 'ize'), ('fulness', 'ful'), ('iveness', 'ive'),
+    ('ements', ''), ('ations', 'ate'), ('ement', ''), ('ation', 'ate'), ('ities', ''),
+    ('ness', ''), ('ment', ''), ('ings', ''), ('ity', ''), ('ies', 'y'), ('ing', ''),
+    ('ers', ''), ('ed', ''), ('er', ''), ('es', ''), ('ly', ''), ('s', ''), ('e', ''),
+)
+_MIN_STEM = 3
+_MAX_PASSES = 3
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix-stripping stemmer.
+
+    Strips suffixes until none applies, so inflected forms share a stem
+    ("engineers", "engineer" and "engineering" all become "engin"). Tokens
+    that are not purely alphabetic, like "c++" or "node.js", are left as is.
+    """
+    if not token.isalpha():
+        return token
+    for _ in range(_MAX_PASSES):
+        stripped = _strip_suffix(token)
+        if stripped == token:
+            break
+        token = stripped
+    return token
+
+
+def _strip_suffix(token: str) -> str:
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            if suffix == 's' and token.endswith('ss'):
+                return token
+            return token[:len(token) - len(suffix)] + replacement
+    return token
+
+
+def analyze(text: Optional[str]) -> List[str]:
+    """Tokenize, drop stop words and stem, in text order"""
+    if not text:
+        return []
+    return [stem(token) for token in tokenize(text) if token not in STOP_WORDS]
+
+
+def term_frequencies(*fields: Optional[str], weights: Optional[List[float]] = None) -> Dict[str, float]:
+    """Weighted term frequencies over several text fields"""
+    frequencies: Counter = Counter()
+    for i, text in enumerate(fields):
+        weight = weights[i] if weights else 1.0
+        for term in analyze(text):
+            frequencies[term] += weight
+    return dict(frequencies)
@@ -0,0 +1,121 @@
+import logging
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from sqlalchemy import Table, event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class SpatialBackend(ABC):
+    """
+    Radius search over a table's ``latitude``/``longitude`` columns.
+
+    Implementations push both the radius filter and the distance ordering
+    into the database and back them with a spatial index, so a query reads
+    only the rows near the search point. Distances are in km.
+    """
+
+    name = 'base'
+
+    def __init__(self, table: Table):
+        self.table = table
+        self._installed = False
+        self._lock = threading.Lock()
+
+    def ensure_installed(self, engine: Engine) -> None:
+        """Create the spatial index structures once per process"""
+        if self._installed:
+            return
+        with self._lock:
+            if self._installed:
+                return
+            with engine.begin() as connection:
+                self.install(connection)
+            self._installed = True
+            logger.info(f"Spatial backend '{self.name}' installed for table {self.table.name}")
+
+    @abstractmethod
+    def install(self, connection) -> None:
+        """Create the index structures if missing; must be idempotent"""
+
+    def register_functions(self, dbapi_connection) -> None:
+        """Register per-connection SQL functions the expressions rely on"""
+
+    @abstractmethod
+    def distance_km(self, latitude: float, longitude: float):
+        """SQL expression of the distance from each row to a point"""
+
+    @abstractmethod
+    def within_radius(self, latitude: float, longitude: float, radius_km: float):
+        """SQL condition selecting rows within ``radius_km`` of a point using the index"""
+
+
+# Engine -> table name -> backend
+_backends: 'weakref.WeakKeyDictionary[Engine, Dict[str, SpatialBackend]]' = weakref.WeakKeyDictionary()
+_backends_lock = threading.Lock()
+
+
+def get_spatial_backend(engine: Engine, table: Table) -> SpatialBackend:
+    """
+    Return the spatial backend for a table on an engine, creating it on first use.
+
+    SQLite gets an R*Tree, PostgreSQL PostGIS when the extension is installed
+    and earthdistance otherwise.
+    """
+    backend = _backends.get(engine, {}).get(table.name)
+    if backend is None:
+        with _backends_lock:
+            by_table = _backends.setdefault(engine, {})
+            backend = by_table.get(table.name)
+            if backend is None:
+                backend = _create_backend(engine, table)
+                _attach(engine, backend)
+                by_table[table.name] = backend
+    backend.ensure_installed(engine)
+    return backend
+
+
+def _create_backend(engine: Engine, table: Table) -> SpatialBackend:
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        from services.spatial.sqlite_rtree import SQLiteRTreeBackend
+        return SQLiteRTreeBackend(table)
+    if dialect == 'postgresql':
+        from services.spatial.postgres import EarthDistanceBackend, PostGISBackend
+        with engine.connect() as connection:
+            backend_class = PostGISBackend if PostGISBackend.available(connection) else EarthDistanceBackend
+        return backend_class(table)
+    raise ValueError(f"No spatial backend for database dialect '{dialect}'")
+
+
+def _attach(engine: Engine, backend: SpatialBackend) -> None:
+    """Register the backend's SQL functions on every pooled connection"""
+    key = f'spatial_functions_{backend.table.name}'
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if not connection_record.info.get(key):
+            backend.register_functions(dbapi_connection)
+            connection_record.info[key] = True
+
+    event.listen(engine, 'checkout', on_checkout)
+
+
+def attach_spatial_backend(engine: Engine, table: Optional[Table] = None) -> None:
+    """
+    Set up the job table's spatial backend before connections are handed out.
+
+    Connections checked out before the backend exists would lack its SQL
+    functions, so the app calls this at startup.
+    """
+    if table is None:
+        from models.job import Job
+        table = Job.__table__
+    try:
+        get_spatial_backend(engine, table)
+    except Exception as e:
+        # Tables may not exist yet on a fresh database; retried on first search
+        logger.warning(f"Spatial backend not installed: {e}")
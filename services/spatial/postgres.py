@@ -0,0 +1,75 @@
+from sqlalchemy import and_, func, text
+
+from services.spatial.backend import SpatialBackend
+
+
+class PostGISBackend(SpatialBackend):
+    """
+    PostgreSQL backend using PostGIS geography points.
+
+    A GiST expression index on the rows' geography point serves
+    ``ST_DWithin``; distances are on the WGS-84 spheroid.
+    """
+
+    name = 'postgis'
+
+    @staticmethod
+    def available(connection) -> bool:
+        return connection.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+        ).first() is not None
+
+    @staticmethod
+    def point(latitude, longitude):
+        # geography(...) rather than a ::geography cast so queries and the
+        # index definition compile to the same expression
+        return func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326))
+
+    def install(self, connection) -> None:
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.table.name}_geography ON {self.table.name} "
+            f"USING gist (geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)))"
+        )
+
+    def _row_point(self):
+        return self.point(self.table.c.latitude, self.table.c.longitude)
+
+    def distance_km(self, latitude: float, longitude: float):
+        return func.ST_Distance(self._row_point(), self.point(latitude, longitude)) / 1000
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float):
+        return func.ST_DWithin(self._row_point(), self.point(latitude, longitude), radius_km * 1000)
+
+
+class EarthDistanceBackend(SpatialBackend):
+    """
+    PostgreSQL backend using the ``cube`` and ``earthdistance`` contrib extensions.
+
+    A GiST expression index on ``ll_to_earth(latitude, longitude)`` serves
+    the ``earth_box`` containment test; ``earth_distance`` then removes the
+    box corners.
+    """
+
+    name = 'earthdistance'
+
+    def install(self, connection) -> None:
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS cube")
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS earthdistance")
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.table.name}_earth ON {self.table.name} "
+            f"USING gist (ll_to_earth(latitude, longitude))"
+        )
+
+    def _row_point(self):
+        return func.ll_to_earth(self.table.c.latitude, self.table.c.longitude)
+
+    def distance_km(self, latitude: float, longitude: float):
+        return func.earth_distance(func.ll_to_earth(latitude, longitude), self._row_point()) / 1000
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float):
+        radius_m = radius_km * 1000
+        box = func.earth_box(func.ll_to_earth(latitude, longitude), radius_m)
+        return and_(
+            box.op('@>')(self._row_point()),
+            func.earth_distance(func.ll_to_earth(latitude, longitude), self._row_point()) <= radius_m
+        )
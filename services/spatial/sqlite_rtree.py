@@ -0,0 +1,95 @@
+from sqlalchemy import Column, Float, Integer, MetaData, Table, and_, func, or_, select, text
+
+from services.geo_distance import KM_PER_DEGREE, haversine_km, longitude_span
+from services.spatial.backend import SpatialBackend
+
+# R*Tree coordinates are 32-bit floats rounded outwards; widen the search box
+# by this much so rounding never drops a row
+BOX_PADDING_DEGREES = 1e-4
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return float(haversine_km(lat1, lon1, lat2, lon2))
+
+
+class SQLiteRTreeBackend(SpatialBackend):
+    """
+    SQLite backend: an R*Tree virtual table holds each row's point.
+
+    Triggers on the table keep ``<table>_rtree`` in sync with every insert,
+    coordinate update and delete, whichever process or statement makes them.
+    A radius query selects ids from the R*Tree with the circle's bounding box
+    (split in two across the antimeridian) and computes exact haversine
+    distances, through a registered ``haversine_km`` SQL function, for those
+    rows only.
+    """
+
+    name = 'sqlite_rtree'
+
+    def __init__(self, table: Table):
+        super().__init__(table)
+        self.rtree = Table(
+            f'{table.name}_rtree', MetaData(),
+            Column('id', Integer, primary_key=True),
+            Column('min_lat', Float), Column('max_lat', Float),
+            Column('min_lon', Float), Column('max_lon', Float),
+        )
+
+    def install(self, connection) -> None:
+        table, rtree = self.table.name, self.rtree.name
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': rtree}
+        ).first()
+        for statement in rtree_ddl(table, rtree):
+            connection.exec_driver_sql(statement)
+        if not exists:
+            connection.exec_driver_sql(
+                f"INSERT INTO {rtree} SELECT id, latitude, latitude, longitude, longitude "
+                f"FROM {table} WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+
+    def register_functions(self, dbapi_connection) -> None:
+        dbapi_connection.create_function('haversine_km', 4, _haversine, deterministic=True)
+
+    def distance_km(self, latitude: float, longitude: float):
+        return func.haversine_km(self.table.c.latitude, self.table.c.longitude, latitude, longitude)
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float):
+        rtree = self.rtree.c
+        lat_span = radius_km / KM_PER_DEGREE + BOX_PADDING_DEGREES
+        box = [rtree.max_lat >= latitude - lat_span, rtree.min_lat <= latitude + lat_span]
+
+        lon_span = longitude_span(latitude, radius_km)
+        if lon_span is not None and lon_span + BOX_PADDING_DEGREES < 180:
+            lon_span += BOX_PADDING_DEGREES
+            west, east = longitude - lon_span, longitude + lon_span
+            if west < -180:
+                box.append(or_(rtree.max_lon >= west + 360, rtree.min_lon <= east))
+            elif east > 180:
+                box.append(or_(rtree.max_lon >= west, rtree.min_lon <= east - 360))
+            else:
+                box += [rtree.max_lon >= west, rtree.min_lon <= east]
+
+        return and_(
+            self.table.c.id.in_(select(rtree.id).where(*box)),
+            self.distance_km(latitude, longitude) <= radius_km
+        )
+
+
+def rtree_ddl(table: str, rtree: str):
+    """Statements creating the R*Tree of ``table`` and the triggers syncing it"""
+    point = "NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude"
+    has_point = "NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table} WHEN {has_point} "
+        f"BEGIN INSERT OR REPLACE INTO {rtree} VALUES ({point}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF id, latitude, longitude ON {table} "
+        f"BEGIN DELETE FROM {rtree} WHERE id = OLD.id; "
+        f"INSERT INTO {rtree} SELECT {point} WHERE {has_point}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM {rtree} WHERE id = OLD.id; END",
+    ]
+
@@ -0,0 +1,30 @@
+import pytest
+from flask import Flask
+
+from extensions import db
+
+
+@pytest.fixture
+def make_db_app(tmp_path):
+    """
+    Build Flask apps on a SQLite file with the tables of the given models.
+
+    A file database rather than an in-memory one, so the connections of the
+    bot's DB thread pool all see the same data.
+    """
+    apps = []
+
+    def make(*models, name='test.db'):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / name}"
+        db.init_app(app)
+        with app.app_context():
+            db.metadata.create_all(db.engine, tables=[model.__table__ for model in models])
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
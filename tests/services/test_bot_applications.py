@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+import bot.handlers as handlers
+from bot.commands import jobs_command
+from bot.commands.jobs_command import JobsCommand, _seeker_profile
+from bot.job_cards import JobCardCache
+from bot.commands.register_command import _create_job_seeker, _is_registered
+from bot.cover_letter_queue import CoverLetterRequest
+from bot.runtime import BotRuntime
+from extensions import db
+from models import Application, Employer, Job, JobRecommendation, JobSeeker
+from services.search.search_sessions import SearchSessionStore
+
+
+class FakeCoverLetterQueue:
+    def __init__(self):
+        self.requests = []
+
+    def submit(self, request):
+        self.requests.append(request)
+        return True
+
+
+class TestApply:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app, monkeypatch):
+        self.app = make_db_app(Employer, Job, JobSeeker, Application)
+        with self.app.app_context():
+            db.session.execute(Employer.__table__.insert(),
+                               [{'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'}])
+            db.session.execute(Job.__table__.insert(), [
+                {'id': 7, 'employer_id': 1, 'title': 'Backend developer', 'description': 'APIs',
+                 'location': 'Tel Aviv', 'status': Job.STATUS_ACTIVE, 'revision': 3}])
+            db.session.execute(JobSeeker.__table__.insert(), [
+                {'id': 1, 'telegram_user_id': '1001', 'first_name': 'Dana', 'last_name': 'Levi',
+                 'skills': {'technical_skills': ['Python']}}])
+            db.session.commit()
+        runtime = BotRuntime(db_workers=2)
+        asyncio.run(runtime.start(self.app))
+        self.queue = FakeCoverLetterQueue()
+        self.replies = []
+        monkeypatch.setattr(handlers, 'bot_runtime', runtime)
+        monkeypatch.setattr(handlers, 'cover_letter_queue', self.queue)
+        monkeypatch.setattr(handlers, '_reply',
+                            lambda context, message, text, **kwargs: self.replies.append(text))
+        yield
+        runtime.shutdown()
+
+    def apply(self, telegram_id, job_id):
+        message = SimpleNamespace(chat_id=int(telegram_id))
+        asyncio.run(handlers._apply(SimpleNamespace(bot=None), message, telegram_id, job_id))
+
+    def applications(self):
+        with self.app.app_context():
+            table = Application.__table__
+            return db.session.execute(table.select()).mappings().all()
+
+    def test_application_is_created_and_queued(self):
+        """Test applying stores a pending application and queues its cover letter"""
+        self.apply('1001', 7)
+
+        [application] = self.applications()
+        assert (application['job_id'], application['telegram_user_id']) == (7, '1001')
+        assert application['status'] == Application.STATUS_PENDING
+        assert application['cover_letter_status'] == Application.COVER_LETTER_PENDING
+        [request] = self.queue.requests
+        assert request == CoverLetterRequest(
+            application_id=application['id'], chat_id=1001, job_id=7, job_revision=3,
+            candidate=request.candidate,
+            job={'title': 'Backend developer', 'company': 'Acme', 'description': 'APIs'})
+        assert request.candidate['name'] == 'Dana Levi'
+        assert 'Backend developer at Acme' in self.replies[-1]
+
+    def test_refusals(self):
+        """Test unregistered users, unknown jobs and repeated applications are refused"""
+        self.apply('2002', 7)
+        self.apply('1001', 99)
+        self.apply('1001', 7)
+        self.apply('1001', 7)
+
+        assert 'register first' in self.replies[0]
+        assert 'Job not found' in self.replies[1]
+        assert 'already applied' in self.replies[3]
+        assert len(self.applications()) == 1 and len(self.queue.requests) == 1
+
+    def test_seeker_lookups(self):
+        """Test the /search, /jobs and /register lookups find seekers by their Telegram user id"""
+        with self.app.app_context():
+            assert handlers._seeker_location('1001') == (None, None)
+            assert handlers._seeker_location('2002') is None
+            assert _seeker_profile('1001') == (1, False)
+            assert _is_registered('1001') and not _is_registered('2002')
+
+            _create_job_seeker('2002', location='Haifa', full_name='Noa', phone_number='+972',
+                               resume_path='resumes/2002.pdf', latitude=32.8, longitude=35.0)
+            assert _is_registered('2002')
+            assert handlers._seeker_location('2002') == (32.8, 35.0)
+
+
+class TestJobsCommand:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app, monkeypatch):
+        self.app = make_db_app(Employer, Job, JobSeeker, JobRecommendation)
+        with self.app.app_context():
+            db.session.execute(Employer.__table__.insert(),
+                               [{'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'}])
+            db.session.execute(Job.__table__.insert(), [
+                {'id': job_id, 'employer_id': 1, 'title': f'Developer {job_id}', 'description': 'APIs',
+                 'location': 'Tel Aviv', 'revision': 1,
+                 'status': Job.STATUS_CLOSED if job_id == 4 else Job.STATUS_ACTIVE}
+                for job_id in range(1, 9)])
+            db.session.execute(JobSeeker.__table__.insert(), [
+                {'id': 1, 'telegram_user_id': '1001', 'resume_path': 'resumes/1001.pdf',
+                 'recommendations_computed_at': datetime(2024, 1, 1)}])
+            # Job 2 ties job 6; job 4 is closed and job 8 is below the threshold
+            db.session.execute(JobRecommendation.__table__.insert(), [
+                {'job_seeker_id': 1, 'job_id': job_id, 'score': score,
+                 'computed_at': datetime(2024, 1, 1)}
+                for job_id, score in {1: 80.0, 2: 90.0, 3: 76.0, 4: 99.0, 5: 85.0,
+                                      6: 90.0, 7: 95.0, 8: 60.0}.items()])
+            db.session.commit()
+        runtime = BotRuntime(db_workers=2)
+        asyncio.run(runtime.start(self.app))
+        monkeypatch.setattr('bot.runtime.bot_runtime', runtime)
+        monkeypatch.setattr(jobs_command, 'job_card_cache', JobCardCache())
+        monkeypatch.setattr(jobs_command, 'job_rankings', SearchSessionStore())
+        self.replies = []
+        monkeypatch.setattr(JobsCommand, 'reply',
+                            lambda command, update, context, text, **kwargs: self.replies.append(text))
+        self.context = SimpleNamespace(args=[], user_data={}, bot=None)
+        yield
+        runtime.shutdown()
+
+    def jobs(self, *args):
+        self.replies.clear()
+        self.context.args = list(args)
+        update = SimpleNamespace(effective_user=SimpleNamespace(id=1001))
+        asyncio.run(JobsCommand().execute(update, self.context))
+        return [reply.split('\n')[:2] for reply in self.replies]
+
+    def test_more_resumes_the_ranking(self, monkeypatch):
+        """Test "/jobs more" continues after the last job shown, best first, ties by job id"""
+        monkeypatch.setattr(jobs_command, 'MAX_RESULTS', 2)
+        assert self.jobs() == [['Match Score: 95.0%', '🏢 *Developer 7*'],
+                               ['Match Score: 90.0%', '🏢 *Developer 2*'],
+                               ['Use /jobs more to see more matching jobs.']]
+        assert self.jobs('more')[:2] == [['Match Score: 90.0%', '🏢 *Developer 6*'],
+                                         ['Match Score: 85.0%', '🏢 *Developer 5*']]
+        assert self.jobs('more') == [['Match Score: 80.0%', '🏢 *Developer 1*'],
+                                     ['Match Score: 76.0%', '🏢 *Developer 3*']]
+        assert self.jobs('more') == [['No more matching jobs. Use /jobs to search again.']]
+
+
+class TestJobPageTexts:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        with make_db_app(Employer, Job).app_context():
+            db.session.execute(Employer.__table__.insert(), [
+                {'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'},
+                {'id': 2, 'email': 'jobs@globex.test', 'company_name': 'Globex'}])
+            db.session.execute(Job.__table__.insert(), [
+                {'id': job_id, 'employer_id': 2 if job_id == 2 else 1, 'title': f'Developer {job_id}',
+                 'description': 'APIs', 'location': 'Tel Aviv', 'revision': 1,
+                 'status': Job.STATUS_CLOSED if job_id == 3 else Job.STATUS_ACTIVE}
+                for job_id in range(1, 4)])
+            db.session.commit()
+            self.queries = []
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda *args: self.queries.append(args[2]))
+            yield
+
+    def test_search_page_is_loaded_in_one_query(self):
+        """Test a search page renders its active jobs, employers and distances from one query"""
+        texts = handlers._search_page_texts([(0.5, 2), (1.25, 3), (2.0, 1)])
+
+        assert len(self.queries) == 1
+        assert [text.split('\n')[:3] for text in texts] == [
+            ['🏢 *Developer 2*', '🏗 _Globex_', '📍 Tel Aviv (0.5km away)'],
+            ['🏢 *Developer 1*', '🏗 _Acme_', '📍 Tel Aviv (2.0km away)']]
+
+    def test_find_page_is_loaded_in_one_query(self, monkeypatch):
+        """Test a /find page renders its active jobs in rank order from one query"""
+        from services.search.job_text_index import job_text_index
+        from services.search.near_duplicates import near_duplicate_index
+
+        monkeypatch.setattr(near_duplicate_index, 'superseded_ids', lambda: set())
+        monkeypatch.setattr(job_text_index, 'search',
+                            lambda query, limit, offset, exclude: [(3, 2.0), (1, 1.5), (2, 1.0)])
+        texts, has_more = handlers._find_texts('developer', 0)
+
+        assert len(self.queries) == 1 and not has_more
+        assert [text.split('\n')[:2] for text in texts] == [['🏢 *Developer 1*', '🏗 _Acme_'],
+                                                            ['🏢 *Developer 2*', '🏗 _Globex_']]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from bot.persistence import SQLAlchemyPersistence
+from bot.runtime import BotRuntime
+from extensions import db
+from models import BotState
+
+
+class TestSQLAlchemyPersistence:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        self.app = make_db_app(BotState)
+        self.runtime = BotRuntime(db_workers=2)
+        asyncio.run(self.runtime.start(self.app))
+        yield
+        self.runtime.shutdown()
+
+    def rows(self):
+        with self.app.app_context():
+            table = BotState.__table__
+            return {(row.kind, row.key): row.data for row in db.session.execute(table.select())}
+
+    def persistence(self):
+        return SQLAlchemyPersistence(self.runtime, update_interval=1)
+
+    def test_state_survives_restart(self):
+        """Test data and conversation states written by one bot are loaded by the next"""
+        async def first_run():
+            persistence = self.persistence()
+            await persistence.update_user_data(42, {'full_name': 'Dana', 'cursor': ('t', 1.5, 7)})
+            await persistence.update_chat_data(42, {'lang': 'he'})
+            await persistence.update_bot_data({'started': 1})
+            await persistence.update_conversation('registration', (42, 42), 1)
+            await persistence.flush()
+
+        async def second_run():
+            persistence = self.persistence()
+            return (await persistence.get_user_data(), await persistence.get_chat_data(),
+                    await persistence.get_bot_data(), await persistence.get_conversations('registration'),
+                    await persistence.get_conversations('other'))
+
+        asyncio.run(first_run())
+        user_data, chat_data, bot_data, conversations, other = asyncio.run(second_run())
+        assert user_data == {42: {'full_name': 'Dana', 'cursor': ['t', 1.5, 7]}}
+        assert chat_data == {42: {'lang': 'he'}}
+        assert bot_data == {'started': 1}
+        assert conversations == {(42, 42): 1} and other == {}
+
+    def test_updates_do_not_wait_for_the_database(self):
+        """Test updates return at once and repeated changes are written once, latest first"""
+        async def run():
+            persistence = self.persistence()
+            for step in range(10):
+                await persistence.update_user_data(1, {'step': step})
+            # Nothing is written until the loop gets to the writer task
+            written_early = self.rows()
+            await persistence.flush()
+            return persistence, written_early
+
+        persistence, written_early = asyncio.run(run())
+        assert written_early == {}
+        assert self.rows() == {('user', '1'): '{"step": 9}'}
+
+    def test_unchanged_entries_are_not_rewritten(self):
+        """Test an entry is only queued again when its JSON changed"""
+        async def run():
+            persistence = self.persistence()
+            await persistence.update_user_data(1, {'a': 1, 'b': 2})
+            await persistence.flush()
+            await persistence.update_user_data(1, {'b': 2, 'a': 1})
+            return persistence._pending
+
+        assert asyncio.run(run()) == {}
+
+    def test_ended_conversations_and_dropped_data_are_deleted(self):
+        """Test a conversation ending and dropped user data remove their rows"""
+        async def run():
+            persistence = self.persistence()
+            await persistence.update_user_data(1, {'full_name': 'Dana'})
+            await persistence.update_conversation('registration', (1, 1), 3)
+            await persistence.flush()
+            await persistence.update_conversation('registration', (1, 1), None)
+            await persistence.drop_user_data(1)
+            await persistence.flush()
+
+        asyncio.run(run())
+        assert self.rows() == {}
+
+    def test_unserializable_data_is_skipped(self):
+        """Test data that is not JSON serializable is logged instead of breaking the others"""
+        async def run():
+            persistence = self.persistence()
+            await persistence.update_user_data(1, {'file': object()})
+            await persistence.update_user_data(2, {'ok': True})
+            await persistence.flush()
+
+        asyncio.run(run())
+        assert self.rows() == {('user', '2'): '{"ok": true}'}
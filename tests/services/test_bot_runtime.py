@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from bot.runtime import BotRuntime
+from extensions import db
+
+
+class TestBotRuntime:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        self.builds = 0
+        self.make_app = make_db_app
+
+        async def factory():
+            self.builds += 1
+            await asyncio.sleep(0)
+            return self.make_app()
+
+        self.runtime = BotRuntime(factory)
+
+    def test_app_is_built_once(self):
+        """Test concurrent and repeated starts share one app"""
+        async def updates():
+            apps = await asyncio.gather(*(self.runtime.start() for _ in range(10)))
+            return apps + [await self.runtime.start()]
+
+        apps = asyncio.run(updates())
+        assert self.builds == 1
+        assert all(app is apps[0] for app in apps)
+
+    def test_given_app_is_used(self):
+        """Test an app built by the runner is reused instead of building another"""
+        app = self.make_app()
+        assert asyncio.run(self.runtime.start(app)) is app
+        assert self.runtime.app is app and self.builds == 0
+
+    def test_session_is_scoped(self):
+        """Test each handler block gets a fresh session and failures roll back"""
+        asyncio.run(self.runtime.start())
+        with self.runtime.session() as session:
+            session.execute(text('CREATE TABLE t (x INTEGER)'))
+            session.commit()
+            first = session()
+        with pytest.raises(RuntimeError):
+            with self.runtime.session() as session:
+                session.execute(text('INSERT INTO t VALUES (1)'))
+                raise RuntimeError('handler failed')
+        with self.runtime.session() as session:
+            assert session() is not first
+            assert session.execute(text('SELECT COUNT(*) FROM t')).scalar() == 0
+
+    def test_unstarted_runtime(self):
+        """Test using the app before start fails loudly"""
+        with pytest.raises(RuntimeError):
+            self.runtime.app
+
+    def test_run_keeps_loop_responsive(self):
+        """Test blocking queries run off the event loop while other updates proceed"""
+        release = threading.Event()
+
+        def slow_query():
+            release.wait(5)
+            return 'slow'
+
+        async def updates():
+            slow = asyncio.ensure_future(self.runtime.run(slow_query))
+            # A second update is served while the first query still blocks
+            fast = await self.runtime.run(lambda: 'fast')
+            done_before_release = slow.done()
+            release.set()
+            return fast, done_before_release, await slow
+
+        assert asyncio.run(updates()) == ('fast', False, 'slow')
+
+    def test_run_is_bounded(self):
+        """Test no more queries run at once than the pool has workers"""
+        runtime = BotRuntime(lambda: asyncio.sleep(0, self.make_app()), db_workers=2)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def query():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        async def updates():
+            await asyncio.gather(*(runtime.run(query) for _ in range(8)))
+
+        asyncio.run(updates())
+        runtime.shutdown()
+        assert len(peak) == 8 and max(peak) == 2
+
+    def test_run_uses_own_session(self):
+        """Test each task gets its own session, closed when the task returns"""
+        barrier = threading.Barrier(4, timeout=5)
+
+        def query():
+            # All four tasks hold their session at the same time
+            db.session.execute(text('SELECT 1'))
+            barrier.wait()
+            return db.session()
+
+        async def updates():
+            return await asyncio.gather(*(self.runtime.run(query) for _ in range(4)))
+
+        sessions = asyncio.run(updates())
+        self.runtime.shutdown()
+        assert len({id(session) for session in sessions}) == 4
+        assert not any(session.in_transaction() for session in sessions)
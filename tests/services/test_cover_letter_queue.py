@@ -0,0 +1,166 @@
+import asyncio
+
+import httpx
+import pytest
+
+from bot.cover_letter_queue import (MAX_ATTEMPTS, CoverLetterQueue, CoverLetterRequest,
+                                    candidate_info, profile_hash)
+from bot.runtime import BotRuntime
+from extensions import db
+from models import Application, CoverLetterCache, Employer, Job, JobSeeker
+
+CANDIDATE = candidate_info({'technical_skills': ['Python', 'SQL']}, 'Dana Levi')
+JOB = {'title': 'Backend developer', 'company': 'Acme', 'description': 'APIs'}
+
+
+class FakeBackend:
+    def __init__(self, failures=0):
+        self.calls = 0
+        self.failures = failures
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def __call__(self, candidate, job, client=None):
+        assert isinstance(client, httpx.AsyncClient)
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                self.failures -= 1
+                raise httpx.ConnectError('backend down')
+            return f"Dear {job['company']}, {candidate.get('name')} here."
+        finally:
+            self.in_flight -= 1
+
+
+class TestCoverLetterQueue:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        app = make_db_app(Employer, Job, JobSeeker, Application, CoverLetterCache)
+        with app.app_context():
+            db.session.execute(Employer.__table__.insert(),
+                               [{'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'}])
+            db.session.execute(Job.__table__.insert(), [
+                {'id': job_id, 'employer_id': 1, 'title': 'Backend developer', 'description': 'APIs',
+                 'location': 'Tel Aviv', 'status': Job.STATUS_ACTIVE}
+                for job_id in (7, 8)])
+            db.session.execute(JobSeeker.__table__.insert(), [
+                {'id': 1, 'telegram_user_id': '1001', 'first_name': 'Dana', 'last_name': 'Levi',
+                 'skills': {'technical_skills': ['Python', 'SQL']}}])
+            db.session.commit()
+        self.runtime = BotRuntime(db_workers=2)
+        asyncio.run(self.runtime.start(app))
+        self.app = app
+        self.notified = []
+        yield
+        self.runtime.shutdown()
+
+    def add_applications(self, *job_ids, status=Application.COVER_LETTER_PENDING):
+        with self.app.app_context():
+            table = Application.__table__
+            ids = []
+            for job_id in job_ids:
+                result = db.session.execute(table.insert().values(
+                    job_id=job_id, telegram_user_id='1001', status=Application.STATUS_PENDING,
+                    cover_letter_status=status))
+                ids.append(result.inserted_primary_key[0])
+            db.session.commit()
+            return ids
+
+    def applications(self):
+        with self.app.app_context():
+            table = Application.__table__
+            return {row.id: (row.cover_letter_status, row.cover_letter)
+                    for row in db.session.execute(table.select())}
+
+    def request(self, application_id, job_id=7, job_revision=1):
+        return CoverLetterRequest(application_id=application_id, chat_id=1001, job_id=job_id,
+                                  job_revision=job_revision, candidate=CANDIDATE, job=JOB)
+
+    def run(self, queue, requests=(), requeue_pending=False):
+        async def write():
+            queue.start(lambda chat_id, text: self.notified.append((chat_id, text)),
+                        requeue_pending=requeue_pending)
+            await asyncio.sleep(0.05)
+            for request in requests:
+                assert queue.submit(request)
+            await asyncio.wait_for(queue.join(), 5)
+            await queue.stop()
+        asyncio.run(write())
+
+    def test_letters_are_written_and_cached(self):
+        """Test pending letters are filled in and an unchanged profile and job hit the cache"""
+        backend = FakeBackend()
+        first, second = self.add_applications(7, 7)
+        self.run(CoverLetterQueue(self.runtime, workers=1, generate=backend),
+                 [self.request(first), self.request(second)])
+
+        assert backend.calls == 1
+        assert self.applications() == {
+            first: (Application.COVER_LETTER_READY, 'Dear Acme, Dana Levi here.'),
+            second: (Application.COVER_LETTER_READY, 'Dear Acme, Dana Levi here.')}
+        assert [chat_id for chat_id, _ in self.notified] == [1001, 1001]
+        assert 'Backend developer at Acme' in self.notified[0][1]
+
+    def test_changed_job_or_profile_misses_the_cache(self):
+        """Test a new job revision or another profile is written afresh"""
+        backend = FakeBackend()
+        first, second, third = self.add_applications(7, 7, 7)
+        other = self.request(third)
+        other.candidate = candidate_info(['Go'], 'Dana Levi')
+        self.run(CoverLetterQueue(self.runtime, workers=1, generate=backend),
+                 [self.request(first), self.request(second, job_revision=2), other])
+
+        assert backend.calls == 3
+        assert profile_hash(other.candidate) != profile_hash(CANDIDATE)
+
+    def test_failing_backend_falls_back_to_the_template(self):
+        """Test the backend is retried, then the template is used and not cached"""
+        backend = FakeBackend(failures=MAX_ATTEMPTS)
+        [application_id] = self.add_applications(7)
+        self.run(CoverLetterQueue(self.runtime, workers=1, generate=backend, retry_delay=0),
+                 [self.request(application_id)])
+
+        status, cover_letter = self.applications()[application_id]
+        assert backend.calls == MAX_ATTEMPTS
+        assert status == Application.COVER_LETTER_FALLBACK and 'Dear Hiring Manager' in cover_letter
+        with self.app.app_context():
+            assert db.session.execute(CoverLetterCache.__table__.select()).first() is None
+
+    def test_backend_concurrency_is_bounded(self):
+        """Test no more requests reach the backend at once than there are workers"""
+        backend = FakeBackend()
+        ids = self.add_applications(7, 8, 7, 8, 7, 8)
+        candidates = [candidate_info([f'skill {i}']) for i in range(len(ids))]
+        requests = [self.request(application_id, job_id=job_id)
+                    for application_id, job_id in zip(ids, [7, 8] * 3)]
+        for request, candidate in zip(requests, candidates):
+            request.candidate = candidate
+        self.run(CoverLetterQueue(self.runtime, workers=2, generate=backend), requests)
+
+        assert backend.calls == 6 and backend.peak_in_flight == 2
+        assert {status for status, _ in self.applications().values()} == {Application.COVER_LETTER_READY}
+
+    def test_pending_applications_are_requeued_on_start(self):
+        """Test applications left pending by a restart get their letter, others are left alone"""
+        backend = FakeBackend()
+        [pending] = self.add_applications(8)
+        [done] = self.add_applications(7, status=Application.COVER_LETTER_READY)
+        self.run(CoverLetterQueue(self.runtime, workers=1, generate=backend), requeue_pending=True)
+
+        applications = self.applications()
+        assert applications[pending] == (Application.COVER_LETTER_READY, 'Dear Acme, Dana Levi here.')
+        assert applications[done] == (Application.COVER_LETTER_READY, None)
+        assert backend.calls == 1
+
+
+class TestCandidateInfo:
+    def test_skill_shapes(self):
+        """Test the skills JSON shapes profiles are saved with all give technical skills"""
+        assert candidate_info({'extracted_skills': ['Python']})['technical_skills'] == ['Python']
+        assert candidate_info({'default_skills': ['general']})['technical_skills'] == ['general']
+        assert candidate_info(['SQL'], 'Dana')['technical_skills'] == ['SQL']
+        assert candidate_info(None) == {'technical_skills': [], 'soft_skills': [],
+                                        'experience': [], 'education': []}
@@ -0,0 +1,52 @@
+import pytest
+from services.gazetteer import Gazetteer, normalize_place
+
+
+class TestGazetteer:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        path = tmp_path / 'gazetteer.csv'
+        path.write_text(
+            'name,country,region,latitude,longitude,aliases\n'
+            'Tel Aviv,IL,,32.0853,34.7818,tel aviv-yafo|tlv|תל אביב\n'
+            "Ra'anana,IL,,32.1848,34.8713,\n"
+            'York,GB,,53.9600,-1.0873,\n'
+            'New York,US,NY,40.7128,-74.0060,nyc\n',
+            encoding='utf-8'
+        )
+        self.gazetteer = Gazetteer(path)
+
+    def names(self, text):
+        place = self.gazetteer.lookup(text)
+        return place.name if place else None
+
+    def test_normalize(self):
+        """Test accents, apostrophes, hyphens and case are normalized"""
+        assert normalize_place("  Ra'anana ") == 'raanana'
+        assert normalize_place('Tel-Aviv, ISRAEL') == 'tel aviv israel'
+        assert normalize_place('Zürich') == 'zurich'
+
+    def test_lookup_in_free_text(self):
+        """Test places and aliases are found inside longer location texts"""
+        assert self.names('Senior role, Tel Aviv-Yafo (hybrid)') == 'Tel Aviv'
+        assert self.names('TLV') == 'Tel Aviv'
+        assert self.names('תל אביב') == 'Tel Aviv'
+        assert self.names('Raanana office') == "Ra'anana"
+        assert len(self.gazetteer) == 4
+
+    def test_longest_match_wins(self):
+        """Test a multi-word name beats a shorter name it contains"""
+        assert self.names('New York, NY') == 'New York'
+        assert self.names('York') == 'York'
+
+    def test_unknown_places(self):
+        """Test unresolvable locations return None"""
+        assert self.gazetteer.lookup('Remote') is None
+        assert self.gazetteer.coordinates('') is None
+        assert self.gazetteer.coordinates('tel aviv') == (32.0853, 34.7818)
+
+    def test_bundled_gazetteer_loads(self):
+        """Test the bundled gazetteer file parses"""
+        bundled = Gazetteer()
+        assert len(bundled) > 100
+        assert bundled.lookup('Haifa, Israel').country == 'IL'
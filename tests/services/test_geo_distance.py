@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+from services.geo_distance import (
+    bounding_box_mask, haversine_km, within_radius, within_radius_matrix
+)
+
+
+def scalar_haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+class TestGeoDistance:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        rng = np.random.default_rng(3)
+        self.latitudes = rng.uniform(-90, 90, 5000)
+        self.longitudes = rng.uniform(-180, 180, 5000)
+
+    def test_matches_scalar_haversine(self):
+        """Test the vectorized kernel agrees with the scalar formula"""
+        expected = [scalar_haversine(32.08, 34.78, lat, lon)
+                    for lat, lon in zip(self.latitudes[:100], self.longitudes[:100])]
+        assert haversine_km(32.08, 34.78, self.latitudes[:100], self.longitudes[:100]) == pytest.approx(expected)
+        assert float(haversine_km(0, 0, 0, 1)) == pytest.approx(111.195, abs=1e-3)
+
+    @pytest.mark.parametrize('latitude, longitude, radius_km', [
+        (32.08, 34.78, 500), (0.0, 179.9, 800), (-88.0, 10.0, 600), (45.0, -120.0, 4000),
+    ])
+    def test_bounding_box_keeps_every_point_inside(self, latitude, longitude, radius_km):
+        """Test the prefilter never drops a point within the radius"""
+        inside = haversine_km(latitude, longitude, self.latitudes, self.longitudes) <= radius_km
+        mask = bounding_box_mask(self.latitudes, self.longitudes, latitude, longitude, radius_km)
+        assert inside.any()
+        assert not (inside & ~mask).any()
+        assert mask.sum() < len(mask)
+
+    def test_within_radius_sorted(self):
+        """Test radius queries return exactly the points inside, closest first"""
+        indices, distances = within_radius(self.latitudes, self.longitudes, 10.0, 20.0, 1500)
+        full = haversine_km(10.0, 20.0, self.latitudes, self.longitudes)
+        assert sorted(indices.tolist()) == np.flatnonzero(full <= 1500).tolist()
+        assert np.all(np.diff(distances) >= 0)
+        assert distances == pytest.approx(full[indices])
+
+    def test_many_query_points(self):
+        """Test the matrix form agrees with one query at a time"""
+        queries = [(10.0, 20.0, 1500), (-30.0, 150.0, 800), (60.0, -179.0, 1200)]
+        within, distances = within_radius_matrix(
+            [q[0] for q in queries], [q[1] for q in queries],
+            self.latitudes, self.longitudes, [q[2] for q in queries]
+        )
+        for row, (latitude, longitude, radius_km) in enumerate(queries):
+            indices, expected = within_radius(self.latitudes, self.longitudes, latitude, longitude, radius_km)
+            assert sorted(indices.tolist()) == np.flatnonzero(within[row]).tolist()
+            assert distances[row, indices] == pytest.approx(expected)
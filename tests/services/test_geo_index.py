@@ -0,0 +1,76 @@
+import math
+import random
+
+import pytest
+from core.db_events import ModelChange
+from services.geo_index import JobGeoIndex
+
+
+def job_change(op, job_id, latitude, longitude, status='active'):
+    return ModelChange(op, job_id, {
+        'id': job_id,
+        'status': status,
+        'latitude': latitude,
+        'longitude': longitude,
+    })
+
+
+class TestJobGeoIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = JobGeoIndex()
+        # Skip the database load, the index is populated through changes only
+        self.index._loaded = True
+
+    def haversine(self, lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+    def brute_force(self, points, latitude, longitude, radius_km):
+        within = [
+            (job_id, self.haversine(latitude, longitude, *point))
+            for job_id, point in points.items()
+        ]
+        return sorted((item for item in within if item[1] <= radius_km),
+                      key=lambda item: (item[1], item[0]))
+
+    @pytest.mark.parametrize('center, radius_km', [
+        ((32.08, 34.78), 15),     # Tel Aviv
+        ((32.08, 34.78), 120),
+        ((0.0, 179.95), 40),      # across the antimeridian
+        ((89.9, 10.0), 60),       # across the pole
+        ((-45.0, -70.0), 2500),   # more cells than occupied ones
+    ])
+    def test_matches_brute_force(self, center, radius_km):
+        """Test radius queries find exactly the jobs a full scan finds, closest first"""
+        rng = random.Random(7)
+        points = {}
+        for job_id in range(1, 1501):
+            latitude = max(-90.0, min(90.0, center[0] + rng.uniform(-3, 3)))
+            longitude = (center[1] + rng.uniform(-6, 6) + 180) % 360 - 180
+            points[job_id] = (latitude, longitude)
+            self.index.apply_change(job_change('insert', job_id, latitude, longitude))
+        expected = self.brute_force(points, *center, radius_km)
+        assert expected
+        nearby = self.index.nearby(*center, radius_km)
+        assert [job_id for job_id, _ in nearby] == [job_id for job_id, _ in expected]
+        assert [distance for _, distance in nearby] == pytest.approx([distance for _, distance in expected])
+
+    def test_visits_only_covering_cells(self):
+        """Test far away jobs are not even candidates"""
+        self.index.apply_change(job_change('insert', 1, 32.08, 34.78))
+        self.index.apply_change(job_change('insert', 2, 52.52, 13.40))
+        assert [row[0] for row in self.index.candidates(32.1, 34.8, 15)] == [1]
+
+    def test_moves_and_status_changes(self):
+        """Test moved, closed and deleted jobs are re-bucketed or removed"""
+        self.index.apply_change(job_change('insert', 1, 32.08, 34.78))
+        self.index.apply_change(job_change('insert', 2, 32.09, 34.79))
+        self.index.apply_change(job_change('update', 1, 52.52, 13.40))
+        assert [job_id for job_id, _ in self.index.nearby(32.08, 34.78, 10)] == [2]
+        assert [job_id for job_id, _ in self.index.nearby(52.52, 13.40, 10)] == [1]
+        self.index.apply_change(job_change('update', 2, 32.09, 34.79, status='closed'))
+        self.index.apply_change(job_change('delete', 1, 52.52, 13.40))
+        self.index.apply_change(job_change('insert', 3, None, None))
+        assert len(self.index) == 0
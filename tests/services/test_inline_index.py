@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot.inline import inline_results
+from services.search.inline_index import InlineJob, InlineJobIndex, inline_job
+
+JOBS = [
+    InlineJob(1, 'Python developer', 'Berlin', ('Python', 'Django'), False),
+    InlineJob(2, 'Java developer', 'Tel Aviv', ('Java', 'Spring'), False),
+    InlineJob(3, 'Data engineer', '', ('Python', 'Spark'), True),
+    InlineJob(4, 'Product designer', 'Berlin', ('Figma',), False),
+]
+
+
+def ids(jobs):
+    return [job.id for job in jobs]
+
+
+class TestInlineJobIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = InlineJobIndex()
+        self.index.bulk_load(JOBS)
+
+    def test_prefix_terms_match(self):
+        """Test each query term matches as a prefix of title, location or skill tokens"""
+        assert ids(self.index.search('pyth')) == [3, 1]
+        assert ids(self.index.search('p')) == [4, 3, 1]
+        assert ids(self.index.search('pyth berl')) == [1]
+        assert ids(self.index.search('REMOTE')) == [3]
+        assert ids(self.index.search('golang')) == []
+
+    def test_empty_query_lists_newest_jobs_in_pages(self):
+        """Test an empty query gives every job newest first, paged by offset"""
+        assert ids(self.index.search('')) == [4, 3, 2, 1]
+        assert ids(self.index.search('', limit=2, offset=1)) == [3, 2]
+        assert ids(self.index.search('developer', limit=5, offset=2)) == []
+
+    def test_incremental_changes(self):
+        """Test added, edited and removed jobs are reflected in cached searches"""
+        assert ids(self.index.search('spa')) == [3]
+        self.index.index_job(InlineJob(5, 'Spanish tutor', 'Madrid', (), False))
+        assert ids(self.index.search('spa')) == [5, 3]
+
+        self.index.index_job(InlineJob(3, 'Data engineer', '', ('Python', 'Scala'), True))
+        assert ids(self.index.search('spa')) == [5]
+        assert ids(self.index.search('sca')) == [3]
+
+        self.index.remove_job(5)
+        assert ids(self.index.search('spa')) == []
+        assert ids(self.index.search('')) == [4, 3, 2, 1]
+
+    def test_shared_prefix_is_kept(self):
+        """Test dropping one token keeps the job under prefixes its other tokens share"""
+        self.index.index_job(InlineJob(1, 'Python developer', 'Berlin', ('Django',), False))
+        assert ids(self.index.search('py')) == [3, 1]
+        self.index.index_job(InlineJob(1, 'Developer', 'Berlin', ('Django',), False))
+        assert ids(self.index.search('py')) == [3]
+
+    def test_ranked_terms_follow_changes(self, monkeypatch):
+        """Test the kept rankings of popular terms are dropped when their jobs change"""
+        monkeypatch.setattr('services.search.inline_index.RANKED_MIN_JOBS', 1)
+        index = InlineJobIndex()
+        index.bulk_load(JOBS)
+        assert ids(index.search('d')) == [4, 3, 2, 1]
+
+        index.remove_job(2)
+        index.index_job(InlineJob(6, 'Dev advocate', '', (), True))
+        assert ids(index.search('d')) == [6, 4, 3, 1]
+        assert ids(index.search('')) == [6, 4, 3, 1]
+
+    def test_committed_changes(self):
+        """Test committed job changes index active jobs and drop the others"""
+        values = {'id': 7, 'title': 'Go developer', 'location': 'Haifa', 'status': 'active',
+                  'required_skills': {'technical_skills': ['Go']}, 'is_remote': False}
+        self.index.apply_change(SimpleNamespace(op='insert', id=7, values=values))
+        assert ids(self.index.search('hai')) == [7]
+        assert self.index.search('go')[0].skills == ('Go',)
+
+        self.index.apply_change(SimpleNamespace(op='update', id=7, values={**values, 'status': 'closed'}))
+        assert ids(self.index.search('hai')) == []
+        self.index.apply_change(SimpleNamespace(op='delete', id=1, values={}))
+        assert ids(self.index.search('berlin')) == [4]
+
+
+class TestInlineResults:
+    def test_cards_are_escaped(self):
+        """Test results carry the job's card with Markdown escaped and an /apply hint"""
+        job = inline_job({'id': 9, 'title': 'C_dev *lead*', 'location': '', 'is_remote': True,
+                          'required_skills': ['C', 'Rust']})
+        [result] = inline_results([job])
+
+        assert result.id == '9' and result.title == 'C_dev *lead*'
+        assert result.description == 'Remote · C, Rust'
+        text = result.input_message_content.message_text
+        assert 'C\\_dev \\*lead\\*' in text and '/apply 9' in text
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.db_events import ModelChange
+from extensions import db
+from models import Employer, Job, JobAlert, JobSeeker
+from services.matching.job_alerts import JobAlertFanout, job_skills, matching_seekers
+
+TEL_AVIV = (32.0853, 34.7818)
+HAIFA = (32.7940, 34.9896)
+JERUSALEM = (31.7683, 35.2137)
+
+
+def seeker(seeker_id, location, skills=('Python',), **preferences):
+    latitude, longitude = location or (None, None)
+    return SimpleNamespace(id=seeker_id, telegram_user_id=str(1000 + seeker_id),
+                           latitude=latitude, longitude=longitude,
+                           skills={'technical_skills': list(skills)}, job_preferences=preferences)
+
+
+def job(**values):
+    row = {'id': 7, 'title': 'Backend developer', 'location': 'Tel Aviv', 'latitude': TEL_AVIV[0],
+           'longitude': TEL_AVIV[1], 'is_remote': False, 'job_type': 'full-time', 'salary_max': 30000,
+           'skill_ids': None, 'required_skills': ['python', 'SQL']}
+    row.update(values)
+    return row
+
+
+class TestMatchingSeekers:
+    def matched(self, job_row, seekers):
+        return [seeker_id for seeker_id, _ in matching_seekers(job_row, job_skills(job_row), seekers)]
+
+    def test_distance_and_skills(self):
+        """Test seekers match within their radius and with a shared skill"""
+        seekers = [seeker(1, TEL_AVIV), seeker(2, JERUSALEM), seeker(3, HAIFA, max_distance=100),
+                   seeker(4, TEL_AVIV, skills=['Java']), seeker(5, None)]
+        assert self.matched(job(), seekers) == [1, 3]
+
+    def test_preferences(self):
+        """Test remote-only, job type and salary preferences filter seekers"""
+        seekers = [seeker(1, TEL_AVIV, remote_only=True), seeker(2, TEL_AVIV, job_types=['contract']),
+                   seeker(3, TEL_AVIV, salary_min=40000), seeker(4, TEL_AVIV, job_types=['full-time'])]
+        assert self.matched(job(), seekers) == [4]
+
+    def test_remote_jobs_ignore_distance(self):
+        """Test remote jobs reach seekers anywhere, and unlocated office jobs nobody"""
+        seekers = [seeker(1, JERUSALEM, max_distance=5), seeker(2, None, remote_only=True)]
+        assert self.matched(job(is_remote=True), seekers) == [1, 2]
+        assert self.matched(job(latitude=None, longitude=None), seekers) == []
+
+
+class TestJobAlertFanout:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        with make_db_app(Employer, Job, JobSeeker, JobAlert).app_context():
+            db.session.execute(Employer.__table__.insert(),
+                               [{'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'}])
+            db.session.execute(Job.__table__.insert(), [{
+                'id': 7, 'employer_id': 1, 'title': 'Backend developer', 'description': 'APIs',
+                'location': 'Tel Aviv', 'latitude': TEL_AVIV[0], 'longitude': TEL_AVIV[1],
+                'status': Job.STATUS_ACTIVE, 'required_skills': ['Python'],
+            }])
+            db.session.execute(JobSeeker.__table__.insert(), [
+                {'id': i, 'telegram_user_id': str(1000 + i), 'skills': ['python'],
+                 'latitude': location[0], 'longitude': location[1], 'job_preferences': {}}
+                for i, location in enumerate([TEL_AVIV, JERUSALEM, TEL_AVIV, HAIFA, TEL_AVIV], 1)
+            ])
+            db.session.commit()
+            self.notified = []
+            self.fanout = JobAlertFanout(batch_size=2, notify=self.notified.append)
+            yield
+
+    def test_alerts_matching_seekers_once(self):
+        """Test matching seekers are notified in batches and never twice for a job"""
+        assert self.fanout.process(7) == 3
+        chats = [chat_id for batch in self.notified for chat_id, _ in batch]
+        assert chats == ['1001', '1003', '1005']
+        assert 'Backend developer' in self.notified[0][0][1] and '/apply 7' in self.notified[0][0][1]
+
+        db.session.execute(JobSeeker.__table__.insert(), [
+            {'id': 6, 'telegram_user_id': '1006', 'skills': ['Python'], 'latitude': TEL_AVIV[0],
+             'longitude': TEL_AVIV[1], 'job_preferences': {}}])
+        db.session.commit()
+        # Reactivated: only the seeker who registered since is alerted
+        assert self.fanout.process(7) == 1
+        assert self.notified[-1][0][0] == '1006'
+
+    def test_inactive_jobs_are_not_announced(self):
+        """Test jobs closed before the worker got to them alert nobody"""
+        db.session.execute(Job.__table__.update().values(status=Job.STATUS_CLOSED))
+        db.session.commit()
+        assert self.fanout.process(7) == 0 and self.notified == []
+
+    def test_jobs_going_active_are_queued_once(self):
+        """Test committed activations queue the job, other changes don't"""
+        self.fanout._on_job_change(ModelChange('insert', 7, {'status': Job.STATUS_ACTIVE}))
+        self.fanout._on_job_change(ModelChange('update', 7, {'status': Job.STATUS_ACTIVE}))
+        self.fanout._on_job_change(ModelChange('update', 8, {'status': Job.STATUS_CLOSED}))
+        self.fanout._on_job_change(ModelChange('delete', 9, {'status': Job.STATUS_ACTIVE}))
+        assert self.fanout._queue.qsize() == 1
+
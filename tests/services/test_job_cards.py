@@ -0,0 +1,96 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from bot.job_cards import (APPLY_PATTERN, INFO_PATTERN, JobCardCache, callback_job_id,
+                           job_card_keyboard, render_card)
+from extensions import db
+from models import Employer, Job
+
+
+def job_values(job_id, **values):
+    return {'id': job_id, 'employer_id': 1, 'title': f'Developer {job_id}', 'description': 'APIs',
+            'location': 'Tel Aviv', 'status': Job.STATUS_ACTIVE, 'revision': 1, **values}
+
+
+class TestJobCardCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        with make_db_app(Employer, Job).app_context():
+            db.session.execute(Employer.__table__.insert(), [
+                {'id': 1, 'email': 'jobs@acme.test', 'company_name': 'Acme'},
+                {'id': 2, 'email': 'jobs@globex.test', 'company_name': 'Globex'}])
+            db.session.execute(Job.__table__.insert(), [
+                job_values(1), job_values(2, employer_id=2), job_values(3),
+                job_values(4, status=Job.STATUS_CLOSED)])
+            db.session.commit()
+            self.queries = []
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda *args: self.queries.append(args[2]))
+            self.cache = JobCardCache(cache_size=2)
+            yield
+
+    def test_newest_active_jobs_are_warmed(self):
+        """Test the first use renders the newest active jobs in one query"""
+        self.cache.ensure_loaded()
+
+        assert len(self.queries) == 1
+        assert self.cache.get(1) is None
+        assert '_Globex_' in self.cache.get(2).summary
+        assert self.cache.get(3).details.endswith('/apply 3')
+
+    def test_missing_cards_are_rendered_in_one_query(self):
+        """Test missing cards are rendered together and cached ones need no query"""
+        self.cache.ensure_loaded()
+        self.queries.clear()
+
+        cards = self.cache.get_many([1, 3, 4])
+        assert sorted(cards) == [1, 3] and len(self.queries) == 1
+        assert self.cache.get_many([1, 3]).keys() == {1, 3} and len(self.queries) == 1
+        # The least recently used card was evicted
+        assert self.cache.get(2) is None
+
+    def test_committed_changes(self):
+        """Test job edits re-render cards at the new revision and other changes drop them"""
+        self.cache.ensure_loaded()
+
+        self.cache.apply_job_change(SimpleNamespace(
+            op='update', id=3, values=job_values(3, title='Lead developer', revision=2)))
+        card = self.cache.get(3)
+        assert card.revision == 2 and '*Lead developer*' in card.summary
+
+        self.cache.apply_job_change(SimpleNamespace(
+            op='update', id=3, values=job_values(3, status=Job.STATUS_CLOSED, revision=3)))
+        assert self.cache.get(3) is None
+
+        self.cache.apply_employer_change(SimpleNamespace(op='update', id=2, values={}))
+        assert self.cache.get(2) is None
+        # The employer is looked up again when its job is shown
+        self.cache.apply_job_change(SimpleNamespace(
+            op='update', id=2, values=job_values(2, employer_id=2, revision=2)))
+        assert self.cache.get(2) is None
+        assert self.cache.get_many([2])[2].revision == 1
+
+
+class TestJobCards:
+    def test_render_card(self):
+        """Test cards escape Markdown and list the details a job has"""
+        card = render_card(job_values(9, title='C_dev *lead*', description='x' * 300,
+                                      is_remote=True, location='', salary_min=100000,
+                                      required_skills={'technical_skills': ['C', 'Rust']}), 'A_B')
+
+        assert card.summary.startswith('🏢 *C\\_dev \\*lead\\**\n🏗 _A\\_B_\n📍 Remote\n')
+        assert card.summary.endswith('x' * 200 + '...')
+        assert '💰 from 100,000\n' in card.details and '🛠 C, Rust\n' in card.details
+        assert '💼' not in card.details and 'x' * 300 in card.details
+
+    def test_buttons(self):
+        """Test button callback data matches the handler patterns and gives the job id back"""
+        apply, info = job_card_keyboard(12).inline_keyboard[0]
+        assert re.match(APPLY_PATTERN, apply.callback_data)
+        assert re.match(INFO_PATTERN, info.callback_data)
+        assert callback_job_id(apply.callback_data) == callback_job_id(info.callback_data) == 12
+        assert callback_job_id('info_x') is None
+        assert len(job_card_keyboard(12, info=False).inline_keyboard[0]) == 1
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from services.cv_matcher import calculate_job_match
+from services.matching.features import extract_job_skills, job_skill_names, skill_content_hash
+
+
+class TestJobSkillFeatures:
+    def test_structured_skills_are_canonicalized(self):
+        """Test required skills win over the description and are normalized"""
+        skills = extract_job_skills(['Python', ' python ', 'Docker'], 'We use Java')
+        assert skills == ['docker', 'python']
+
+    def test_description_fallback(self):
+        """Test skills are extracted from the description without structured skills"""
+        assert extract_job_skills(None, 'Backend role: Python, SQL and Django') == [
+            'django', 'python', 'sql'
+        ]
+
+    def test_content_hash_tracks_skill_inputs(self):
+        """Test the hash changes only when the extraction input changes"""
+        base = skill_content_hash(['Python'], 'Backend role')
+        assert skill_content_hash(['Python'], 'Backend role') == base
+        assert skill_content_hash(['Python'], 'Frontend role') != base
+        assert skill_content_hash(['Python', 'SQL'], 'Backend role') != base
+
+    def test_match_time_reads_precomputed_skills(self):
+        """Test matching never parses the description"""
+        assert job_skill_names(['python'], ['Java']) == ['python']
+        assert job_skill_names(None, ['Java']) == ['Java']
+        assert job_skill_names(None, None) == []
+
+        job = SimpleNamespace(id=1, skill_ids=None, required_skills=None,
+                              description='Python and SQL', location=None)
+        seeker = SimpleNamespace(id=1, skills=['Python', 'SQL'], location=None)
+        assert calculate_job_match(seeker, job) == 0
+
+        job.skill_ids = extract_job_skills(job.required_skills, job.description)
+        assert calculate_job_match(seeker, job) == 100
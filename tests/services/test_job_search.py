@@ -0,0 +1,98 @@
+import pytest
+from core.db_events import ModelChange
+from services.search.job_text_index import JobTextIndex
+from services.search.text_analysis import analyze, stem
+
+
+def job_change(op, job_id, title, description='', status='active'):
+    return ModelChange(op, job_id, {
+        'id': job_id,
+        'title': title,
+        'description': description,
+        'status': status,
+    })
+
+
+class TestTextAnalysis:
+    def test_inflections_share_a_stem(self):
+        """Test plural and derived forms reduce to the same term"""
+        assert stem('engineers') == stem('engineer') == stem('engineering')
+        assert stem('developers') == stem('developer')
+        assert stem('class') == stem('classes')
+
+    def test_analyze_drops_stop_words_and_keeps_symbols(self):
+        """Test stop words are removed and tokens like c++ survive"""
+        assert analyze('The C++ and Node.js developer') == ['c++', 'node.js', 'develop']
+
+
+class TestJobTextIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.index = JobTextIndex(str(tmp_path / 'job_search.db'))
+        # Skip the database load, the index is populated through changes only
+        self.index._loaded = True
+        self.index.apply_change(job_change(
+            'insert', 1, 'Python Developer', 'Build APIs with Python and SQL.'))
+        self.index.apply_change(job_change(
+            'insert', 2, 'Data Engineer', 'Python pipelines, Spark and SQL engineering.'))
+        self.index.apply_change(job_change(
+            'insert', 3, 'Warehouse Manager', 'Manage a team of twelve.'))
+        yield
+        self.index.close()
+
+    def job_ids(self, query, **kwargs):
+        return [job_id for job_id, _ in self.index.search(query, **kwargs)]
+
+    def test_stemmed_query_matches(self):
+        """Test queries match other inflections of indexed words"""
+        assert self.job_ids('engineers') == [2]
+        assert self.job_ids('managing') == [3]
+        assert self.job_ids('rust') == []
+
+    def test_title_matches_rank_first(self):
+        """Test a term in the title outranks the same term in a description"""
+        assert self.job_ids('python') == [1, 2]
+        assert self.job_ids('sql engineer') == [2, 1]
+
+    def test_pagination(self):
+        """Test limit and offset page through the ranking"""
+        assert self.job_ids('python sql', limit=1) == [1]
+        assert self.job_ids('python sql', limit=1, offset=1) == [2]
+        assert self.job_ids('python sql', limit=1, offset=2) == []
+
+    def test_update_replaces_postings(self):
+        """Test an edited job is found by its new text only"""
+        self.index.apply_change(job_change('update', 3, 'Rust Developer', 'Systems work.'))
+        assert self.job_ids('warehouse') == []
+        assert self.job_ids('rust') == [3]
+        assert len(self.index) == 3
+
+    def test_inactive_and_deleted_jobs_are_removed(self):
+        """Test closing or deleting a job removes it and its document frequencies"""
+        self.index.apply_change(job_change('update', 1, 'Python Developer', status='closed'))
+        self.index.apply_change(job_change('delete', 3, 'Warehouse Manager'))
+        assert self.job_ids('python') == [2]
+        assert self.job_ids('warehouse') == []
+        assert len(self.index) == 1
+        df = dict(self.index.connection.execute('SELECT term, df FROM terms'))
+        assert df['python'] == 1 and 'warehous' not in df
+
+    def test_incremental_matches_bulk_load(self):
+        """Test incremental updates give the same scores as a rebuild"""
+        self.index.apply_change(job_change('delete', 2, 'Data Engineer'))
+        self.index.apply_change(job_change('insert', 4, 'SQL Analyst', 'Reports in SQL.'))
+        incremental = self.index.search('sql python analyst')
+
+        self.index.bulk_load([
+            (1, 'Python Developer', 'Build APIs with Python and SQL.'),
+            (3, 'Warehouse Manager', 'Manage a team of twelve.'),
+            (4, 'SQL Analyst', 'Reports in SQL.'),
+        ])
+        rebuilt = self.index.search('sql python analyst')
+        assert [job_id for job_id, _ in incremental] == [job_id for job_id, _ in rebuilt]
+        assert [score for _, score in incremental] == pytest.approx([score for _, score in rebuilt])
+
+    def test_excluded_jobs_keep_pages_full(self):
+        """Test excluded jobs are skipped without shortening the page"""
+        assert self.job_ids('python sql', limit=1, exclude={1}) == [2]
+        assert self.job_ids('python sql', limit=1, offset=1, exclude={1}) == []
@@ -0,0 +1,145 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from services.matching.engine import FeatureScorer, MatchEngine, SeekerProfile, SkillsScorer
+from services.matching.features import JobFeatureMatrix, job_attributes
+from services.matching.skill_vocabulary import SkillVocabulary
+
+SKILLS = ['Python', 'SQL', 'Docker', 'AWS', 'React', 'Go', 'Java', 'Excel']
+LOCATIONS = ['Tel Aviv', 'Haifa', 'Berlin', None]
+LEVELS = ['entry', 'mid', 'senior', None]
+
+
+class FailingScorer(FeatureScorer):
+    name = 'failing'
+
+    def score_batch(self, profile, features, vocabulary):
+        raise RuntimeError('boom')
+
+
+class TestMatchEngine:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        rng = random.Random(42)
+        self.jobs = [
+            SimpleNamespace(
+                id=job_id,
+                required_skills=rng.sample(SKILLS, rng.randint(0, 4)),
+                location=rng.choice(LOCATIONS),
+                experience_level=rng.choice(LEVELS),
+                salary_min=rng.choice([None, 8000, 15000]),
+                salary_max=None,
+                is_remote=rng.random() < 0.3,
+                description='',
+            )
+            for job_id in range(1, 201)
+        ]
+        self.vocabulary = SkillVocabulary()
+        self.engine = MatchEngine(vocabulary=self.vocabulary, cache=None)
+        self.features = JobFeatureMatrix.from_rows(
+            ((job.id, job.required_skills, job.location,
+              job_attributes(job.experience_level, job.salary_min, job.salary_max, job.is_remote))
+             for job in self.jobs),
+            vocabulary=self.vocabulary,
+        )
+        self.seeker = SimpleNamespace(
+            id=1, location='Tel Aviv',
+            skills={'technical_skills': ['Python', 'SQL', 'Docker'], 'total_years': 3},
+            job_preferences={'salary_min': 10000, 'remote_only': False},
+        )
+
+    def test_scalar_matches_batch(self):
+        """Test the scalar entry point agrees with the vectorized one"""
+        scores = self.engine.score_batch(self.seeker, self.features)
+        expected = [self.engine.score(self.seeker, job) for job in self.jobs]
+        assert scores.tolist() == pytest.approx(expected)
+
+    def test_weighted_components(self):
+        """Test applicable components are averaged by weight"""
+        candidate = {'technical_skills': ['Python', 'SQL'], 'total_years': 2}
+        requirements = {'required_skills': ['Python', 'SQL', 'Go', 'Rust'], 'required_years': 4}
+        # skills 0.5 * 0.6 + experience 0.5 * 0.4
+        assert self.engine.score(candidate, requirements) == 50.0
+
+        # Location, salary and remote do not apply, so only skills count
+        assert self.engine.score(candidate, {'required_skills': ['Python']}) == 100.0
+
+    def test_unknown_experience_does_not_apply(self):
+        """Test a seeker without experience data is scored on the other components only"""
+        candidate = {'technical_skills': ['Python', 'SQL']}
+        entry = {'required_skills': ['Python', 'SQL'], 'required_years': 0}
+        senior = {'required_skills': ['Python', 'SQL'], 'required_years': 8}
+        assert self.engine.score(candidate, entry) == self.engine.score(candidate, senior) == 100.0
+
+        no_experience = {'technical_skills': ['Python', 'SQL'], 'total_years': 0}
+        assert self.engine.score(no_experience, senior) == 60.0
+
+    def test_remote_and_salary_preferences(self):
+        """Test seeker preferences lower scores of jobs that miss them"""
+        profile = SeekerProfile(skills=['Python'], salary_min=10000, remote_only=True)
+        remote = {'required_skills': ['Python'], 'salary_max': 12000, 'is_remote': True}
+        onsite = {'required_skills': ['Python'], 'salary_max': 9000, 'is_remote': False}
+        assert self.engine.score(profile, remote) == 100.0
+        assert self.engine.score(profile, onsite) == 75.0
+
+    def test_skill_matching_is_case_insensitive(self):
+        """Test seeker and job skills are compared in canonical form"""
+        lower = self.engine.score_batch(SeekerProfile(skills=['python', 'sql']), self.features)
+        upper = self.engine.score_batch(SeekerProfile(skills=['PYTHON', 'Sql']), self.features)
+        assert lower.tolist() == upper.tolist()
+
+    def test_top_threshold_and_order(self):
+        """Test top-k selection applies the threshold and sorts by score"""
+        scores = self.engine.score_batch(self.seeker, self.features)
+        top = self.engine.top(self.seeker, self.features, k=5, threshold=75)
+
+        assert len(top) <= 5
+        assert all(score >= 75 for _, score in top)
+        best = sorted(scores[scores >= 75].tolist(), reverse=True)[:5]
+        assert [score for _, score in top] == best
+
+    def test_distance_preference(self):
+        """Test jobs beyond the seeker's maximum distance score lower"""
+        profile = SeekerProfile(skills=['Python'], latitude=32.08, longitude=34.78, max_distance_km=20)
+        near = {'required_skills': ['Python'], 'latitude': 32.10, 'longitude': 34.80}
+        far = {'required_skills': ['Python'], 'latitude': 31.77, 'longitude': 35.21}
+        unknown = {'required_skills': ['Python']}
+        # skills 0.6 + distance 0.1 over a total weight of 0.7
+        assert self.engine.score(profile, near) == 100.0
+        assert self.engine.score(profile, far) == round(0.6 / 0.7 * 100, 1)
+        assert self.engine.score(profile, unknown) == 100.0
+
+    def test_locations_compared_by_distance(self):
+        """Test gazetteer places match nearby cities and unknown places fall back to text"""
+        profile = SeekerProfile(skills=['Python'], location='Tel Aviv, Israel')
+        nearby = {'required_skills': ['Python'], 'location': 'Ramat Gan'}
+        far = {'required_skills': ['Python'], 'location': 'Jerusalem'}
+        stored = {'required_skills': ['Python'], 'location': 'Office', 'latitude': 32.07, 'longitude': 34.79}
+        # skills 0.6 + location 0.1 over a total weight of 0.7
+        assert self.engine.score(profile, nearby) == 100.0
+        assert self.engine.score(profile, far) == round(0.6 / 0.7 * 100, 1)
+        assert self.engine.score(profile, stored) == 100.0
+
+        unknown = SeekerProfile(skills=['Python'], location='Israel')
+        assert self.engine.score(unknown, {'required_skills': ['Python'], 'location': 'Haifa, Israel'}) == 100.0
+
+    def test_pluggable_scorers(self):
+        """Test custom scorer sets, and that failing scorers are left out"""
+        skills_only = MatchEngine([SkillsScorer(1.0)], vocabulary=self.vocabulary, cache=None)
+        with_failure = MatchEngine([SkillsScorer(1.0), FailingScorer(1.0)],
+                                   vocabulary=self.vocabulary, cache=None)
+        expected = skills_only.score_batch(self.seeker, self.features)
+        assert with_failure.score_batch(self.seeker, self.features).tolist() == expected.tolist()
+
+    def test_seeker_without_skills(self):
+        """Test a seeker without skills gets no results"""
+        seeker = SimpleNamespace(id=2, skills=[], location=None)
+        assert self.engine.top(seeker, self.features, k=5, threshold=1) == []
+
+    def test_empty_matrix(self):
+        """Test scoring an empty catalogue"""
+        features = JobFeatureMatrix.from_rows([], vocabulary=self.vocabulary)
+        assert self.engine.score_batch(self.seeker, features).size == 0
+        assert np.isnan(features.required_years).size == 0
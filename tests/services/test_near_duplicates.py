@@ -0,0 +1,77 @@
+import pytest
+from core.db_events import ModelChange
+from services.search.near_duplicates import (
+    NearDuplicateIndex, minhash_signature, signature_similarity
+)
+
+DESCRIPTION = (
+    "We are looking for a backend developer to build and maintain REST APIs in "
+    "Python and Django. You will design database schemas in PostgreSQL, write "
+    "automated tests, review code and work closely with the product team to ship "
+    "features every week. Experience with Docker and AWS is a plus."
+)
+REPOST = DESCRIPTION.replace("every week", "every two weeks")
+UNRELATED = (
+    "Warehouse shift lead wanted. Coordinate a team of twelve pickers, plan "
+    "daily deliveries, keep inventory records accurate and enforce safety rules "
+    "on the floor. Forklift license required, night shifts possible."
+)
+
+
+def job_change(op, job_id, description, status='active'):
+    return ModelChange(op, job_id, {
+        'id': job_id,
+        'status': status,
+        'description_minhash': minhash_signature(description),
+    })
+
+
+class TestMinHash:
+    def test_signature_is_deterministic(self):
+        """Test signatures are stable so stored ones stay comparable"""
+        assert minhash_signature(DESCRIPTION) == minhash_signature(DESCRIPTION)
+        assert minhash_signature('') is None
+
+    def test_similarity_estimates_jaccard(self):
+        """Test small edits keep high similarity and unrelated texts score low"""
+        assert signature_similarity(minhash_signature(DESCRIPTION), minhash_signature(REPOST)) >= 0.8
+        assert signature_similarity(minhash_signature(DESCRIPTION), minhash_signature(UNRELATED)) < 0.2
+
+
+class TestNearDuplicateIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = NearDuplicateIndex()
+        # Skip the database load, the index is populated through changes only
+        self.index._loaded = True
+        self.index.apply_change(job_change('insert', 1, DESCRIPTION))
+        self.index.apply_change(job_change('insert', 2, UNRELATED))
+        self.index.apply_change(job_change('insert', 3, REPOST))
+
+    def test_find_duplicates_of_new_posting(self):
+        """Test a new posting finds the active jobs it duplicates"""
+        matches = self.index.find_duplicates(minhash_signature(REPOST), exclude=3)
+        assert [job_id for job_id, _ in matches] == [1]
+        assert self.index.find_duplicates(minhash_signature("Rust compiler engineer")) == []
+
+    def test_older_duplicates_are_collapsed(self):
+        """Test the older of two duplicates is dropped and order is kept"""
+        assert self.index.superseded_ids() == {1}
+        assert self.index.collapse([3, 2, 1]) == [3, 2]
+        assert self.index.collapse([(1, 'a'), (2, 'b')], key=lambda row: row[0]) == [(2, 'b')]
+
+    def test_removing_newer_duplicate_restores_older(self):
+        """Test closing the repost makes the original canonical again"""
+        self.index.apply_change(job_change('update', 3, REPOST, status='closed'))
+        assert self.index.superseded_ids() == set()
+        assert len(self.index) == 2
+
+    def test_edit_away_from_duplicate(self):
+        """Test editing a repost into a different posting clears the pair"""
+        self.index.apply_change(job_change('update', 3, "Rust compiler engineer for embedded targets"))
+        assert self.index.superseded_ids() == set()
+
+    def test_duplicate_groups(self):
+        """Test the batch report groups transitive duplicates"""
+        self.index.apply_change(job_change('insert', 4, REPOST + " Apply today."))
+        assert self.index.duplicate_groups() == [[1, 3, 4]]
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+from services.matching.ranking import RankingCursor, rank_matches, top_k, top_matches
+
+
+class TestRanking:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        rng = random.Random(7)
+        # (id, bound, exact score) with score <= bound
+        self.items = []
+        for item_id in range(500):
+            bound = rng.uniform(0, 100)
+            self.items.append((item_id, bound, bound * rng.uniform(0.5, 1.0)))
+        self.expected = sorted(self.items, key=lambda item: -item[2])
+
+    def cursor(self, **kwargs):
+        return RankingCursor(self.items, score=lambda item: item[2],
+                             upper_bound=lambda item: item[1], **kwargs)
+
+    def test_top_k_matches_full_sort(self):
+        """Test bounded selection returns the same items as a full sort"""
+        top = top_k(self.items, 10, score=lambda item: item[2])
+        assert [item for item, _ in top] == self.expected[:10]
+
+    def test_early_termination(self):
+        """Test candidates whose bound cannot enter the top k are never scored"""
+        cursor = self.cursor()
+        page = cursor.next_page(10)
+        assert [item for item, _ in page] == self.expected[:10]
+        assert cursor.scored_count < len(self.items) / 2
+
+    def test_cursor_resumes(self):
+        """Test later pages continue the ranking without repeating items"""
+        cursor = self.cursor()
+        pages = [cursor.next_page(25) for _ in range(3)]
+        ranked = [item for page in pages for item, _ in page]
+        assert ranked == self.expected[:75]
+
+    def test_threshold_and_exhaustion(self):
+        """Test items below the threshold are dropped and the cursor ends"""
+        cursor = self.cursor(threshold=90)
+        ranked = list(cursor)
+        assert [item for item, _ in ranked] == [i for i in self.expected if i[2] >= 90]
+        assert not cursor.has_more
+
+    def test_ascending_with_lower_bounds(self):
+        """Test ascending rankings, e.g. by distance with a minimum distance bound"""
+        cursor = RankingCursor(self.items, score=lambda item: item[2],
+                               upper_bound=lambda item: item[2] * 0.5,
+                               threshold=20, descending=False)
+        expected = sorted((i for i in self.items if i[2] <= 20), key=lambda i: i[2])
+        assert [item for item, _ in cursor] == expected
+
+    def test_rank_matches_agrees_with_top_matches(self):
+        """Test the resumable cursor ranks vectorized scores like top_matches"""
+        rng = np.random.default_rng(3)
+        scores = np.round(rng.uniform(0, 100, 300), 0)
+        job_ids = np.arange(1000, 1300)
+
+        cursor = rank_matches(scores, job_ids, threshold=50)
+        ranked = cursor.next_page(10) + list(cursor)
+        assert ranked == top_matches(scores, job_ids, k=len(scores), threshold=50)
+
+    def test_tiebreak_gives_increasing_sort_keys(self):
+        """Test equal scores come out by tiebreak, also when bounds tie, with increasing keys"""
+        scores = {5: 10.0, 2: 30.0, 9: 30.0, 1: 30.0, 7: 20.0}
+        bounds = {5: 30.0, 2: 30.0, 9: 30.0, 1: 30.0, 7: 30.0}
+        cursor = RankingCursor(scores, score=scores.__getitem__, upper_bound=bounds.__getitem__,
+                               tiebreak=int)
+        ranked = list(cursor)
+        assert [job_id for job_id, _ in ranked] == [1, 2, 9, 7, 5]
+        keys = [cursor.sort_key(job_id, score) for job_id, score in ranked]
+        assert keys == sorted(keys) and keys[0] == (-30.0, 1)
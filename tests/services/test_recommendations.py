@@ -0,0 +1,128 @@
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+from core import db_events
+from core.db_events import ModelChange
+from extensions import db
+from models import JobSeeker
+from services.matching.engine import MatchEngine, job_feature_row_of
+from services.matching.features import JobFeatureMatrix
+from services.matching.recommendations import JOB, SEEKER, RecommendationBuilder, SeekerSkillIndex
+from services.matching.skill_index import SkillIndex
+from services.matching.skill_vocabulary import SkillVocabulary
+
+
+def seeker(seeker_id, skills, total_years=5):
+    return SimpleNamespace(id=seeker_id, skills={'technical_skills': skills, 'total_years': total_years},
+                           job_preferences={}, preferred_location=None)
+
+
+class TestSeekerSkillIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = SeekerSkillIndex(SkillVocabulary())
+        self.index.index_seeker(1, ['Python', 'SQL'])
+        self.index.index_seeker(2, {'technical_skills': ['Java'], 'total_years': 3})
+
+    def skill_ids(self, *skills):
+        return self.index.vocabulary.lookup_all(skills)
+
+    def test_seekers_with_any_skill(self):
+        """Test seekers are found by any of their skills"""
+        assert self.index.seekers_with_any(self.skill_ids('sql', 'Java')) == {1, 2}
+        assert self.index.seekers_with_any(self.skill_ids('Rust')) == set()
+
+    def test_reindex_and_remove(self):
+        """Test changed skills replace the old postings"""
+        self.index.index_seeker(1, ['Rust'])
+        assert self.index.seekers_with_any(self.skill_ids('Python')) == set()
+        self.index.remove_seeker(2)
+        assert self.index.seekers_with_any(self.skill_ids('Java')) == set()
+        assert len(self.index) == 1
+
+
+class TestRecommendationBuilder:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        vocabulary = SkillVocabulary()
+        jobs = SkillIndex(vocabulary)
+        jobs._loaded = True
+        self.builder = RecommendationBuilder(
+            engine=MatchEngine(vocabulary=vocabulary, cache=None), jobs=jobs, min_score=50
+        )
+        self.seekers = [seeker(1, ['Python', 'SQL']), seeker(2, ['Java']), seeker(3, ['SQL'], 0)]
+        for s in self.seekers:
+            self.builder.seekers.index_seeker(s.id, s.skills)
+        job = SimpleNamespace(id=10, required_skills=['Python', 'SQL'], location=None,
+                              experience_level='senior', salary_min=None, salary_max=None,
+                              is_remote=False, description='')
+        self.features = JobFeatureMatrix.from_rows([job_feature_row_of(job)], vocabulary=vocabulary)
+
+    def test_job_change_affects_seekers_sharing_a_skill(self):
+        """Test only seekers sharing a skill or already recommended the job are rescored"""
+        assert self.builder.affected_seekers(self.features, set()) == {1, 3}
+        assert self.builder.affected_seekers(self.features, {2}) == {1, 2, 3}
+
+    def test_score_job_splits_stored_and_dropped(self):
+        """Test seekers below the threshold lose the recommendation"""
+        stored, dropped = self.builder.score_job_for(self.features, self.seekers)
+        assert stored == {1: 100.0}
+        assert dropped == {2, 3}
+
+    def test_requests_are_deduplicated(self):
+        """Test repeated changes to the same entity queue one rescore"""
+        self.builder.request(JOB, 10)
+        self.builder.request(JOB, 10)
+        self.builder.request(SEEKER, 10)
+        assert self.builder._queue.qsize() == 2
+
+    def test_seeker_change_updates_index_and_queues(self):
+        """Test a committed seeker change is indexed and queued"""
+        self.builder._on_seeker_change(ModelChange('update', 2, {'skills': ['Python']}))
+        assert self.builder.affected_seekers(self.features, set()) == {1, 2, 3}
+        self.builder._on_seeker_change(ModelChange('delete', 1, {'skills': ['Python']}))
+        assert self.builder.affected_seekers(self.features, set()) == {2, 3}
+        assert self.builder._queue.qsize() == 2
+
+    def test_location_changes_are_rescored(self, monkeypatch):
+        """Test a seeker sharing a new location is rescored, as the distance score uses it"""
+        monkeypatch.setattr(db_events, '_listeners', {})
+        monkeypatch.setattr(self.builder, '_listening', False)
+        self.builder.listen()
+        session = SimpleNamespace(info={})
+        db_events.publish(session, JobSeeker, ModelChange('update', 2, {'skills': ['Java']}),
+                          changed=('latitude', 'longitude'))
+        db_events._deliver_pending(session)
+        assert self.builder._queue.get_nowait() == (SEEKER, 2)
+
+    def test_stop_processes_queued_requests(self, monkeypatch):
+        """Test stopping the builder lets the worker finish the queued requests first"""
+        processed = []
+        monkeypatch.setattr(self.builder, 'process', lambda *task: processed.append(task))
+        self.builder._app = Flask(__name__)
+        self.builder.request(JOB, 10)
+        self.builder.request(SEEKER, 2)
+        self.builder._thread = threading.Thread(target=self.builder._run)
+        self.builder._thread.start()
+
+        self.builder.stop()
+        assert not self.builder.is_running
+        assert processed == [(JOB, 10), (SEEKER, 2)]
+
+
+class TestComputedAt:
+    def test_computed_at_keeps_updated_at(self, make_db_app):
+        """Test recording a refresh leaves the seeker's updated_at, and so its cached scores, alone"""
+        updated_at = datetime(2024, 1, 1)
+        computed_at = datetime(2024, 6, 1)
+        table = JobSeeker.__table__
+        with make_db_app(JobSeeker).app_context():
+            db.session.execute(table.insert().values(id=1, telegram_user_id='1001', updated_at=updated_at))
+            RecommendationBuilder()._mark_computed(1, computed_at)
+            db.session.commit()
+
+            row = db.session.execute(table.select()).mappings().one()
+            assert (row['updated_at'], row['recommendations_computed_at']) == (updated_at, computed_at)
@@ -0,0 +1,179 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from bot.resume_pipeline import (COMPLETE_TEXT, FAILED_TEXT, STAGES, ResumeJob,
+                                 ResumePipeline, progress_text)
+from bot.runtime import BotRuntime
+from core import db_events
+from extensions import db
+from models import JobSeeker, ResumeIngestion
+
+
+class FakeBot:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message_text(self, text, chat_id, message_id):
+        self.edits.append((chat_id, message_id, text))
+
+
+class FakeStagesPipeline(ResumePipeline):
+    """Pipeline whose stages record their calls instead of touching files or the AI"""
+
+    def __init__(self, *args, fail_at=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_at = fail_at
+        self.calls = []
+
+    async def _stage(self, name, job):
+        self.calls.append((name, job.user_id))
+        await asyncio.sleep(0.01)
+        if name == self.fail_at:
+            raise RuntimeError(f'{name} broke')
+
+    async def _download(self, job):
+        await self._stage('download', job)
+        job.resume_path = f'{job.user_id}/resume.pdf'
+
+    async def _text(self, job):
+        await self._stage('text', job)
+
+    async def _ocr(self, job):
+        await self._stage('ocr', job)
+
+    async def _skills(self, job):
+        await self._stage('skills', job)
+        job.skills = {'extracted_skills': ['python']}
+
+    async def _save(self, job):
+        await self._stage('save', job)
+
+
+class RealSavePipeline(FakeStagesPipeline):
+    """Pipeline with fake extraction stages that saves profiles for real"""
+    _save = ResumePipeline._save
+
+
+class TestResumePipeline:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_db_app):
+        self.app = make_db_app(ResumeIngestion, JobSeeker)
+        self.runtime = BotRuntime(db_workers=2)
+        asyncio.run(self.runtime.start(self.app))
+        self.bot = FakeBot()
+        yield
+        self.runtime.shutdown()
+
+    def ingestions(self):
+        with self.app.app_context():
+            table = ResumeIngestion.__table__
+            return db.session.execute(table.select().order_by(table.c.id)).mappings().all()
+
+    def seekers(self):
+        with self.app.app_context():
+            table = JobSeeker.__table__
+            return db.session.execute(table.select().order_by(table.c.id)).mappings().all()
+
+    def run(self, pipeline, user_ids, profile=None):
+        async def upload():
+            pipeline.start(self.bot)
+            loop = asyncio.get_running_loop()
+            for user_id in user_ids:
+                progress = loop.create_future()
+                progress.set_result(SimpleNamespace(chat_id=user_id, message_id=100 + user_id))
+                assert pipeline.submit(ResumeJob(user_id=user_id, chat_id=user_id, file_id='file',
+                                                 profile=dict(profile or {'full_name': 'Dana'}),
+                                                 progress=progress))
+            await asyncio.wait_for(pipeline.join(), 5)
+            await pipeline.stop()
+        asyncio.run(upload())
+
+    def test_stages_run_in_order_with_progress(self):
+        """Test each stage runs in order, the progress message follows and timings are stored"""
+        pipeline = FakeStagesPipeline(self.runtime, workers=1)
+        self.run(pipeline, [1])
+
+        assert [name for name, _ in pipeline.calls] == [stage for stage, _ in STAGES]
+        assert [text for _, _, text in self.bot.edits] == (
+            [progress_text(done) for done in range(1, len(STAGES))] + [COMPLETE_TEXT])
+        assert {(chat_id, message_id) for chat_id, message_id, _ in self.bot.edits} == {(1, 101)}
+
+        [ingestion] = self.ingestions()
+        assert ingestion['status'] == ResumeIngestion.STATUS_DONE
+        assert ingestion['resume_path'] == '1/resume.pdf'
+        assert set(ingestion['stage_timings']) == {'queued'} | {stage for stage, _ in STAGES}
+        assert ingestion['stage_timings']['text'] >= 0.01
+
+    def test_failed_stage_stops_the_resume(self):
+        """Test a failing stage ends the resume, tells the user and records where it failed"""
+        pipeline = FakeStagesPipeline(self.runtime, workers=1, fail_at='ocr')
+        self.run(pipeline, [1])
+
+        assert [name for name, _ in pipeline.calls] == ['download', 'text', 'ocr']
+        assert self.bot.edits[-1][2] == progress_text(2, failed=True)
+        assert FAILED_TEXT in self.bot.edits[-1][2]
+        [ingestion] = self.ingestions()
+        assert ingestion['status'] == ResumeIngestion.STATUS_FAILED
+        assert ingestion['failed_stage'] == 'ocr' and ingestion['error'] == 'ocr broke'
+        assert set(ingestion['stage_timings']) == {'queued', 'download', 'text', 'ocr'}
+
+    def test_workers_process_resumes_concurrently(self):
+        """Test several workers interleave resumes and every one is recorded"""
+        pipeline = FakeStagesPipeline(self.runtime, workers=3)
+        self.run(pipeline, [1, 2, 3])
+
+        assert [user_id for _, user_id in pipeline.calls[:3]] == [1, 2, 3]
+        assert sorted(row['telegram_user_id'] for row in self.ingestions()) == ['1', '2', '3']
+
+    def test_full_queue_refuses_uploads(self):
+        """Test uploads beyond the queue size are refused instead of queued"""
+        async def upload():
+            pipeline = FakeStagesPipeline(self.runtime, workers=1, queue_size=1)
+            pipeline.start(self.bot)
+            job = ResumeJob(user_id=1, chat_id=1, file_id='file', profile={})
+            accepted = [pipeline.submit(job), pipeline.submit(job)]
+            full = pipeline.is_full
+            await pipeline.stop()
+            return accepted, full
+
+        assert asyncio.run(upload()) == ([True, False], True)
+
+    def test_cpu_stages_run_in_worker_processes(self):
+        """Test CPU-bound work runs in another process, not on the bot's"""
+        async def run():
+            pipeline = ResumePipeline(self.runtime, processes=1)
+            try:
+                return await pipeline._run_cpu(os.getpid)
+            finally:
+                await pipeline.stop()
+
+        assert asyncio.run(run()) != os.getpid()
+
+    def test_profile_is_saved(self, monkeypatch):
+        """Test the save stage creates the job seeker, then updates it on a new upload"""
+        changes = []
+        monkeypatch.setattr(db_events, '_listeners', {})
+        db_events.on_commit(JobSeeker, changes.append)
+        db_events.on_commit(JobSeeker, changes.append, watch=('preferred_location',))
+        profile = {'full_name': 'Dana Levi', 'phone_number': '+972500000000',
+                   'latitude': 32.08, 'longitude': 34.78}
+        self.run(RealSavePipeline(self.runtime, workers=1), [1], profile)
+
+        [seeker] = self.seekers()
+        assert (seeker['telegram_user_id'], seeker['first_name'], seeker['last_name']) == ('1', 'Dana', 'Levi')
+        assert seeker['phone'] == '+972500000000' and seeker['latitude'] == 32.08
+        assert seeker['skills'] == {'extracted_skills': ['python']}
+        assert seeker['resume_path'] == '1/resume.pdf'
+        assert seeker['job_preferences'] == JobSeeker.default_job_preferences()
+        assert JobSeeker.default_job_preferences()['job_types'] is not JobSeeker.default_job_preferences()['job_types']
+        assert self.bot.edits[-1][2] == COMPLETE_TEXT
+
+        self.run(RealSavePipeline(self.runtime, workers=1), [1], {**profile, 'full_name': 'Dana'})
+        [seeker] = self.seekers()
+        assert (seeker['first_name'], seeker['last_name']) == ('Dana', None)
+        # Listeners heard of both saves; the update set no preferred_location
+        assert [(change.op, change.id) for change in changes] == [('insert', 1), ('insert', 1), ('update', 1)]
+        assert changes[-1].values['first_name'] == 'Dana'
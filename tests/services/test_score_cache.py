@@ -0,0 +1,69 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from core.db_events import ModelChange
+from services.matching.score_cache import MatchScoreCache
+
+
+class TestMatchScoreCache:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.cache = MatchScoreCache(max_entries=3)
+        # Skip registering database listeners, changes are applied directly
+        self.cache._listening = True
+        self.seeker = SimpleNamespace(id=1, updated_at=datetime(2026, 1, 1))
+        self.jobs = [SimpleNamespace(id=job_id, revision=1) for job_id in range(1, 5)]
+        self.calls = []
+
+    def compute(self, job_seeker, job):
+        self.calls.append(job.id)
+        return float(job.id * 10 + job.revision)
+
+    def score(self, job):
+        return self.cache.get_or_compute(self.seeker, job, self.compute)
+
+    def test_hits_and_misses(self):
+        """Test repeated lookups are served from the cache"""
+        assert self.score(self.jobs[0]) == 11.0
+        assert self.score(self.jobs[0]) == 11.0
+        assert self.calls == [1]
+        assert self.cache.stats['hits'] == 1
+        assert self.cache.stats['misses'] == 1
+
+    def test_revisions_are_part_of_the_key(self):
+        """Test edited jobs and seekers are rescored"""
+        self.score(self.jobs[0])
+        self.jobs[0].revision = 2
+        assert self.score(self.jobs[0]) == 12.0
+        self.seeker.updated_at = datetime(2026, 1, 2)
+        self.score(self.jobs[0])
+        assert self.calls == [1, 1, 1]
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full"""
+        for job in self.jobs[:3]:
+            self.score(job)
+        self.score(self.jobs[0])
+        self.score(self.jobs[3])
+
+        assert len(self.cache) == 3
+        self.score(self.jobs[0])
+        self.score(self.jobs[1])
+        assert self.calls == [1, 2, 3, 4, 2]
+
+    def test_change_events_evict_entries(self):
+        """Test committed updates and deletes drop the entries of that row"""
+        self.score(self.jobs[0])
+        self.score(self.jobs[1])
+
+        self.cache._on_job_change(ModelChange('update', 1, {'id': 1}))
+        assert len(self.cache) == 1
+        self.cache._on_seeker_change(ModelChange('delete', 1, {'id': 1}))
+        assert len(self.cache) == 0
+
+    def test_uncacheable_objects_are_computed(self):
+        """Test objects without revisions bypass the cache"""
+        job = SimpleNamespace(id=9)
+        assert self.cache.get_or_compute(self.seeker, job, lambda s, j: 5.0) == 5.0
+        assert len(self.cache) == 0
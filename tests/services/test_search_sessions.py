@@ -0,0 +1,72 @@
+import pytest
+from services.matching.ranking import RankingCursor
+from services.search import search_sessions as sessions_module
+from services.search.search_sessions import SearchSessionStore
+
+
+class TestSearchSessions:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr(sessions_module.time, 'monotonic', lambda: self.now)
+        self.store = SearchSessionStore(ttl=60, max_sessions=2)
+        # Two jobs at the same distance are ordered by id
+        self.distances = {7: 0.5, 3: 2.0, 9: 1.2, 1: 2.0, 2: 3.4}
+
+    @property
+    def results(self):
+        """A fresh ranking of the jobs by distance"""
+        return RankingCursor(self.distances, score=self.distances.__getitem__,
+                             descending=False, tiebreak=int)
+
+    def test_keyset_pages(self):
+        """Test pages follow the (distance, job_id) key of the previous page"""
+        session = self.store.start(42, self.results, 15)
+        assert len(session) == 5
+        page, has_more = session.page_after(None, 2)
+        assert page == [(0.5, 7), (1.2, 9)] and has_more
+        # Only as far as the page and the one after it was ranked
+        assert len(session.ranking) == 2
+        page, has_more = session.page_after(page[-1], 2)
+        assert page == [(2.0, 1), (2.0, 3)] and has_more
+        page, has_more = session.page_after(page[-1], 2)
+        assert page == [(3.4, 2)] and not has_more
+
+    def test_descending_scores(self):
+        """Test rankings by score page by their negated score, best first"""
+        scores = {4: 80.0, 5: 95.0, 6: 80.0}
+        session = self.store.start(42, RankingCursor(scores, score=scores.__getitem__, tiebreak=int))
+        page, has_more = session.page_after(None, 2)
+        assert page == [(-95.0, 5), (-80.0, 4)] and has_more
+        assert session.page_after(page[-1], 2) == ([(-80.0, 6)], False)
+
+    def test_repeated_key_repeats_page(self):
+        """Test pressing the same button twice shows the same page"""
+        session = self.store.start(42, self.results, 15)
+        assert session.page_after((1.2, 9), 2) == session.page_after((1.2, 9), 2)
+
+    def test_expiry_slides_with_use(self):
+        """Test sessions expire after the TTL unless paged"""
+        session = self.store.start(42, self.results, 15)
+        self.now += 50
+        assert self.store.get(42) is session
+        self.now += 50
+        assert self.store.get(42) is session
+        self.now += 61
+        assert self.store.get(42) is None
+
+    def test_new_search_invalidates_old_token(self):
+        """Test buttons of a replaced session no longer page"""
+        old = self.store.start(42, self.results, 15)
+        new = self.store.start(42, self.results, 25)
+        assert self.store.get(42, old.token) is None
+        assert self.store.get(42, new.token) is new
+
+    def test_least_recently_used_sessions_are_dropped(self):
+        """Test the store keeps at most max_sessions sessions"""
+        self.store.start(1, self.results, 15)
+        self.store.start(2, self.results, 15)
+        self.store.get(1)
+        self.store.start(3, self.results, 15)
+        assert len(self.store) == 2
+        assert self.store.get(2) is None and self.store.get(1) is not None
@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+from bot.job_cards import render_card
+from bot.send_queue import (INTERACTIVE, MAX_MESSAGE_LENGTH, NOTIFICATION,
+                            SendQueue, TokenBucket, markdown_balanced)
+
+
+class FakeBot:
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+
+    async def send_message(self, chat_id, text, reply_markup=None, **options):
+        await asyncio.sleep(0)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text, reply_markup, options))
+        return len(self.sent)
+
+
+class TestSendQueue:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.bot = FakeBot()
+
+    def run(self, queue, messages, bot=None):
+        """Queue ``messages`` before the dispatcher starts, then send them all"""
+        async def send():
+            futures = [queue.enqueue(*args, **kwargs) for args, kwargs in messages]
+            queue.start(bot or self.bot)
+            await asyncio.wait_for(queue.join(), 5)
+            await queue.stop()
+            return await asyncio.gather(*futures, return_exceptions=True)
+        return asyncio.run(send())
+
+    def test_token_bucket(self):
+        """Test a bucket allows its burst, then refills at its rate"""
+        bucket = TokenBucket(rate=2.0, capacity=2, now=0.0)
+        bucket.take(0.0)
+        bucket.take(0.0)
+        assert bucket.delay(0.0) == pytest.approx(0.5)
+        assert bucket.delay(0.25) == pytest.approx(0.25)
+        assert bucket.delay(0.5) == 0.0
+        assert not bucket.is_full(0.5) and bucket.is_full(1.0)
+
+    def test_messages_to_a_chat_are_coalesced(self):
+        """Test queued messages to one chat go out as one message, in order"""
+        results = self.run(SendQueue(), [((1, f'job {i}'), {'parse_mode': 'Markdown'})
+                                         for i in range(5)])
+        assert self.bot.sent == [(1, 'job 0\n\njob 1\n\njob 2\n\njob 3\n\njob 4',
+                                  None, {'parse_mode': 'Markdown'})]
+        assert results == [1] * 5
+
+    def test_coalescing_limits(self):
+        """Test messages are not joined past the length limit, across options or after a keyboard"""
+        long_text = 'x' * (MAX_MESSAGE_LENGTH - 10)
+        self.run(SendQueue(chat_burst=10), [
+            ((1, long_text), {}),
+            ((1, 'too long to join'), {}),
+            ((1, 'html'), {'parse_mode': 'HTML'}),
+            ((1, 'markdown'), {'parse_mode': 'Markdown'}),
+            ((1, 'with keyboard'), {'parse_mode': 'Markdown', 'reply_markup': 'keyboard'}),
+            ((1, 'after keyboard'), {'parse_mode': 'Markdown'}),
+        ])
+        assert [text for _, text, _, _ in self.bot.sent] == [
+            long_text, 'too long to join', 'html', 'markdown\n\nwith keyboard', 'after keyboard']
+        assert self.bot.sent[3][2] == 'keyboard'
+
+    def test_markdown_cards_are_coalesced(self):
+        """Test Markdown job cards join into one Markdown message, with plain text escaped"""
+        cards = [render_card({'id': job_id, 'title': f'C_dev *{job_id}*', 'description': 'APIs',
+                              'location': 'Tel Aviv'}, 'A_B').summary for job_id in (1, 2)]
+        self.run(SendQueue(), [
+            ((1, 'Jobs for snake_case fans:'), {}),
+            ((1, cards[0]), {'parse_mode': 'Markdown'}),
+            ((1, cards[1]), {'parse_mode': 'Markdown'}),
+        ])
+        assert self.bot.sent == [(1, '\n\n'.join(['Jobs for snake\\_case fans:', *cards]),
+                                  None, {'parse_mode': 'Markdown'})]
+
+    def test_unbalanced_markdown_is_sent_alone(self):
+        """Test a Markdown text leaving an entity open is not joined with its neighbours"""
+        assert markdown_balanced('*bold* `a*b` \\_ [link](http://x.test/a_b)')
+        assert not markdown_balanced('*bold')
+        self.run(SendQueue(), [
+            ((1, 'first'), {'parse_mode': 'Markdown'}),
+            ((1, 'snake_case'), {'parse_mode': 'Markdown'}),
+            ((1, 'last'), {'parse_mode': 'Markdown'}),
+        ])
+        assert [text for _, text, _, _ in self.bot.sent] == ['first', 'snake_case', 'last']
+
+    def test_messages_to_edit_are_sent_alone(self):
+        """Test a message queued with coalesce=False gets its own message, which is safe to edit"""
+        results = self.run(SendQueue(), [
+            ((1, 'before'), {}),
+            ((1, 'progress'), {'coalesce': False}),
+            ((1, 'after'), {}),
+            ((1, 'later'), {}),
+        ])
+        assert [text for _, text, _, _ in self.bot.sent] == ['before', 'progress', 'after\n\nlater']
+        assert self.bot.sent[1][3] == {}
+        assert results[1] == 2
+
+    def test_interactive_replies_go_first(self):
+        """Test replies overtake notifications queued earlier, and chats keep FIFO order"""
+        queue = SendQueue(global_rate=100, global_burst=1, max_in_flight=1)
+        messages = [((chat_id, 'alert'), {'priority': NOTIFICATION}) for chat_id in (1, 2, 3)]
+        messages += [((4, 'reply'), {'priority': INTERACTIVE}),
+                     ((2, 'reply'), {'priority': INTERACTIVE})]
+        self.run(queue, messages)
+        assert [(chat_id, text) for chat_id, text, _, _ in self.bot.sent] == [
+            (4, 'reply'), (2, 'reply'), (1, 'alert'), (2, 'alert'), (3, 'alert')]
+
+    def test_chat_rate_limit(self):
+        """Test a chat's messages are spaced by its bucket once its burst is spent"""
+        queue = SendQueue(chat_rate=20, chat_burst=1)
+        times = []
+
+        class TimedBot(FakeBot):
+            async def send_message(self, chat_id, text, **kwargs):
+                times.append(queue.clock())
+                # Sent one by one: the next message is only queued after this one
+                if len(times) < 3:
+                    queue.enqueue(chat_id, 'next')
+                return await super().send_message(chat_id, text, **kwargs)
+
+        self.run(queue, [((1, 'first'), {})], bot=TimedBot())
+        assert len(times) == 3
+        assert times[2] - times[0] >= 2 / 20 * 0.9
+
+    def test_retry_after(self):
+        """Test flood control answers are retried and other errors fail the future"""
+        bot = FakeBot(failures=[RetryAfter(0), BadRequest('chat not found')])
+        results = self.run(SendQueue(max_retries=3), [((1, 'hello'), {}), ((2, 'hi'), {})], bot)
+        assert len(bot.sent) == 1
+        assert isinstance(results[0], BadRequest) or isinstance(results[1], BadRequest)
+
+    def test_retries_give_up(self):
+        """Test a message is dropped after its retries are spent"""
+        bot = FakeBot(failures=[RetryAfter(0)] * 2)
+        results = self.run(SendQueue(max_retries=2), [((1, 'hello'), {})], bot)
+        assert bot.sent == [] and isinstance(results[0], RetryAfter)
+
+    def test_enqueue_from_thread_applies_backpressure(self):
+        """Test a producer thread is held back to the backlog size and everything is sent"""
+        queue = SendQueue(global_rate=1000, global_burst=1000, chat_rate=1000, max_backlog=5)
+        backlog = []
+
+        async def run():
+            queue.start(self.bot)
+            loop = asyncio.get_running_loop()
+
+            def produce():
+                for start in range(0, 50, 10):
+                    queue.enqueue_from_thread([(chat_id, 'alert') for chat_id in range(start, start + 10)])
+                    backlog.append(len(queue))
+
+            await loop.run_in_executor(None, produce)
+            await asyncio.wait_for(queue.join(), 5)
+            await queue.stop()
+
+        asyncio.run(run())
+        assert sorted(chat_id for chat_id, _, _, _ in self.bot.sent) == list(range(50))
+        assert max(backlog) <= 5
+
+    def test_unknown_lane(self):
+        """Test enqueueing on an unknown priority lane fails"""
+        async def enqueue():
+            SendQueue().enqueue(1, 'hello', priority=5)
+
+        with pytest.raises(ValueError):
+            asyncio.run(enqueue())
@@ -0,0 +1,53 @@
+import pytest
+from core.db_events import ModelChange
+from services.matching.skill_index import SkillIndex
+from services.matching.skill_vocabulary import SkillVocabulary
+
+
+def job_change(op, job_id, status='active', skills=None, location='Haifa'):
+    return ModelChange(op, job_id, {
+        'id': job_id,
+        'status': status,
+        'required_skills': skills,
+        'skill_ids': None,
+        'location': location,
+    })
+
+
+class TestSkillIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = SkillIndex(SkillVocabulary())
+        # Skip the database load, the index is populated through changes only
+        self.index._loaded = True
+        self.index.apply_change(job_change('insert', 1, skills=['Python', 'SQL']))
+        self.index.apply_change(job_change('insert', 2, skills=['Java']))
+        self.index.apply_change(job_change('insert', 3, skills=['sql', 'Excel']))
+
+    def candidate_ids(self, skills):
+        return self.index.candidate_features(skills).job_ids.tolist()
+
+    def test_candidates_share_a_skill(self):
+        """Test only jobs sharing at least one skill are returned"""
+        assert self.candidate_ids(['SQL']) == [1, 3]
+        assert self.candidate_ids(['Java', 'Excel']) == [2, 3]
+        assert self.candidate_ids(['Rust']) == []
+
+    def test_update_replaces_postings(self):
+        """Test changed skills move the job between posting lists"""
+        self.index.apply_change(job_change('update', 1, skills=['Rust']))
+        assert self.candidate_ids(['Python']) == []
+        assert self.candidate_ids(['Rust']) == [1]
+
+    def test_inactive_and_deleted_jobs_are_removed(self):
+        """Test closing or deleting a job removes it from the index"""
+        self.index.apply_change(job_change('update', 1, status='closed', skills=['Python', 'SQL']))
+        self.index.apply_change(job_change('delete', 3, skills=['sql', 'Excel']))
+        assert self.candidate_ids(['SQL']) == []
+        assert len(self.index) == 1
+
+    def test_candidate_features_keep_job_data(self):
+        """Test candidate features carry skills and locations of the jobs"""
+        features = self.index.candidate_features(['Python'])
+        assert features.skill_counts.tolist() == [2]
+        assert features.locations == ['haifa']
@@ -0,0 +1,66 @@
+import json
+import os
+import pytest
+from services.matching.skill_matcher import SkillMatcher, tokenize
+
+
+class TestSkillMatcher:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.skills_file = tmp_path / 'skills.json'
+        self.skills_file.write_text(json.dumps({
+            'languages': ['Python', 'Java', 'C++', 'C#', 'Node.js', '.NET', 'ASP.NET', 'Swift', 'REST'],
+            'data': ['Machine Learning', 'SQL'],
+        }))
+        self.matcher = SkillMatcher(self.skills_file, check_interval=0)
+
+    def test_tokenize_keeps_skill_punctuation(self):
+        """Test tokens keep symbols that are part of skill names"""
+        assert tokenize('C++, C# and Node.js.') == ['c++', 'c#', 'and', 'node.js']
+        assert tokenize('.NET, ASP.NET and net...net') == ['.net', 'asp.net', 'and', 'net', 'net']
+
+    def test_extract_single_and_multi_word_skills(self):
+        """Test skills are found in one pass, including multi-word ones"""
+        text = 'We need Python and SQL experience with machine learning.'
+        assert self.matcher.extract(text) == {'Python', 'SQL', 'Machine Learning'}
+
+    def test_word_boundaries(self):
+        """Test skills are not matched inside longer words"""
+        assert self.matcher.extract('Senior JavaScript developer') == set()
+        assert self.matcher.extract('Java/C++ backend') == {'Java', 'C++'}
+
+    def test_dotted_and_common_word_skills(self):
+        """Test ".NET" keeps its dot and everyday words only match when written as names"""
+        assert self.matcher.extract('C# and .NET or ASP.NET') == {'C#', '.NET', 'ASP.NET'}
+        assert self.matcher.extract('Swift, REST APIs and Python') == {'Swift', 'REST', 'Python'}
+        text = 'The rest of the net profit went to a swift refit of the old ships.'
+        assert self.matcher.extract(text) == set()
+
+    def test_sentence_start_is_not_a_name(self):
+        """Test everyday words capitalized only by starting a sentence are not skills"""
+        assert self.matcher.extract('Swift delivery is our promise.') == set()
+        assert self.matcher.extract('We ship fast. Swift delivery, always!') == set()
+        assert self.matcher.extract('We use Swift, REST and Python') == {'Swift', 'REST', 'Python'}
+        assert self.matcher.extract('REST APIs. Swift\nPython') == {'REST', 'Swift', 'Python'}
+
+    def test_empty_text(self):
+        """Test empty descriptions return no skills"""
+        assert self.matcher.extract('') == set()
+        assert self.matcher.extract(None) == set()
+
+    def test_hot_reload(self):
+        """Test dictionary changes are picked up without a restart"""
+        assert self.matcher.extract('Python and Rust') == {'Python'}
+
+        self.skills_file.write_text(json.dumps({'languages': ['Rust']}))
+        stat = os.stat(self.skills_file)
+        os.utime(self.skills_file, (stat.st_atime, stat.st_mtime + 10))
+
+        assert self.matcher.extract('Python and Rust') == {'Rust'}
+
+    def test_invalid_file_keeps_previous_dictionary(self):
+        """Test a broken dictionary file does not drop loaded skills"""
+        assert self.matcher.skill_count == 11
+        self.skills_file.write_text('{not json')
+        assert not self.matcher.reload()
+        assert self.matcher.extract('Python') == {'Python'}
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from sqlalchemy import Column, Float, Integer, MetaData, Table, create_engine, select
+from sqlalchemy.dialects import postgresql
+
+from services.geo_distance import haversine_km
+from services.spatial.backend import get_spatial_backend
+from services.spatial.postgres import EarthDistanceBackend, PostGISBackend
+from services.spatial.sqlite_rtree import SQLiteRTreeBackend
+
+
+def job_table():
+    return Table(
+        'job', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('latitude', Float),
+        Column('longitude', Float),
+    )
+
+
+class TestSQLiteRTreeBackend:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine('sqlite://')
+        self.table = job_table()
+        self.table.metadata.create_all(self.engine)
+        rng = np.random.default_rng(3)
+        self.points = {
+            job_id: (float(lat), float(lon))
+            for job_id, (lat, lon) in enumerate(zip(rng.uniform(29, 35, 500), rng.uniform(32, 38, 500)), 1)
+        }
+        with self.engine.begin() as connection:
+            # Rows present before installation are backfilled into the R*Tree
+            connection.execute(self.table.insert(), [
+                {'id': job_id, 'latitude': lat, 'longitude': lon}
+                for job_id, (lat, lon) in list(self.points.items())[:250]
+            ])
+        self.backend = get_spatial_backend(self.engine, self.table)
+        with self.engine.begin() as connection:
+            connection.execute(self.table.insert(), [
+                {'id': job_id, 'latitude': lat, 'longitude': lon}
+                for job_id, (lat, lon) in list(self.points.items())[250:]
+            ])
+        yield
+        self.engine.dispose()
+
+    def nearby(self, latitude, longitude, radius_km):
+        distance = self.backend.distance_km(latitude, longitude)
+        query = (select(self.table.c.id, distance)
+                 .where(self.backend.within_radius(latitude, longitude, radius_km))
+                 .order_by(distance, self.table.c.id))
+        with self.engine.connect() as connection:
+            return connection.execute(query).all()
+
+    def brute_force(self, latitude, longitude, radius_km):
+        distances = {
+            job_id: float(haversine_km(latitude, longitude, lat, lon))
+            for job_id, (lat, lon) in self.points.items()
+        }
+        return sorted((job_id for job_id, d in distances.items() if d <= radius_km),
+                      key=lambda job_id: (distances[job_id], job_id))
+
+    def test_backend_selection(self):
+        """Test SQLite engines get the R*Tree backend"""
+        assert isinstance(self.backend, SQLiteRTreeBackend)
+        assert get_spatial_backend(self.engine, self.table) is self.backend
+
+    def test_matches_brute_force(self):
+        """Test radius results and order match an exhaustive haversine scan"""
+        for radius_km in (5, 40, 150):
+            rows = self.nearby(32.08, 34.78, radius_km)
+            assert [job_id for job_id, _ in rows] == self.brute_force(32.08, 34.78, radius_km)
+            assert all(distance <= radius_km for _, distance in rows)
+
+    def test_rtree_follows_updates_and_deletes(self):
+        """Test triggers keep the R*Tree in sync with coordinate writes"""
+        with self.engine.begin() as connection:
+            connection.execute(self.table.update().where(self.table.c.id == 1)
+                               .values(latitude=60.0, longitude=10.0))
+            connection.execute(self.table.update().where(self.table.c.id == 2)
+                               .values(latitude=None, longitude=None))
+            connection.execute(self.table.delete().where(self.table.c.id == 3))
+            connection.execute(self.table.insert().values(id=1001, latitude=None, longitude=None))
+            rtree_ids = {row[0] for row in connection.exec_driver_sql('SELECT id FROM job_rtree')}
+        assert 1 in rtree_ids and 2 not in rtree_ids and 3 not in rtree_ids and 1001 not in rtree_ids
+        assert [job_id for job_id, _ in self.nearby(60.0, 10.0, 1)] == [1]
+
+    def test_antimeridian(self):
+        """Test circles crossing the antimeridian find points on both sides"""
+        with self.engine.begin() as connection:
+            connection.execute(self.table.insert(), [
+                {'id': 2001, 'latitude': 0.0, 'longitude': 179.95},
+                {'id': 2002, 'latitude': 0.0, 'longitude': -179.95},
+                {'id': 2003, 'latitude': 0.0, 'longitude': 178.0},
+            ])
+        assert [job_id for job_id, _ in self.nearby(0.0, 179.99, 20)] == [2001, 2002]
+        assert [job_id for job_id, _ in self.nearby(0.0, -179.99, 20)] == [2002, 2001]
+
+
+class TestPostgresBackends:
+    def compile(self, expression):
+        return str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+    def test_postgis_uses_indexed_expression(self):
+        """Test PostGIS queries use the geography expression the index is built on"""
+        sql = self.compile(PostGISBackend(job_table()).within_radius(32.0, 34.0, 10))
+        assert 'ST_DWithin(geography(ST_SetSRID(ST_MakePoint(job.longitude, job.latitude), 4326))' in sql
+        assert '10000' in sql
+
+    def test_earthdistance_filters_with_box(self):
+        """Test earthdistance queries filter with an indexable earth_box containment"""
+        sql = self.compile(EarthDistanceBackend(job_table()).within_radius(32.0, 34.0, 10))
+        assert 'earth_box(ll_to_earth(32.0, 34.0), 10000) @> ll_to_earth(job.latitude, job.longitude)' in sql
+        assert 'earth_distance' in sql
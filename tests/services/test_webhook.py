@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from telegram import Update
+
+from bot.fake_updates import fake_message_update, fake_updates
+from bot.webhook import SECRET_HEADER, WebhookServer
+
+SECRET = 'webhook-secret'
+
+
+class FakeApplication:
+    def __init__(self):
+        self.bot = None
+        self.processed = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def process_update(self, update):
+        await self.release.wait()
+        await asyncio.sleep(0)
+        self.processed.append((update.effective_chat.id, update.message.text))
+
+
+class TestWebhookServer:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.statuses = []
+
+    def serve(self, exercise, **options):
+        """Run ``exercise(client, server)`` against a webhook server on a test port"""
+        async def run():
+            application = FakeApplication()
+            server = WebhookServer(application, SECRET, **options)
+            async with TestClient(TestServer(server.web_app())) as client:
+                result = await exercise(client, server)
+            return application, server, result
+        return asyncio.run(run())
+
+    async def post(self, client, update, secret=SECRET):
+        response = await client.post('/telegram/webhook', json=update,
+                                     headers={SECRET_HEADER: secret} if secret else {})
+        self.statuses.append(response.status)
+        return response
+
+    def test_secret_token_is_required(self):
+        """Test requests without the secret token are refused and valid ones processed"""
+        async def exercise(client, server):
+            await self.post(client, fake_message_update(1, 10, '/start'), secret=None)
+            await self.post(client, fake_message_update(2, 10, '/start'), secret='wrong')
+            await self.post(client, fake_message_update(3, 10, '/jobs'))
+
+        application, server, _ = self.serve(exercise)
+        assert self.statuses == [403, 403, 200]
+        assert application.processed == [(10, '/jobs')]
+        assert server.metrics().rejected == 2 and server.metrics().processed == 1
+
+        with pytest.raises(ValueError):
+            WebhookServer(application, '')
+
+    def test_invalid_updates(self):
+        """Test bodies that are not updates are answered 400"""
+        async def exercise(client, server):
+            response = await client.post('/telegram/webhook', data=b'not json',
+                                         headers={SECRET_HEADER: SECRET})
+            self.statuses.append(response.status)
+
+        _, server, _ = self.serve(exercise)
+        assert self.statuses == [400] and server.metrics().invalid == 1
+
+    def test_chats_keep_their_order(self):
+        """Test concurrent requests are processed in order within each chat"""
+        updates = list(fake_updates(200, users=10, texts=[str(i) for i in range(200)]))
+
+        async def exercise(client, server):
+            for update in updates:
+                await self.post(client, update)
+
+        application, server, _ = self.serve(exercise, workers=4)
+        assert set(self.statuses) == {200}
+        for chat_id in {update['message']['chat']['id'] for update in updates}:
+            sent = [u['message']['text'] for u in updates if u['message']['chat']['id'] == chat_id]
+            assert [text for chat, text in application.processed if chat == chat_id] == sent
+        assert server.metrics().processed == 200
+
+    def test_full_queue_answers_503(self):
+        """Test requests beyond the queue capacity are told to retry later"""
+        async def exercise(client, server):
+            server.application.release.clear()
+            for update_id in range(1, 5):
+                await self.post(client, fake_message_update(update_id, 10, 'hello'))
+            metrics = server.metrics()
+            server.application.release.set()
+            return metrics
+
+        application, server, metrics = self.serve(exercise, workers=1, queue_size=2,
+                                                  enqueue_timeout=0.05)
+        # One update is being processed, two wait in the queue, the last overflows
+        assert self.statuses == [200, 200, 200, 503]
+        assert metrics.overflowed == 1 and metrics.queued == 2 and metrics.busy_workers == 1
+        assert len(application.processed) == 3
+
+    def test_metrics_endpoint(self):
+        """Test the metrics are served as JSON"""
+        async def exercise(client, server):
+            await self.post(client, fake_message_update(1, 10, 'hello'))
+            await server._queues[0].join()
+            response = await client.get('/telegram/webhook/metrics')
+            return await response.json()
+
+        _, _, metrics = self.serve(exercise, workers=1)
+        assert metrics['received'] == 1 and metrics['processed'] == 1
+        assert metrics['workers'] == 1 and metrics['queue_capacity'] > 0
+
+
+class TestFakeUpdates:
+    def test_updates_parse(self):
+        """Test generated updates are valid Telegram updates"""
+        updates = list(fake_updates(5, users=2, texts=['/find python'], first_update_id=100))
+        parsed = [Update.de_json(update, None) for update in updates]
+        assert [update.update_id for update in parsed] == list(range(100, 105))
+        assert all(update.message.text == '/find python' for update in parsed)
+        assert parsed[0].message.entities[0].length == len('/find')